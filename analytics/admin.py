@@ -0,0 +1,59 @@
+import json
+
+from django.contrib import admin
+from django.utils.html import format_html
+from .models import ArchivedLead, EngagementEvent, LeadAttributionDaily
+
+
+@admin.register(LeadAttributionDaily)
+class LeadAttributionDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'lead_type', 'utm_source', 'utm_medium', 'utm_campaign', 'leads_count']
+    list_filter = ['lead_type', 'date']
+    search_fields = ['utm_source', 'utm_medium', 'utm_campaign']
+    date_hierarchy = 'date'
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EngagementEvent)
+class EngagementEventAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'event_type', 'object_type', 'object_id', 'visitor_token', 'counted']
+    list_filter = ['event_type', 'object_type', 'counted']
+    search_fields = ['visitor_token']
+    list_per_page = 50
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedLead)
+class ArchivedLeadAdmin(admin.ModelAdmin):
+    """Read-only browser for leads moved out of their tables by `manage.py archive_leads`"""
+    list_display = ['original_id', 'lead_type', 'full_name', 'email', 'utm_source', 'utm_campaign', 'created_at', 'archived_at']
+    list_filter = ['lead_type', 'created_at', 'archived_at']
+    search_fields = ['^email', '^full_name', '=original_id']
+    date_hierarchy = 'created_at'
+    fields = ['lead_type', 'original_id', 'full_name', 'email', 'utm_source', 'utm_medium', 'utm_campaign',
+              'created_at', 'archived_at', 'formatted_data']
+    readonly_fields = fields
+    list_per_page = 50
+    show_full_result_count = False
+
+    def formatted_data(self, obj):
+        return format_html('<pre>{}</pre>', json.dumps(obj.data, indent=2, ensure_ascii=False))
+    formatted_data.short_description = "Original row"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,153 @@
+from collections import Counter
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedLead, LeadAttributionDaily
+
+
+# lead_type -> model label; every lead model has utm_* columns (blog and case study
+# leads extract theirs from `data`, see martech_influence_backend/lead_data.py)
+LEAD_SOURCES = {
+    'contact': 'contact.Contact',
+    'service_lead': 'services.ServiceLead',
+    'job_application': 'career.JobApplication',
+    'blog_lead': 'blog.BlogLeads',
+    'case_study_lead': 'casestudy.CaseStudyLead',
+}
+
+UTM_KEYS = ('utm_source', 'utm_medium', 'utm_campaign')
+
+MAX_LENGTH = 100
+
+
+def get_lead_model(lead_type):
+    return apps.get_model(LEAD_SOURCES[lead_type])
+
+
+def lead_type_for_model(model):
+    label = model._meta.label
+    for lead_type, model_label in LEAD_SOURCES.items():
+        if model_label == label:
+            return lead_type
+    return None
+
+
+def clean_utm(value):
+    """Normalize a UTM value so 'Google ' and 'google' roll up together"""
+    if value is None:
+        return ''
+    return str(value).strip().lower()[:MAX_LENGTH]
+
+
+def extract_utm(instance):
+    return tuple(clean_utm(getattr(instance, key, None)) for key in UTM_KEYS)
+
+
+def attribution_key(lead_type, instance):
+    created_at = instance.created_at or timezone.now()
+    source, medium, campaign = extract_utm(instance)
+    return (timezone.localdate(created_at), lead_type, source, medium, campaign)
+
+
+def _increment(key, delta):
+    date, lead_type, source, medium, campaign = key
+    lookup = {
+        'date': date,
+        'lead_type': lead_type,
+        'utm_source': source,
+        'utm_medium': medium,
+        'utm_campaign': campaign,
+    }
+    now = timezone.now()
+    rows = LeadAttributionDaily.objects.filter(**lookup)
+    if rows.update(leads_count=F('leads_count') + delta, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            LeadAttributionDaily.objects.create(leads_count=delta, **lookup)
+    except IntegrityError:
+        # Another worker created the row first
+        rows.update(leads_count=F('leads_count') + delta, updated_at=now)
+
+
+def record_leads(lead_type, instances):
+    """Add newly created leads to the daily rollup, one UPSERT per distinct key"""
+    counts = Counter(attribution_key(lead_type, instance) for instance in instances)
+    for key, delta in counts.items():
+        _increment(key, delta)
+
+
+def record_lead(lead_type, instance):
+    record_leads(lead_type, [instance])
+
+
+def _aggregate(lead_type, start=None, end=None):
+    # Archived leads (analytics.archive) keep counting in the days they were created
+    querysets = (
+        get_lead_model(lead_type).objects.filter(created_at__isnull=False),
+        ArchivedLead.objects.filter(lead_type=lead_type),
+    )
+    counts = Counter()
+    for queryset in querysets:
+        if start:
+            queryset = queryset.filter(created_at__date__gte=start)
+        if end:
+            queryset = queryset.filter(created_at__date__lte=end)
+
+        rows = (
+            queryset.annotate(day=TruncDate('created_at'))
+            .values('day', *UTM_KEYS)
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        for row in rows:
+            source, medium, campaign = (clean_utm(row[key]) for key in UTM_KEYS)
+            counts[(row['day'], lead_type, source, medium, campaign)] += row['total']
+    return counts
+
+
+def _lock_rollup():
+    """Make record_leads() in other transactions wait until the current one commits"""
+    connection = transaction.get_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            table = connection.ops.quote_name(LeadAttributionDaily._meta.db_table)
+            cursor.execute(f'LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE')
+    elif connection.vendor == 'sqlite':
+        # Any write takes SQLite's database-wide write lock until the transaction ends
+        LeadAttributionDaily.objects.filter(pk=-1).update(leads_count=F('leads_count'))
+
+
+def rebuild(start=None, end=None, lead_types=None):
+    """
+    Recompute the rollup from the lead tables and archived leads for an optional
+    date range. The rollup is locked before the leads are read. A lead's row and
+    its increment commit in one transaction, so a lead saved meanwhile is either
+    already counted here or still uncommitted, its increment waiting for the
+    lock and then landing on the rebuilt rows: never lost, never counted twice.
+    """
+    lead_types = lead_types or list(LEAD_SOURCES)
+    with transaction.atomic():
+        _lock_rollup()
+        counts = Counter()
+        for lead_type in lead_types:
+            counts.update(_aggregate(lead_type, start, end))
+
+        existing = LeadAttributionDaily.objects.filter(lead_type__in=lead_types)
+        if start:
+            existing = existing.filter(date__gte=start)
+        if end:
+            existing = existing.filter(date__lte=end)
+        existing.delete()
+        LeadAttributionDaily.objects.bulk_create([
+            LeadAttributionDaily(
+                date=date, lead_type=lead_type, utm_source=source,
+                utm_medium=medium, utm_campaign=campaign, leads_count=total,
+            )
+            for (date, lead_type, source, medium, campaign), total in counts.items()
+        ], batch_size=1000)
+    return len(counts)
@@ -0,0 +1,134 @@
+"""
+Bulk lead submission for partner integrations.
+
+    POST /api/contact/contacts/bulk/
+    POST /api/services/service-leads/bulk/
+    POST /api/blog/blog-leads/bulk/
+    POST /api/casestudy/case-study-leads/bulk/
+
+The body is a JSON array or NDJSON (`Content-Type: application/x-ndjson`,
+one lead per line) of at most LEAD_BULK_MAX_ITEMS leads in the same shape
+as the single-lead endpoint. Leads are validated by that endpoint's create
+serializer with many=True, with related objects fetched once per batch,
+and the valid ones are inserted with one bulk_create. Each item gets a
+result by index, so a bad row never rejects the batch.
+
+An item may carry a `submission_id` (UUID). A submission_id that already
+exists is reported as `duplicate` and not inserted again, so a partner can
+retry a whole batch after a timeout.
+
+Callers authenticate (HTTP Basic) as a user with the model's add
+permission, e.g. `contact.add_contact`, granted to partner accounts in
+the admin.
+"""
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+
+from martech_influence_backend import metrics
+from martech_influence_backend.bulk import InvalidLine, get_items, prefetch_related_targets
+from martech_influence_backend.lead_data import extract_instances
+from martech_influence_backend.utils import create_response
+
+from .attribution import get_lead_model, record_leads
+from .lead_spool import apply_lead_counters
+
+
+DEFAULT_MAX_ITEMS = 1000
+
+
+def _invalid(index, errors):
+    return {'index': index, 'status': 'invalid', 'errors': errors}
+
+
+def _error(status_code, message, message_code):
+    return create_response(status_code=status_code, message=message, message_code=message_code, status=False)
+
+
+def bulk_create_leads(request, lead_type, serializer_class, message_code):
+    """Validate and insert a batch of leads; see the module docstring"""
+    model = get_lead_model(lead_type)
+    if not request.user.is_authenticated:
+        return _error(status.HTTP_401_UNAUTHORIZED, "Authentication credentials were not provided", "AUTHENTICATION_REQUIRED")
+    if not request.user.has_perm(f'{model._meta.app_label}.add_{model._meta.model_name}'):
+        return _error(status.HTTP_403_FORBIDDEN, "You do not have permission to submit leads in bulk", "PERMISSION_DENIED")
+
+    try:
+        items = get_items(request)
+    except ParseError as exc:
+        return _error(status.HTTP_400_BAD_REQUEST, str(exc.detail), "INVALID_BULK_BODY")
+    if not items:
+        return _error(status.HTTP_400_BAD_REQUEST, "Expected a non-empty JSON array or NDJSON body", "INVALID_BULK_BODY")
+    max_items = getattr(settings, 'LEAD_BULK_MAX_ITEMS', DEFAULT_MAX_ITEMS)
+    if len(items) > max_items:
+        return _error(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, f"At most {max_items} leads per request", "TOO_MANY_LEADS")
+
+    results = [None] * len(items)
+    submission_ids = [None] * len(items)
+    candidates = []
+    for index, item in enumerate(items):
+        if isinstance(item, InvalidLine):
+            results[index] = _invalid(index, {'non_field_errors': [item.error]})
+            continue
+        if isinstance(item, dict) and 'submission_id' in item:
+            item = dict(item)
+            try:
+                submission_ids[index] = uuid.UUID(str(item.pop('submission_id')))
+            except ValueError:
+                results[index] = _invalid(index, {'submission_id': ["Must be a valid UUID."]})
+                continue
+        candidates.append((index, item))
+
+    data = [item for _, item in candidates]
+    errors, validated = [], []
+    if data:
+        context = {'prefetched': prefetch_related_targets(serializer_class, data)}
+        serializer = serializer_class(data=data, many=True, context=context)
+        if serializer.is_valid():
+            errors, validated = [{}] * len(data), serializer.validated_data
+        else:
+            # ListSerializer keeps no validated data once any item fails; validating
+            # the good ones again costs no queries, their targets are prefetched
+            errors = serializer.errors
+            if isinstance(errors, dict):
+                # Recent DRF versions report only the failing items, keyed by index
+                errors = [errors.get(position, {}) for position in range(len(data))]
+            validated = [None if error else serializer.child.run_validation(item) for item, error in zip(data, errors)]
+
+    try:
+        with transaction.atomic():
+            wanted = {submission_id for submission_id in submission_ids if submission_id}
+            seen = set(model.objects.filter(submission_id__in=wanted).values_list('submission_id', flat=True)) if wanted else set()
+            instances, owners = [], []
+            for (index, _), error, values in zip(candidates, errors, validated):
+                submission_id = submission_ids[index]
+                if error:
+                    results[index] = _invalid(index, error)
+                elif submission_id is not None and submission_id in seen:
+                    results[index] = {'index': index, 'status': 'duplicate', 'submission_id': submission_id}
+                else:
+                    seen.add(submission_id)
+                    instances.append(model(submission_id=submission_id, **values))
+                    owners.append(index)
+            extract_instances(model, instances)
+            model.objects.bulk_create(instances)
+            # bulk_create sends no post_save: feed the rollup and counters the single-lead path updates
+            record_leads(lead_type, instances)
+            apply_lead_counters(lead_type, instances)
+    except IntegrityError:
+        # The same submission_id arrived concurrently in another request
+        return _error(status.HTTP_409_CONFLICT, "Conflicting submission_id, retry the batch", "BULK_CONFLICT")
+
+    for index, instance in zip(owners, instances):
+        results[index] = {'index': index, 'status': 'created', 'id': instance.pk, 'submission_id': instance.submission_id}
+    summary = {outcome: sum(result['status'] == outcome for result in results) for outcome in ('created', 'duplicate', 'invalid')}
+    metrics.increment('leads.bulk_created', summary['created'], lead_type=lead_type)
+    return create_response(
+        status_code=status.HTTP_200_OK,
+        message=f"{summary['created']} of {len(items)} leads created",
+        message_code=message_code,
+        data={**summary, 'results': results},
+    )
@@ -0,0 +1,161 @@
+"""
+Engagement (like / share / download) ingestion and roll-up.
+
+The ingestion endpoint only appends rows to EngagementEvent with one
+bulk INSERT. rollup() later reads a batch of pending events, drops repeats
+of the same visitor within ENGAGEMENT_DEDUPE_WINDOW, and applies the summed
+deltas to the content counters with set-based F() updates: one UPDATE per
+(model, counter, delta) group, never one per event.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from martech_influence_backend import metrics
+
+from .models import EngagementEvent
+from .unique_views import visitor_hash
+
+
+# object type -> model and the counter each event type increments
+ENGAGEMENT_TARGETS = {
+    'blog': {
+        'model': 'blog.Blog',
+        'counters': {'like': 'likes_count', 'share': 'shares_count'},
+    },
+    'casestudy': {
+        'model': 'casestudy.CaseStudy',
+        'counters': {'like': 'likes_count', 'share': 'shares_count', 'download': 'downloads_count'},
+    },
+    'service': {
+        'model': 'services.Service',
+        'counters': {'like': 'likes_count'},
+    },
+}
+
+DEFAULT_DEDUPE_WINDOW = 24 * 60 * 60
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_BATCH_SIZE = 5000
+# Rows per IN (...) list, below SQLite's variable limit
+CHUNK_SIZE = 500
+
+
+def get_dedupe_window():
+    return timedelta(seconds=getattr(settings, 'ENGAGEMENT_DEDUPE_WINDOW', DEFAULT_DEDUPE_WINDOW))
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def fallback_visitor_token(request):
+    """Token for clients that send none: a keyed hash of client IP and User-Agent"""
+    return f"anon:{visitor_hash(request):016x}"
+
+
+def record_events(events, visitor_token):
+    """Append validated events ({'type', 'object', 'id'}) to the log in one INSERT"""
+    now = timezone.now()
+    rows = [
+        EngagementEvent(
+            object_type=event['object'], object_id=event['id'], event_type=event['type'],
+            visitor_token=visitor_token, created_at=now,
+        )
+        for event in events
+    ]
+    EngagementEvent.objects.bulk_create(rows)
+    metrics.increment('engagement.events_received', len(rows))
+    return len(rows)
+
+
+def _last_counted(events, window):
+    """(object_type, object_id, event_type, token) -> latest counted event time within the window"""
+    tokens = sorted({event[4] for event in events})
+    since = min(event[5] for event in events) - window
+    last_seen = {}
+    for chunk in _chunks(tokens):
+        rows = EngagementEvent.objects.filter(
+            counted=True, visitor_token__in=chunk, created_at__gte=since,
+        ).values_list('object_type', 'object_id', 'event_type', 'visitor_token', 'created_at')
+        for *key, created_at in rows:
+            key = tuple(key)
+            if key not in last_seen or created_at > last_seen[key]:
+                last_seen[key] = created_at
+    return last_seen
+
+
+def apply_deltas(deltas):
+    """
+    deltas: {(object_type, object_id, event_type): count}. Objects receiving
+    the same delta on the same counter share one UPDATE ... WHERE id IN (...).
+    """
+    groups = defaultdict(list)
+    for (object_type, object_id, event_type), count in deltas.items():
+        counter = ENGAGEMENT_TARGETS[object_type]['counters'].get(event_type)
+        if counter is not None:
+            groups[(object_type, counter, count)].append(object_id)
+
+    updates = 0
+    for (object_type, counter, count), object_ids in groups.items():
+        model = apps.get_model(ENGAGEMENT_TARGETS[object_type]['model'])
+        for chunk in _chunks(sorted(object_ids)):
+            model.objects.filter(pk__in=chunk).update(**{counter: Coalesce(F(counter), 0) + count})
+            updates += 1
+    return updates
+
+
+def rollup(batch_size=None):
+    """
+    Fold one batch of pending events into the counters. Returns
+    (events processed, events counted). Call until it returns 0 processed.
+    """
+    batch_size = batch_size or getattr(settings, 'ENGAGEMENT_ROLLUP_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    window = get_dedupe_window()
+
+    with transaction.atomic():
+        pending = EngagementEvent.objects.filter(counted__isnull=True).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent roll-ups take disjoint batches
+            pending = pending.select_for_update(skip_locked=True)
+        events = list(
+            pending.values_list('id', 'object_type', 'object_id', 'event_type', 'visitor_token', 'created_at')[:batch_size]
+        )
+        if not events:
+            return 0, 0
+
+        last_seen = _last_counted(events, window)
+        deltas = Counter()
+        counted_ids, duplicate_ids = [], []
+        for event_id, object_type, object_id, event_type, token, created_at in events:
+            key = (object_type, object_id, event_type, token)
+            previous = last_seen.get(key)
+            if previous is not None and created_at - previous < window:
+                duplicate_ids.append(event_id)
+                continue
+            last_seen[key] = created_at
+            counted_ids.append(event_id)
+            deltas[(object_type, object_id, event_type)] += 1
+
+        apply_deltas(deltas)
+        for ids, counted in ((counted_ids, True), (duplicate_ids, False)):
+            for chunk in _chunks(ids):
+                EngagementEvent.objects.filter(id__in=chunk).update(counted=counted)
+
+    metrics.increment('engagement.events_counted', len(counted_ids))
+    metrics.increment('engagement.events_deduplicated', len(duplicate_ids))
+    return len(events), len(counted_ids)
+
+
+def prune(retention_days=None):
+    """Delete rolled-up events older than the retention period (and the dedupe window)"""
+    retention_days = retention_days or getattr(settings, 'ENGAGEMENT_EVENT_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    cutoff = timezone.now() - max(timedelta(days=retention_days), get_dedupe_window())
+    deleted, _ = EngagementEvent.objects.filter(counted__isnull=False, created_at__lt=cutoff).delete()
+    return deleted
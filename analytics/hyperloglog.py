@@ -0,0 +1,65 @@
+"""
+HyperLogLog cardinality sketch.
+
+With PRECISION = 8 a sketch is 256 one-byte registers (~6.5% standard
+error) whatever the number of visitors. Sketches of the same precision merge
+by taking the register-wise maximum, so per-worker buffers, daily sketches
+and the lifetime sketch can be combined in any order without double counting.
+"""
+import hashlib
+import math
+
+PRECISION = 8
+REGISTERS = 1 << PRECISION
+# Bits of the 64-bit hash left after the register index
+VALUE_BITS = 64 - PRECISION
+ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def hash_value(value, key=b''):
+    """64-bit hash of a str/bytes value (keyed, so the raw value can't be recovered by guessing)"""
+    if isinstance(value, str):
+        value = value.encode()
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8, key=key[:64]).digest(), 'big')
+
+
+class HyperLogLog:
+    __slots__ = ('registers',)
+
+    def __init__(self, registers=None):
+        if registers is None:
+            self.registers = bytearray(REGISTERS)
+        else:
+            if len(registers) != REGISTERS:
+                raise ValueError(f"Expected {REGISTERS} registers, got {len(registers)}")
+            self.registers = bytearray(registers)
+
+    def add_hash(self, hashed):
+        index = hashed >> VALUE_BITS
+        remainder = hashed & ((1 << VALUE_BITS) - 1)
+        # Position of the leftmost 1 bit in the remaining bits (VALUE_BITS + 1 when all zero)
+        rank = VALUE_BITS - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value, key=b''):
+        self.add_hash(hash_value(value, key))
+
+    def merge(self, other):
+        """Fold `other` (a HyperLogLog or its bytes) into this sketch"""
+        registers = other.registers if isinstance(other, HyperLogLog) else other
+        self.registers = bytearray(map(max, self.registers, registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct values added"""
+        estimate = ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * REGISTERS:
+            zeros = self.registers.count(0)
+            if zeros:
+                # Linear counting is more accurate for small cardinalities
+                estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return round(estimate)
+
+    def to_bytes(self):
+        return bytes(self.registers)
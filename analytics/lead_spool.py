@@ -0,0 +1,275 @@
+"""
+Write-behind spool for public lead submissions (LEAD_WRITE_BEHIND).
+
+With it on, the contact, blog, case study and service lead endpoints
+validate the submission, append it to a local append-only spool file and
+answer 202 with a `submission_id`; nothing is inserted during the request.
+`manage.py flush_lead_spool` (one per host, since the spool is on local
+disk) moves the live spool aside as a segment and writes it to the lead
+tables with bulk_create, one transaction per batch.
+
+Exactly once: every line carries its submission_id, stored in the lead's
+unique `submission_id` column. A batch's inserts, its attribution rollup
+and the service inquiry counters commit together, and a segment is
+deleted only after all of its batches have committed. A segment replayed
+after a crash skips the ids already in the table. Appends are fsync'ed
+before the 202 (LEAD_SPOOL_FSYNC), so an acknowledged lead survives a
+process or host crash; a line torn by a crash mid-append was never
+acknowledged and is skipped.
+
+A segment that fails to write is retried on later flushes and holds back
+the segments after it. After LEAD_SPOOL_MAX_ATTEMPTS failures its records
+are written one at a time and the ones that still fail are moved to a
+dead-letter file in `dead/` (with the error), so one bad record cannot
+block the spool. Moving such a file back into the spool directory as
+`<name>.segment` replays it.
+
+Leads get their created_at when flushed, normally seconds after submission.
+"""
+import json
+import logging
+import os
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import F
+
+from martech_influence_backend import metrics
+from martech_influence_backend.filelock import file_lock
+from martech_influence_backend.lead_data import extract_instances
+
+from .attribution import LEAD_SOURCES, get_lead_model, record_leads
+
+
+logger = logging.getLogger(__name__)
+
+SPOOL_NAME = 'leads.spool'
+SEGMENT_GLOB = '*.segment'
+DEAD_LETTER_DIR = 'dead'
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_ATTEMPTS = 5
+
+# lead_type -> (foreign key, counter on its target) incremented per lead
+LEAD_COUNTERS = {
+    'service_lead': ('service', 'inquiries_count'),
+}
+
+
+def write_behind_enabled():
+    return getattr(settings, 'LEAD_WRITE_BEHIND', False)
+
+
+def get_spool_dir():
+    path = Path(getattr(settings, 'LEAD_SPOOL_DIR', None) or Path(settings.BASE_DIR) / 'spool' / 'leads')
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def enqueue_lead(lead_type, validated_data):
+    """Durably append a validated lead (serializer.validated_data); returns its submission_id"""
+    model = get_lead_model(lead_type)
+    submission_id = uuid.uuid4()
+    fields = {}
+    for name, value in validated_data.items():
+        field = model._meta.get_field(name)
+        fields[field.attname] = value.pk if isinstance(value, models.Model) else value
+    record = json.dumps(
+        {'submission_id': str(submission_id), 'lead_type': lead_type, 'fields': fields},
+        cls=DjangoJSONEncoder, separators=(',', ':'),
+    )
+    # Leading newline: a line torn by a crash never swallows the next record
+    data = ('\n' + record).encode()
+
+    spool_dir = get_spool_dir()
+    # Appenders share the lock; rotation takes it exclusively
+    with file_lock(spool_dir / 'spool.lock', shared=True):
+        fd = os.open(spool_dir / SPOOL_NAME, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            if os.write(fd, data) != len(data):
+                raise OSError(f"Short write to the lead spool ({lead_type})")
+            if getattr(settings, 'LEAD_SPOOL_FSYNC', True):
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+    metrics.increment('lead_spool.enqueued', lead_type=lead_type)
+    return submission_id
+
+
+def rotate(spool_dir):
+    """Move the live spool aside as a segment; appenders hold the shared lock, so none is mid-write"""
+    live = spool_dir / SPOOL_NAME
+    with file_lock(spool_dir / 'spool.lock'):
+        if live.exists() and live.stat().st_size:
+            live.rename(spool_dir / f'{time.time_ns()}.segment')
+
+
+def read_segment(path):
+    records = []
+    with open(path, 'rb') as handle:
+        for number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if record['lead_type'] not in LEAD_SOURCES:
+                    raise KeyError(record['lead_type'])
+                uuid.UUID(record['submission_id'])
+                if not isinstance(record['fields'], dict):
+                    raise TypeError(record['fields'])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                logger.warning("Skipping unreadable line %s of lead spool segment %s", number, path.name)
+                metrics.increment('lead_spool.unreadable')
+                continue
+            records.append(record)
+    return records
+
+
+def _build(lead_type, records):
+    """New instances for records not yet in the table; leads whose target was deleted meanwhile are dropped"""
+    model = get_lead_model(lead_type)
+    ids = [uuid.UUID(record['submission_id']) for record in records]
+    existing = set(model.objects.filter(submission_id__in=ids).values_list('submission_id', flat=True))
+
+    instances = []
+    for record, submission_id in zip(records, ids):
+        if submission_id in existing:
+            continue
+        existing.add(submission_id)
+        values = {}
+        for attname, value in record['fields'].items():
+            values[attname] = model._meta.get_field(attname).to_python(value)
+        instances.append(model(submission_id=submission_id, **values))
+
+    for field in model._meta.concrete_fields:
+        if not field.is_relation or not field.many_to_one:
+            continue
+        wanted = {getattr(instance, field.attname) for instance in instances} - {None}
+        if not wanted:
+            continue
+        present = set(field.related_model.objects.filter(pk__in=wanted).values_list('pk', flat=True))
+        if present != wanted:
+            kept = [instance for instance in instances if getattr(instance, field.attname) in present | {None}]
+            logger.warning("Dropping %s spooled %s(s): their %s was deleted", len(instances) - len(kept), lead_type, field.name)
+            metrics.increment('lead_spool.dropped', len(instances) - len(kept), lead_type=lead_type)
+            instances = kept
+    return instances
+
+
+def apply_lead_counters(lead_type, instances):
+    """What the single-lead views increment per lead (e.g. Service.inquiries_count), as one UPDATE per target"""
+    if lead_type not in LEAD_COUNTERS:
+        return
+    foreign_key, counter = LEAD_COUNTERS[lead_type]
+    field = get_lead_model(lead_type)._meta.get_field(foreign_key)
+    per_target = Counter(getattr(instance, field.attname) for instance in instances)
+    per_target.pop(None, None)
+    for pk, count in per_target.items():
+        field.related_model.objects.filter(pk=pk).update(**{counter: F(counter) + count})
+
+
+def write_batch(records):
+    """Insert one batch of spooled leads in one transaction; returns how many were created"""
+    by_type = defaultdict(list)
+    for record in records:
+        by_type[record['lead_type']].append(record)
+
+    created = 0
+    with transaction.atomic():
+        for lead_type, group in by_type.items():
+            instances = _build(lead_type, group)
+            if not instances:
+                continue
+            model = get_lead_model(lead_type)
+            extract_instances(model, instances)
+            model.objects.bulk_create(instances)
+            # bulk_create sends no post_save, so the rollup is fed here, in the same transaction
+            record_leads(lead_type, instances)
+            apply_lead_counters(lead_type, instances)
+            created += len(instances)
+    return created
+
+
+def _attempts_path(segment):
+    return segment.with_name(segment.name + '.attempts')
+
+
+def _failed_attempts(segment):
+    try:
+        return int(_attempts_path(segment).read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def quarantine(spool_dir, segment, records):
+    """
+    Write a segment's records one per transaction; move those that still fail
+    to the dead-letter file. Returns (leads created, records quarantined).
+    """
+    created = 0
+    failed = []
+    for record in records:
+        try:
+            created += write_batch([record])
+        except Exception as exc:
+            logger.error(
+                "Quarantining spooled %s %s from %s: %r",
+                record['lead_type'], record['submission_id'], segment.name, exc,
+            )
+            failed.append({**record, 'error': repr(exc)})
+    if failed:
+        dead_dir = spool_dir / DEAD_LETTER_DIR
+        dead_dir.mkdir(exist_ok=True)
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in failed)
+        with open(dead_dir / (segment.stem + '.jsonl'), 'a', encoding='utf-8') as handle:
+            handle.write(lines)
+            handle.flush()
+            os.fsync(handle.fileno())
+        metrics.increment('lead_spool.quarantined', len(failed))
+    return created, len(failed)
+
+
+def flush(batch_size=None):
+    """
+    Write every spooled lead to the database. Returns (lines read, leads
+    created, records quarantined), or None when another flusher holds this
+    spool. Stops at a segment that fails, to retry it on the next flush.
+    """
+    batch_size = batch_size or getattr(settings, 'LEAD_SPOOL_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    max_attempts = getattr(settings, 'LEAD_SPOOL_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    spool_dir = get_spool_dir()
+    read = created = quarantined = 0
+    try:
+        with file_lock(spool_dir / 'flush.lock', blocking=False):
+            rotate(spool_dir)
+            for segment in sorted(spool_dir.glob(SEGMENT_GLOB)):
+                records = read_segment(segment)
+                attempts = _failed_attempts(segment)
+                if attempts >= max_attempts:
+                    segment_created, segment_quarantined = quarantine(spool_dir, segment, records)
+                    created += segment_created
+                    quarantined += segment_quarantined
+                else:
+                    try:
+                        for start in range(0, len(records), batch_size):
+                            created += write_batch(records[start:start + batch_size])
+                    except Exception:
+                        # Committed batches are skipped by submission_id when the segment is retried
+                        logger.exception(
+                            "Writing lead spool segment %s failed (attempt %s of %s)",
+                            segment.name, attempts + 1, max_attempts,
+                        )
+                        metrics.increment('lead_spool.failed')
+                        _attempts_path(segment).write_text(str(attempts + 1))
+                        break
+                read += len(records)
+                segment.unlink()
+                _attempts_path(segment).unlink(missing_ok=True)
+    except BlockingIOError:
+        return None
+    metrics.increment('lead_spool.flushed', created)
+    return read, created, quarantined
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.archive import DEFAULT_BATCH_SIZE, archive_cutoff, archive_leads, pending_leads
+from analytics.attribution import LEAD_SOURCES
+
+
+class Command(BaseCommand):
+    help = "Move leads older than LEAD_ARCHIVE_AFTER_DAYS into the archive table (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Archive leads older than this many days instead of the setting")
+        parser.add_argument(
+            '--lead-type', action='append', choices=sorted(LEAD_SOURCES), dest='lead_types',
+            help="Only archive this lead type (repeatable)",
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Leads moved per transaction")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the leads that would be archived")
+
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 1:
+            raise CommandError("--days must be at least 1")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        before = archive_cutoff(options['days'])
+        for lead_type in options['lead_types'] or LEAD_SOURCES:
+            if options['dry_run']:
+                count = pending_leads(lead_type, before).count()
+                self.stdout.write(f"{lead_type}: {count} lead(s) created before {before:%Y-%m-%d} would be archived.")
+                continue
+            moved = archive_leads(lead_type, before, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{lead_type}: archived {moved} lead(s) created before {before:%Y-%m-%d}."))
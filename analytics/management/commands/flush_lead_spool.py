@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.lead_spool import flush
+
+
+class Command(BaseCommand):
+    help = "Write leads accepted by the write-behind spool to the database (run on every web host)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Leads per transaction")
+        parser.add_argument('--loop', action='store_true', help="Keep flushing every --interval seconds")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between flushes with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            result = flush(batch_size=options['batch_size'])
+            if result is None:
+                self.stdout.write(self.style.WARNING("Another flusher holds this spool."))
+            elif result[0] or not options['loop']:
+                read, created, quarantined = result
+                self.stdout.write(self.style.SUCCESS(
+                    f"Flushed {read} spooled lead(s): {created} created, {quarantined} quarantined, "
+                    f"{read - created - quarantined} already written or dropped."
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
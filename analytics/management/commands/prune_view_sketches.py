@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from analytics.unique_views import prune
+
+
+class Command(BaseCommand):
+    help = "Delete daily unique-visitor sketches past UNIQUE_VIEWS_RETENTION_DAYS (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Keep this many days instead of the setting")
+
+    def handle(self, *args, **options):
+        deleted = prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} daily sketch(es)."))
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.attribution import LEAD_SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily UTM attribution rollup from the lead tables and archived leads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to rebuild (YYYY-MM-DD), defaults to all history")
+        parser.add_argument('--end', help="Last day to rebuild (YYYY-MM-DD), defaults to today")
+        parser.add_argument(
+            '--lead-type', action='append', choices=sorted(LEAD_SOURCES), dest='lead_types',
+            help="Only rebuild this lead type (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        start = self._parse_date(options['start'], '--start')
+        end = self._parse_date(options['end'], '--end')
+        if start and end and start > end:
+            raise CommandError("--start must be on or before --end")
+
+        rows = rebuild(start=start, end=end, lead_types=options['lead_types'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt attribution rollup: {rows} row(s) written."))
+
+    def _parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from analytics.engagement import prune, rollup
+
+
+class Command(BaseCommand):
+    help = "Apply pending like/share/download events to the content counters (run every minute)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Events per transaction")
+        parser.add_argument('--no-prune', action='store_true', help="Keep rolled-up events past the retention period")
+
+    def handle(self, *args, **options):
+        processed = counted = 0
+        while True:
+            batch, batch_counted = rollup(batch_size=options['batch_size'])
+            if not batch:
+                break
+            processed += batch
+            counted += batch_counted
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {processed} event(s): {counted} counted, {processed - counted} duplicate(s)."
+        ))
+        if not options['no_prune']:
+            deleted = prune()
+            self.stdout.write(f"Pruned {deleted} old event(s).")
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadAttributionDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('date', models.DateField()),
+                ('lead_type', models.CharField(choices=[('contact', 'Contact'), ('service_lead', 'Service Lead'), ('job_application', 'Job Application'), ('blog_lead', 'Blog Lead'), ('case_study_lead', 'Case Study Lead')], max_length=30)),
+                ('utm_source', models.CharField(blank=True, default='', max_length=100)),
+                ('utm_medium', models.CharField(blank=True, default='', max_length=100)),
+                ('utm_campaign', models.CharField(blank=True, default='', max_length=100)),
+                ('leads_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Lead Attribution (Daily)',
+                'verbose_name_plural': 'Lead Attribution (Daily)',
+                'ordering': ['-date', 'lead_type'],
+                'indexes': [models.Index(fields=['date', 'utm_campaign'], name='analytics_l_date_010d41_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'lead_type', 'utm_source', 'utm_medium', 'utm_campaign'), name='unique_daily_lead_attribution')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_type', models.CharField(choices=[('blog', 'Blog'), ('casestudy', 'Case Study'), ('service', 'Service')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('event_type', models.CharField(choices=[('like', 'Like'), ('share', 'Share'), ('download', 'Download')], max_length=20)),
+                ('visitor_token', models.CharField(blank=True, default='', max_length=64)),
+                ('counted', models.BooleanField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Engagement Event',
+                'verbose_name_plural': 'Engagement Events',
+                'ordering': ['-id'],
+                'indexes': [models.Index(condition=models.Q(('counted__isnull', True)), fields=['id'], name='engagement_pending_idx'), models.Index(fields=['visitor_token', 'created_at'], name='engagement_visitor_idx'), models.Index(fields=['created_at'], name='engagement_created_idx')],
+            },
+        ),
+    ]
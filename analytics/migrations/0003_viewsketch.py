@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_engagementevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('object_type', models.CharField(choices=[('blog', 'Blog'), ('casestudy', 'Case Study'), ('service', 'Service'), ('job', 'Job Posting')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('day', models.DateField(blank=True, null=True)),
+                ('registers', models.BinaryField()),
+            ],
+            options={
+                'verbose_name': 'View Sketch',
+                'verbose_name_plural': 'View Sketches',
+                'ordering': ['object_type', 'object_id', '-day'],
+                'indexes': [models.Index(fields=['day'], name='view_sketch_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('object_type', 'object_id', 'day'), name='unique_daily_view_sketch'), models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('object_type', 'object_id'), name='unique_lifetime_view_sketch')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:27
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_viewsketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedLead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lead_type', models.CharField(choices=[('contact', 'Contact'), ('service_lead', 'Service Lead'), ('job_application', 'Job Application'), ('blog_lead', 'Blog Lead'), ('case_study_lead', 'Case Study Lead')], max_length=30)),
+                ('original_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('full_name', models.CharField(blank=True, default='', max_length=200)),
+                ('email', models.CharField(blank=True, default='', max_length=254)),
+                ('utm_source', models.CharField(blank=True, default='', max_length=100)),
+                ('utm_medium', models.CharField(blank=True, default='', max_length=100)),
+                ('utm_campaign', models.CharField(blank=True, default='', max_length=100)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Every column of the original row')),
+            ],
+            options={
+                'verbose_name': 'Archived Lead',
+                'verbose_name_plural': 'Archived Leads',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['lead_type', 'created_at'], name='archived_lead_type_idx'), models.Index(fields=['created_at'], name='archived_lead_created_idx'), models.Index(fields=['email'], name='archived_lead_email_idx')],
+                'constraints': [models.UniqueConstraint(fields=('lead_type', 'original_id'), name='unique_archived_lead')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_archivedlead'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='archivedlead',
+            name='unique_archived_lead',
+        ),
+        migrations.AddConstraint(
+            model_name='archivedlead',
+            constraint=models.UniqueConstraint(fields=('lead_type', 'original_id', 'created_at'), name='unique_archived_lead'),
+        ),
+    ]
@@ -0,0 +1,159 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class TimeStampedModel(models.Model):
+    """Abstract base model with created_at and updated_at fields"""
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class LeadAttributionDaily(TimeStampedModel):
+    """Daily lead counts per UTM source/medium/campaign across every lead table"""
+    LEAD_TYPE_CHOICES = [
+        ('contact', 'Contact'),
+        ('service_lead', 'Service Lead'),
+        ('job_application', 'Job Application'),
+        ('blog_lead', 'Blog Lead'),
+        ('case_study_lead', 'Case Study Lead'),
+    ]
+
+    date = models.DateField()
+    lead_type = models.CharField(max_length=30, choices=LEAD_TYPE_CHOICES)
+    utm_source = models.CharField(max_length=100, blank=True, default='')
+    utm_medium = models.CharField(max_length=100, blank=True, default='')
+    utm_campaign = models.CharField(max_length=100, blank=True, default='')
+    leads_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Lead Attribution (Daily)"
+        verbose_name_plural = "Lead Attribution (Daily)"
+        ordering = ['-date', 'lead_type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'lead_type', 'utm_source', 'utm_medium', 'utm_campaign'],
+                name='unique_daily_lead_attribution',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'utm_campaign']),
+        ]
+
+    def __str__(self):
+        campaign = self.utm_campaign or "(no campaign)"
+        return f"{self.date} {self.get_lead_type_display()} - {campaign}: {self.leads_count}"
+
+
+class EngagementEvent(models.Model):
+    """
+    Append-only log of like/share/download events reported by the frontend.
+    analytics.engagement.rollup() folds pending rows into the content
+    counters; `counted` is None until then, False for duplicates.
+    """
+    OBJECT_TYPE_CHOICES = [
+        ('blog', 'Blog'),
+        ('casestudy', 'Case Study'),
+        ('service', 'Service'),
+    ]
+    EVENT_TYPE_CHOICES = [
+        ('like', 'Like'),
+        ('share', 'Share'),
+        ('download', 'Download'),
+    ]
+
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    visitor_token = models.CharField(max_length=64, blank=True, default='')
+    counted = models.BooleanField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Engagement Event"
+        verbose_name_plural = "Engagement Events"
+        ordering = ['-id']
+        indexes = [
+            # Pending rows for the roll-up
+            models.Index(fields=['id'], condition=models.Q(counted__isnull=True), name='engagement_pending_idx'),
+            # Earlier counted events of the same visitor (dedupe window)
+            models.Index(fields=['visitor_token', 'created_at'], name='engagement_visitor_idx'),
+            models.Index(fields=['created_at'], name='engagement_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} {self.object_type} #{self.object_id}"
+
+
+class ViewSketch(TimeStampedModel):
+    """
+    HyperLogLog sketch of the visitors of one object: per day, or over its
+    lifetime when `day` is empty. Always 256 bytes (see analytics.hyperloglog).
+    """
+    OBJECT_TYPE_CHOICES = [
+        ('blog', 'Blog'),
+        ('casestudy', 'Case Study'),
+        ('service', 'Service'),
+        ('job', 'Job Posting'),
+    ]
+
+    object_type = models.CharField(max_length=20, choices=OBJECT_TYPE_CHOICES)
+    object_id = models.PositiveIntegerField()
+    day = models.DateField(null=True, blank=True)
+    registers = models.BinaryField()
+
+    class Meta:
+        verbose_name = "View Sketch"
+        verbose_name_plural = "View Sketches"
+        ordering = ['object_type', 'object_id', '-day']
+        constraints = [
+            models.UniqueConstraint(fields=['object_type', 'object_id', 'day'], name='unique_daily_view_sketch'),
+            models.UniqueConstraint(
+                fields=['object_type', 'object_id'], condition=models.Q(day__isnull=True),
+                name='unique_lifetime_view_sketch'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['day'], name='view_sketch_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.object_type} #{self.object_id} ({self.day or 'lifetime'})"
+
+
+class ArchivedLead(models.Model):
+    """
+    A lead moved out of its table by `manage.py archive_leads` (see
+    analytics.archive). `data` holds the original row; the other columns are
+    copied out of it for browsing and for the attribution rebuild.
+    """
+    lead_type = models.CharField(max_length=30, choices=LeadAttributionDaily.LEAD_TYPE_CHOICES)
+    original_id = models.BigIntegerField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    full_name = models.CharField(max_length=200, blank=True, default='')
+    email = models.CharField(max_length=254, blank=True, default='')
+    utm_source = models.CharField(max_length=100, blank=True, default='')
+    utm_medium = models.CharField(max_length=100, blank=True, default='')
+    utm_campaign = models.CharField(max_length=100, blank=True, default='')
+    data = models.JSONField(encoder=DjangoJSONEncoder, help_text="Every column of the original row")
+
+    class Meta:
+        verbose_name = "Archived Lead"
+        verbose_name_plural = "Archived Leads"
+        ordering = ['-created_at']
+        constraints = [
+            # With created_at: an id reused after a delete (SQLite) is another lead
+            models.UniqueConstraint(fields=['lead_type', 'original_id', 'created_at'], name='unique_archived_lead'),
+        ]
+        indexes = [
+            models.Index(fields=['lead_type', 'created_at'], name='archived_lead_type_idx'),
+            models.Index(fields=['created_at'], name='archived_lead_created_idx'),
+            models.Index(fields=['email'], name='archived_lead_email_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_lead_type_display()} #{self.original_id} ({self.email or self.full_name or 'anonymous'})"
@@ -0,0 +1,28 @@
+from rest_framework import serializers
+
+from .engagement import ENGAGEMENT_TARGETS
+from .models import EngagementEvent
+
+
+class EngagementEventSerializer(serializers.Serializer):
+    """One reported event: {"type": "like", "object": "blog", "id": 12}"""
+    type = serializers.ChoiceField(choices=EngagementEvent.EVENT_TYPE_CHOICES)
+    object = serializers.ChoiceField(choices=EngagementEvent.OBJECT_TYPE_CHOICES)
+    id = serializers.IntegerField(min_value=1)
+
+    def validate(self, attrs):
+        if attrs['type'] not in ENGAGEMENT_TARGETS[attrs['object']]['counters']:
+            raise serializers.ValidationError(f"{attrs['object']} does not support {attrs['type']} events")
+        return attrs
+
+
+class EngagementBatchSerializer(serializers.Serializer):
+    """A batch of events from one visitor"""
+    visitor_token = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
+    events = EngagementEventSerializer(many=True, allow_empty=False)
+
+    def validate_events(self, value):
+        max_batch = self.context.get('max_batch')
+        if max_batch and len(value) > max_batch:
+            raise serializers.ValidationError(f"At most {max_batch} events per request")
+        return value
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .attribution import lead_type_for_model, record_lead
+
+
+@receiver(post_save)
+def update_lead_attribution(sender, instance, created, raw=False, **kwargs):
+    """
+    Count each new lead into the daily UTM rollup. Lead models save in a
+    transaction (AtomicLeadSaveMixin) and the bulk and spool paths record in
+    theirs, so the row and its increment always commit together.
+    """
+    if not created or raw:
+        return
+    lead_type = lead_type_for_model(sender)
+    if lead_type is None:
+        return
+    record_lead(lead_type, instance)
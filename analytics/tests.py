@@ -0,0 +1,416 @@
+import json
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.db import OperationalError, connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from blog.models import Blog
+from contact.models import Contact
+from martech_influence_backend.filelock import file_lock
+from martech_influence_backend.lead_data import AtomicLeadSaveMixin
+
+from . import attribution, engagement, lead_spool, unique_views
+from .archive import archive_cutoff, archive_leads, to_archived
+from .hyperloglog import REGISTERS, HyperLogLog
+from .models import ArchivedLead, EngagementEvent, LeadAttributionDaily, ViewSketch
+
+
+class LeadSpoolTests(TestCase):
+    def setUp(self):
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        override = override_settings(LEAD_SPOOL_DIR=self.spool.name, LEAD_SPOOL_FSYNC=False, LEAD_SPOOL_MAX_ATTEMPTS=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.spool_dir = lead_spool.get_spool_dir()
+
+    def enqueue(self, name):
+        return lead_spool.enqueue_lead('contact', {'full_name': name, 'email': f'{name.lower()}@example.com'})
+
+    def append(self, data):
+        with open(self.spool_dir / lead_spool.SPOOL_NAME, 'ab') as handle:
+            handle.write(data)
+
+    def record(self, submission_id=None, **fields):
+        return json.dumps({
+            'submission_id': str(submission_id or uuid.uuid4()), 'lead_type': 'contact', 'fields': fields,
+        }).encode()
+
+    def test_flush_writes_spooled_leads(self):
+        first, second = self.enqueue("Ada"), self.enqueue("Grace")
+        self.assertFalse(Contact.objects.exists())
+        self.assertEqual(lead_spool.flush(), (2, 2, 0))
+        self.assertEqual(
+            set(Contact.objects.values_list('submission_id', 'email')),
+            {(first, 'ada@example.com'), (second, 'grace@example.com')},
+        )
+        self.assertEqual(list(self.spool_dir.glob(lead_spool.SEGMENT_GLOB)), [])
+
+    def test_torn_line_is_skipped(self):
+        self.enqueue("Ada")
+        # A crash mid-append leaves half a record; the next append starts on a new line
+        self.append(b'\n' + self.record(full_name="Torn")[:20])
+        self.enqueue("Grace")
+        with self.assertLogs('analytics.lead_spool', 'WARNING'):
+            self.assertEqual(lead_spool.flush(), (2, 2, 0))
+        self.assertEqual(sorted(Contact.objects.values_list('full_name', flat=True)), ["Ada", "Grace"])
+
+    def test_duplicate_submission_id_is_written_once(self):
+        submission_id = uuid.uuid4()
+        self.append(b'\n' + self.record(submission_id, full_name="Ada"))
+        self.append(b'\n' + self.record(submission_id, full_name="Ada"))
+        self.assertEqual(lead_spool.flush(), (2, 1, 0))
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_segment_replayed_after_crash_skips_written_leads(self):
+        for name in ("Ada", "Grace", "Linus"):
+            self.enqueue(name)
+        write_batch = lead_spool.write_batch
+        calls = []
+
+        def crash_on_second_batch(records):
+            calls.append(records)
+            if len(calls) == 2:
+                raise ConnectionError("database went away")
+            return write_batch(records)
+
+        with mock.patch.object(lead_spool, 'write_batch', side_effect=crash_on_second_batch):
+            with self.assertLogs('analytics.lead_spool', 'ERROR'):
+                self.assertEqual(lead_spool.flush(batch_size=1), (0, 1, 0))
+        self.assertEqual(len(list(self.spool_dir.glob(lead_spool.SEGMENT_GLOB))), 1)
+
+        self.assertEqual(lead_spool.flush(batch_size=1), (3, 2, 0))
+        self.assertEqual(sorted(Contact.objects.values_list('full_name', flat=True)), ["Ada", "Grace", "Linus"])
+        self.assertFalse(list(self.spool_dir.glob('*.attempts')))
+
+    def test_failing_record_is_quarantined_after_max_attempts(self):
+        self.enqueue("Ada")
+        poison = uuid.uuid4()
+        self.append(b'\n' + self.record(poison, no_such_field="x"))
+        self.enqueue("Grace")
+
+        with self.assertLogs('analytics.lead_spool', 'ERROR'):
+            self.assertEqual(lead_spool.flush(), (0, 0, 0))
+            # A later segment waits behind the failing one
+            self.enqueue("Linus")
+            self.assertEqual(lead_spool.flush(), (0, 0, 0))
+        self.assertFalse(Contact.objects.exists())
+
+        with self.assertLogs('analytics.lead_spool', 'ERROR') as logs:
+            self.assertEqual(lead_spool.flush(), (4, 3, 1))
+        self.assertIn(str(poison), logs.output[0])
+        self.assertEqual(sorted(Contact.objects.values_list('full_name', flat=True)), ["Ada", "Grace", "Linus"])
+
+        dead = list((self.spool_dir / lead_spool.DEAD_LETTER_DIR).glob('*.jsonl'))
+        self.assertEqual(len(dead), 1)
+        [line] = dead[0].read_text().splitlines()
+        quarantined = json.loads(line)
+        self.assertEqual(quarantined['submission_id'], str(poison))
+        self.assertIn('no_such_field', quarantined['error'])
+        self.assertEqual(list(self.spool_dir.glob(lead_spool.SEGMENT_GLOB)), [])
+
+    def test_concurrent_flush_is_refused(self):
+        with file_lock(self.spool_dir / 'flush.lock'):
+            self.assertIsNone(lead_spool.flush())
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def sketch(self, values):
+        sketch = HyperLogLog()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_estimate_is_within_the_expected_error(self):
+        for cardinality in (10, 1000, 50000):
+            estimate = self.sketch(f'visitor-{n}' for n in range(cardinality)).count()
+            # Three standard errors (~6.5% each)
+            self.assertLess(abs(estimate - cardinality), cardinality * 0.2 + 1, cardinality)
+
+    def test_repeated_values_count_once(self):
+        self.assertEqual(self.sketch(['same'] * 100).count(), 1)
+        self.assertEqual(HyperLogLog().count(), 0)
+
+    def test_merge_is_a_union_and_idempotent(self):
+        first = self.sketch(f'visitor-{n}' for n in range(0, 3000))
+        second = self.sketch(f'visitor-{n}' for n in range(2000, 5000))
+        union = self.sketch(f'visitor-{n}' for n in range(0, 5000))
+        merged = HyperLogLog(first.to_bytes()).merge(second)
+        self.assertEqual(merged.to_bytes(), union.to_bytes())
+        self.assertEqual(HyperLogLog(second.to_bytes()).merge(first).to_bytes(), union.to_bytes())
+        self.assertEqual(merged.merge(second).to_bytes(), union.to_bytes())
+        self.assertEqual(HyperLogLog().merge(first.to_bytes()).count(), first.count())
+
+    def test_registers_must_match_precision(self):
+        self.assertEqual(len(HyperLogLog().to_bytes()), REGISTERS)
+        with self.assertRaises(ValueError):
+            HyperLogLog(bytes(REGISTERS - 1))
+
+
+@override_settings(UNIQUE_VIEWS_FLUSH_SIZE=2)
+class UniqueViewsTests(TestCase):
+    def setUp(self):
+        unique_views._take_buffer()
+        self.addCleanup(unique_views._take_buffer)
+        patcher = mock.patch.object(unique_views, '_ensure_flusher')
+        self.ensure_flusher = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.blog = Blog.objects.create(title="Counted", status='published')
+        self.factory = RequestFactory()
+
+    def view(self, object_id=None, ip='10.0.0.1', user_agent='Mozilla/5.0'):
+        request = self.factory.get('/', REMOTE_ADDR=ip, HTTP_USER_AGENT=user_agent)
+        unique_views.record_view('blog', object_id or self.blog.pk, request)
+
+    def test_record_view_buffers_without_flushing(self):
+        with mock.patch.object(unique_views, 'flush') as flush:
+            self.view()
+            self.view(object_id=self.blog.pk + 1)
+        flush.assert_not_called()
+        self.ensure_flusher.assert_called()
+        # The buffer reached UNIQUE_VIEWS_FLUSH_SIZE: the flusher thread is woken
+        self.assertTrue(unique_views._wake.is_set())
+        unique_views._wake.clear()
+
+    def test_bots_are_not_counted(self):
+        self.view(user_agent='Googlebot/2.1')
+        self.view(user_agent='')
+        self.assertEqual(unique_views._buffer, {})
+
+    def test_flush_writes_daily_and_lifetime_sketches(self):
+        for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.1'):
+            self.view(ip=ip)
+        self.assertEqual(unique_views.flush(), 1)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.unique_views, 2)
+        days = set(ViewSketch.objects.filter(object_type='blog', object_id=self.blog.pk).values_list('day', flat=True))
+        self.assertEqual(days, {None, timezone.localdate()})
+
+        # Merging again is idempotent; a new visitor adds one
+        self.view(ip='10.0.0.2')
+        self.view(ip='10.0.0.3')
+        unique_views.flush()
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.unique_views, 3)
+
+    def test_failed_flush_keeps_sketches_buffered(self):
+        self.view()
+        with mock.patch.object(unique_views, '_flush_type', side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                unique_views.flush()
+        self.assertEqual(len(unique_views._buffer), 1)
+        self.assertEqual(unique_views.flush(), 1)
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.unique_views, 1)
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class EngagementTests(TestCase):
+    def setUp(self):
+        self.blog = Blog.objects.create(title="Liked", status='published')
+
+    def post(self, events, ip='10.0.0.1', **payload):
+        return self.client.post(
+            '/api/analytics/events/', {'events': events, **payload}, content_type='application/json',
+            HTTP_HOST='localhost', REMOTE_ADDR=ip, HTTP_USER_AGENT='Mozilla/5.0',
+        )
+
+    def likes(self):
+        while engagement.rollup()[0]:
+            pass
+        self.blog.refresh_from_db()
+        return self.blog.likes_count
+
+    def test_tokenless_duplicates_are_counted_once(self):
+        like = {'type': 'like', 'object': 'blog', 'id': self.blog.pk}
+        self.assertEqual(self.post([like, like]).status_code, 202)
+        self.assertEqual(self.post([like]).status_code, 202)
+        self.assertEqual(self.likes(), 1)
+        self.assertFalse(EngagementEvent.objects.filter(visitor_token='').exists())
+        # Another client address is another visitor
+        self.post([like], ip='10.0.0.2')
+        self.assertEqual(self.likes(), 2)
+
+    def test_visitor_token_is_used_when_sent(self):
+        like = {'type': 'like', 'object': 'blog', 'id': self.blog.pk}
+        self.post([like], visitor_token='visitor-a')
+        self.post([like], visitor_token='visitor-a')
+        self.post([like], visitor_token='visitor-b')
+        self.assertEqual(self.likes(), 2)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.cutoff = archive_cutoff(365)
+
+    def contact(self, name, days_ago, utm_source=None):
+        contact = Contact.objects.create(full_name=name, email=f'{name.lower()}@example.com', utm_source=utm_source)
+        Contact.objects.filter(pk=contact.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+        contact.refresh_from_db()
+        return contact
+
+    def test_old_leads_are_moved_in_batches(self):
+        old = [self.contact(name, 400) for name in ("Ada", "Grace", "Linus")]
+        recent = self.contact("Recent", 10)
+        self.assertEqual(archive_leads('contact', self.cutoff, batch_size=2), 3)
+        self.assertEqual(list(Contact.objects.all()), [recent])
+        archived = ArchivedLead.objects.get(lead_type='contact', original_id=old[0].pk)
+        self.assertEqual((archived.full_name, archived.email), ("Ada", 'ada@example.com'))
+        self.assertEqual(archived.data['id'], old[0].pk)
+
+    def test_failed_delete_rolls_back_the_copy(self):
+        self.contact("Ada", 400)
+        with mock.patch.object(QuerySet, 'delete', side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                archive_leads('contact', self.cutoff)
+        self.assertFalse(ArchivedLead.objects.exists())
+        self.assertEqual(Contact.objects.count(), 1)
+
+    def test_retry_skips_leads_already_archived(self):
+        ada, grace = self.contact("Ada", 400), self.contact("Grace", 400)
+        # Copied by an earlier run, then the lead came back (restored backup)
+        to_archived('contact', ada).save()
+        self.assertEqual(archive_leads('contact', self.cutoff), 2)
+        self.assertFalse(Contact.objects.exists())
+        self.assertEqual(
+            sorted(ArchivedLead.objects.values_list('original_id', flat=True)), sorted([ada.pk, grace.pk]),
+        )
+
+    def test_reused_id_is_archived_as_another_lead(self):
+        ada = self.contact("Ada", 400)
+        earlier = to_archived('contact', ada)
+        earlier.created_at -= timedelta(days=30)
+        earlier.save()
+        self.assertEqual(archive_leads('contact', self.cutoff), 1)
+        self.assertEqual(ArchivedLead.objects.filter(original_id=ada.pk).count(), 2)
+
+    def test_rebuild_attribution_counts_archived_leads(self):
+        self.contact("Ada", 400, utm_source='Google ')
+        self.contact("Grace", 400, utm_source='google')
+        self.contact("Recent", 10, utm_source='google')
+        archive_leads('contact', self.cutoff)
+        call_command('rebuild_attribution', stdout=mock.MagicMock())
+        counts = LeadAttributionDaily.objects.filter(lead_type='contact', utm_source='google')
+        self.assertEqual(sum(counts.values_list('leads_count', flat=True)), 3)
+        self.assertEqual(counts.count(), 2)
+
+
+class AttributionTests(TestCase):
+    def counts(self, **filters):
+        return set(
+            LeadAttributionDaily.objects.filter(**filters)
+            .values_list('lead_type', 'utm_source', 'utm_medium', 'leads_count')
+        )
+
+    def test_new_lead_is_counted_in_its_transaction(self):
+        Contact.objects.create(full_name="Ada", utm_source=' Google', utm_medium='CPC')
+        Contact.objects.create(full_name="Grace", utm_source='google', utm_medium='cpc')
+        self.assertEqual(self.counts(), {('contact', 'google', 'cpc', 2)})
+        # Edits don't count again; a rolled back lead isn't counted
+        Contact.objects.get(full_name="Ada").save()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Contact.objects.create(full_name="Linus", utm_source='google', utm_medium='cpc')
+            raise RuntimeError
+        self.assertEqual(self.counts(), {('contact', 'google', 'cpc', 2)})
+
+    def test_every_lead_model_saves_atomically(self):
+        for lead_type in attribution.LEAD_SOURCES:
+            self.assertTrue(issubclass(attribution.get_lead_model(lead_type), AtomicLeadSaveMixin), lead_type)
+
+    def test_record_leads_groups_by_day_and_utm(self):
+        leads = [Contact(utm_source=source, created_at=timezone.now()) for source in ('a', 'b', 'a')]
+        attribution.record_leads('contact', leads)
+        self.assertEqual(self.counts(), {('contact', 'a', '', 2), ('contact', 'b', '', 1)})
+
+    def test_rebuild_replaces_only_the_selected_rows(self):
+        Contact.objects.create(full_name="Ada", utm_source='google')
+        LeadAttributionDaily.objects.update(leads_count=40)
+        LeadAttributionDaily.objects.create(
+            date=timezone.localdate(), lead_type='service_lead', utm_source='bing', leads_count=7,
+        )
+        self.assertEqual(attribution.rebuild(lead_types=['contact']), 1)
+        self.assertEqual(self.counts(), {('contact', 'google', '', 1), ('service_lead', 'bing', '', 7)})
+        attribution.rebuild()
+        self.assertEqual(self.counts(), {('contact', 'google', '', 1)})
+
+    def test_rebuild_locks_the_rollup_before_reading_leads(self):
+        calls = []
+        lock, aggregate = attribution._lock_rollup, attribution._aggregate
+
+        def tracked(name, function):
+            def wrapper(*args, **kwargs):
+                calls.append((name, transaction.get_connection().in_atomic_block))
+                return function(*args, **kwargs)
+            return wrapper
+
+        with mock.patch.object(attribution, '_lock_rollup', tracked('lock', lock)), \
+                mock.patch.object(attribution, '_aggregate', tracked('aggregate', aggregate)):
+            attribution.rebuild(lead_types=['contact'])
+        self.assertEqual(calls, [('lock', True), ('aggregate', True)])
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, LEAD_WRITE_BEHIND=False)
+class AttributionRebuildRaceTests(TransactionTestCase):
+    """Real commits: the create views run in autocommit, as in production"""
+
+    def total(self):
+        return sum(LeadAttributionDaily.objects.filter(lead_type='contact').values_list('leads_count', flat=True))
+
+    def start_rebuild(self, finished):
+        def run():
+            try:
+                for _ in range(500):
+                    try:
+                        attribution.rebuild(lead_types=['contact'])
+                        break
+                    except OperationalError as exc:
+                        # The SQLite test database refuses a locked table instead of waiting
+                        if 'locked' not in str(exc):
+                            raise
+                        time.sleep(0.02)
+                finished.set()
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_lead_created_during_a_rebuild_is_counted_once(self):
+        Contact.objects.create(full_name="Earlier", utm_source='google')
+        finished = threading.Event()
+        record_lead = attribution.record_lead
+        threads = []
+
+        def rebuild_before_increment(lead_type, instance):
+            # The new row is written; a rebuild runs before its increment
+            threads.append(self.start_rebuild(finished))
+            finished.wait(0.5)
+            record_lead(lead_type, instance)
+
+        with mock.patch('analytics.signals.record_lead', side_effect=rebuild_before_increment):
+            response = self.client.post(
+                '/api/contact/contacts/', {'full_name': "Ada", 'email': 'ada@example.com', 'utm_source': 'google'},
+                HTTP_HOST='localhost',
+            )
+        self.assertEqual(response.status_code, 201, response.content)
+        threads[0].join(15)
+        self.assertTrue(finished.is_set())
+        self.assertEqual(self.total(), 2)
+        attribution.rebuild(lead_types=['contact'])
+        self.assertEqual(self.total(), 2)
+
+    def test_failed_increment_rolls_back_the_lead(self):
+        with mock.patch('analytics.signals.record_lead', side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                Contact.objects.create(full_name="Ada", utm_source='google')
+        self.assertFalse(Contact.objects.exists())
+        self.assertEqual(self.total(), 0)
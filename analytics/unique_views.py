@@ -0,0 +1,248 @@
+"""
+Unique-visitor view counts.
+
+Detail views call record_view(). Crawlers (matched on the User-Agent) are
+skipped; other visitors are hashed (client IP and User-Agent, keyed with
+SECRET_KEY) into an in-memory HyperLogLog per (object, day). flush() merges
+the buffered sketches into the stored daily and lifetime ViewSketch rows and
+writes the lifetime estimate to the object's `unique_views` column.
+
+Requests never flush: a daemon thread per worker does, every
+UNIQUE_VIEWS_FLUSH_INTERVAL seconds or as soon as UNIQUE_VIEWS_FLUSH_SIZE
+sketches are buffered, and an atexit hook writes what is left when the
+worker stops. A flush that fails puts its sketches back in the buffer;
+merging is idempotent, so a sketch written twice counts nobody twice.
+"""
+import atexit
+import logging
+import os
+import re
+import threading
+from datetime import timedelta
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from martech_influence_backend import metrics
+from martech_influence_backend.ratelimit import get_client_ip
+
+from .hyperloglog import REGISTERS, HyperLogLog, hash_value
+from .models import ViewSketch
+
+
+logger = logging.getLogger(__name__)
+
+# object type -> model with a `unique_views` column
+VIEW_TARGETS = {
+    'blog': 'blog.Blog',
+    'casestudy': 'casestudy.CaseStudy',
+    'service': 'services.Service',
+    'job': 'career.JobPosting',
+}
+
+DEFAULT_BOT_PATTERN = (
+    r'bot|crawl|spider|slurp|archiver|facebookexternalhit|embedly|preview|monitor|pingdom|lighthouse'
+    r'|headless|phantomjs|selenium|curl|wget|python-requests|python-urllib|httpx|aiohttp|go-http-client'
+    r'|java/|okhttp|libwww|scrapy'
+)
+DEFAULT_FLUSH_INTERVAL = 60
+DEFAULT_FLUSH_SIZE = 1000
+DEFAULT_RETENTION_DAYS = 90
+# Rows per IN (...) list, below SQLite's variable limit
+CHUNK_SIZE = 500
+
+_lock = threading.Lock()
+_buffer = {}  # (object_type, object_id, day) -> HyperLogLog
+_wake = threading.Event()
+_flusher = None
+
+
+@lru_cache(maxsize=4)
+def _compile(pattern):
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def is_bot(request):
+    """Crawlers, monitors and scripted clients; requests without a User-Agent count as bots"""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent.strip():
+        return True
+    return bool(_compile(getattr(settings, 'UNIQUE_VIEWS_BOT_PATTERN', DEFAULT_BOT_PATTERN)).search(user_agent))
+
+
+def visitor_hash(request):
+    identity = f"{get_client_ip(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return hash_value(identity, key=settings.SECRET_KEY.encode())
+
+
+def record_view(object_type, object_id, request):
+    """Add the visitor to the object's sketch for today; the flusher thread writes it"""
+    if is_bot(request):
+        metrics.increment('unique_views.bot_skipped', object_type=object_type)
+        return
+    key = (object_type, object_id, timezone.localdate())
+    hashed = visitor_hash(request)
+    with _lock:
+        sketch = _buffer.get(key)
+        if sketch is None:
+            sketch = _buffer[key] = HyperLogLog()
+        sketch.add_hash(hashed)
+        full = len(_buffer) >= getattr(settings, 'UNIQUE_VIEWS_FLUSH_SIZE', DEFAULT_FLUSH_SIZE)
+    _ensure_flusher()
+    if full:
+        _wake.set()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run_flusher, name='unique-views-flusher', daemon=True)
+            _flusher.start()
+
+
+def _run_flusher():
+    while True:
+        _wake.wait(getattr(settings, 'UNIQUE_VIEWS_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL))
+        _wake.clear()
+        _flush_safely()
+
+
+def _flush_safely():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Flushing unique view sketches failed; they stay buffered")
+    finally:
+        # The flusher thread owns this connection; don't keep it open between flushes
+        connection.close()
+
+
+def _reset_after_fork():
+    # A forked worker has no flusher thread and must not write its parent's buffer again
+    global _buffer, _flusher, _lock, _wake
+    _lock = threading.Lock()
+    _wake = threading.Event()
+    _buffer = {}
+    _flusher = None
+
+
+atexit.register(_flush_safely)
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _take_buffer():
+    global _buffer
+    with _lock:
+        buffered, _buffer = _buffer, {}
+    return buffered
+
+
+def _restore(sketches):
+    """Merge sketches that could not be written back into the buffer"""
+    with _lock:
+        for key, sketch in sketches.items():
+            current = _buffer.get(key)
+            _buffer[key] = sketch if current is None else current.merge(sketch)
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def flush():
+    """Merge this worker's buffered sketches into the database. Returns the number of objects updated."""
+    buffered = _take_buffer()
+    if not buffered:
+        return 0
+
+    by_type = {}
+    for (object_type, object_id, day), sketch in buffered.items():
+        by_type.setdefault(object_type, {})[(object_id, day)] = sketch
+
+    updated = 0
+    remaining = list(by_type)
+    try:
+        while remaining:
+            updated += _flush_type(remaining[0], by_type[remaining[0]])
+            remaining.pop(0)
+    except Exception:
+        _restore({
+            (object_type, object_id, day): sketch
+            for object_type in remaining for (object_id, day), sketch in by_type[object_type].items()
+        })
+        raise
+    metrics.increment('unique_views.flushed', len(buffered))
+    return updated
+
+
+def _flush_type(object_type, sketches):
+    """sketches: {(object_id, day): HyperLogLog} for one object type"""
+    lifetime = {}
+    for (object_id, day), sketch in sketches.items():
+        lifetime.setdefault(object_id, HyperLogLog()).merge(sketch)
+    pending = dict(sketches)
+    pending.update({(object_id, None): sketch for object_id, sketch in lifetime.items()})
+    days = sorted({day for _, day in sketches})
+    model = apps.get_model(VIEW_TARGETS[object_type])
+
+    with transaction.atomic():
+        # Create missing rows first, so every row can be locked and merged below
+        ViewSketch.objects.bulk_create(
+            [
+                ViewSketch(object_type=object_type, object_id=object_id, day=day, registers=bytes(REGISTERS))
+                for object_id, day in pending
+            ],
+            ignore_conflicts=True,
+        )
+        rows = []
+        for chunk in _chunks(sorted(lifetime)):
+            rows.extend(
+                ViewSketch.objects.select_for_update()
+                .filter(Q(day__isnull=True) | Q(day__in=days), object_type=object_type, object_id__in=chunk)
+                .only('id', 'object_id', 'day', 'registers', 'updated_at')
+            )
+
+        now = timezone.now()
+        estimates = []
+        changed = []
+        for row in rows:
+            sketch = pending.get((row.object_id, row.day))
+            if sketch is None:
+                continue
+            merged = HyperLogLog(row.registers).merge(sketch)
+            row.registers = merged.to_bytes()
+            row.updated_at = now
+            changed.append(row)
+            if row.day is None:
+                estimates.append(model(pk=row.object_id, unique_views=merged.count()))
+
+        ViewSketch.objects.bulk_update(changed, ['registers', 'updated_at'], batch_size=CHUNK_SIZE)
+        model.objects.bulk_update(estimates, ['unique_views'], batch_size=CHUNK_SIZE)
+    return len(estimates)
+
+
+def unique_views_between(object_type, object_id, start, end):
+    """Estimated unique visitors of one object from `start` to `end` (dates, inclusive)"""
+    sketch = HyperLogLog()
+    days = ViewSketch.objects.filter(
+        object_type=object_type, object_id=object_id, day__gte=start, day__lte=end
+    ).values_list('registers', flat=True)
+    for registers in days:
+        sketch.merge(registers)
+    return sketch.count()
+
+
+def prune(retention_days=None):
+    """Delete daily sketches older than the retention period (lifetime sketches are kept)"""
+    retention_days = retention_days or getattr(settings, 'UNIQUE_VIEWS_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+    cutoff = timezone.localdate() - timedelta(days=retention_days)
+    deleted, _ = ViewSketch.objects.filter(day__lt=cutoff).delete()
+    return deleted
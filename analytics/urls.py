@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import AttributionViewSet, EngagementEventViewSet, MetricsViewSet, UniqueViewsViewSet
+
+attribution_list = AttributionViewSet.as_view({'get': 'list'})
+metrics_list = MetricsViewSet.as_view({'get': 'list'})
+engagement_event_create = EngagementEventViewSet.as_view({'post': 'create'})
+unique_views_list = UniqueViewsViewSet.as_view({'get': 'list'})
+
+urlpatterns = [
+    path('attribution/', attribution_list, name='attribution-list'),
+    path('metrics/', metrics_list, name='metrics-list'),
+    path('events/', engagement_event_create, name='engagement-event-create'),
+    path('unique-views/', unique_views_list, name='unique-views-list'),
+]
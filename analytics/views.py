@@ -0,0 +1,269 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from rest_framework import viewsets, status, permissions
+from django.db.models import Sum
+from django.utils import timezone
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from martech_influence_backend import metrics
+from martech_influence_backend.ratelimit import rate_limit
+from martech_influence_backend.utils import create_response
+from .attribution import LEAD_SOURCES
+from .engagement import fallback_visitor_token, record_events
+from .models import LeadAttributionDaily
+from .serializers import EngagementBatchSerializer
+from .unique_views import VIEW_TARGETS, unique_views_between
+
+
+def parse_date(value):
+    """YYYY-MM-DD -> date (None when empty); raises ValueError otherwise"""
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
+class AttributionViewSet(viewsets.ViewSet):
+    """
+    ViewSet for UTM attribution rollups - staff only
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    GROUP_FIELDS = {
+        'date': 'date',
+        'lead_type': 'lead_type',
+        'source': 'utm_source',
+        'medium': 'utm_medium',
+        'campaign': 'utm_campaign',
+    }
+    DEFAULT_DAYS = 30
+
+    def list(self, request):
+        """
+        Lead counts for a date range grouped by campaign (default) or any of
+        ?group_by=date,lead_type,source,medium,campaign
+        Filters: ?start=YYYY-MM-DD&end=YYYY-MM-DD&lead_type=&source=&medium=&campaign=
+        """
+        try:
+            end = parse_date(request.query_params.get('end')) or timezone.localdate()
+            start = parse_date(request.query_params.get('start')) or end - timedelta(days=self.DEFAULT_DAYS - 1)
+        except ValueError:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="start and end must be dates in YYYY-MM-DD format",
+                message_code="INVALID_DATE_RANGE",
+                status=False
+            )
+        if start > end:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="start must be on or before end",
+                message_code="INVALID_DATE_RANGE",
+                status=False
+            )
+
+        group_by = [name.strip() for name in request.query_params.get('group_by', 'campaign').split(',') if name.strip()]
+        invalid = [name for name in group_by if name not in self.GROUP_FIELDS]
+        if invalid or not group_by:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message=f"group_by must be a comma-separated list of: {', '.join(self.GROUP_FIELDS)}",
+                message_code="INVALID_GROUP_BY",
+                status=False
+            )
+
+        queryset = LeadAttributionDaily.objects.filter(date__gte=start, date__lte=end)
+
+        lead_type = request.query_params.get('lead_type')
+        if lead_type:
+            if lead_type not in LEAD_SOURCES:
+                return create_response(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    message=f"lead_type must be one of: {', '.join(LEAD_SOURCES)}",
+                    message_code="INVALID_LEAD_TYPE",
+                    status=False
+                )
+            queryset = queryset.filter(lead_type=lead_type)
+
+        for param in ('source', 'medium', 'campaign'):
+            value = request.query_params.get(param)
+            if value is not None:
+                queryset = queryset.filter(**{self.GROUP_FIELDS[param]: value.strip().lower()})
+
+        columns = [self.GROUP_FIELDS[name] for name in group_by]
+        rows = (
+            queryset.values(*columns)
+            .annotate(leads=Sum('leads_count'))
+            .order_by('-leads', *columns)
+        )
+
+        results = []
+        total = 0
+        for row in rows:
+            item = {name: row[self.GROUP_FIELDS[name]] for name in group_by}
+            if 'date' in item:
+                item['date'] = item['date'].isoformat()
+            item['leads'] = row['leads']
+            total += row['leads']
+            results.append(item)
+
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Attribution retrieved successfully",
+            message_code="ATTRIBUTION_RETRIEVED",
+            data={
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "group_by": group_by,
+                "total_leads": total,
+                "results": results,
+            }
+        )
+
+
+class MetricsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for process counters (rate limiting etc.) - staff only
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def list(self, request):
+        """Counters of the worker process that served this request"""
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Metrics retrieved successfully",
+            message_code="METRICS_RETRIEVED",
+            status=True,
+            data=metrics.snapshot()
+        )
+
+
+class UniqueViewsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for unique-visitor estimates over a date range - staff only
+    """
+    permission_classes = [permissions.IsAdminUser]
+    DEFAULT_DAYS = 30
+
+    def list(self, request):
+        """
+        Estimated unique visitors of one object, merged from its daily sketches
+        ?object=blog|casestudy|service|job&id=<id>&start=YYYY-MM-DD&end=YYYY-MM-DD
+        """
+        object_type = request.query_params.get('object')
+        if object_type not in VIEW_TARGETS:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message=f"object must be one of: {', '.join(VIEW_TARGETS)}",
+                message_code="INVALID_OBJECT_TYPE",
+                status=False
+            )
+        try:
+            object_id = int(request.query_params.get('id', ''))
+        except ValueError:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="id must be an integer",
+                message_code="INVALID_OBJECT_ID",
+                status=False
+            )
+        try:
+            end = parse_date(request.query_params.get('end')) or timezone.localdate()
+            start = parse_date(request.query_params.get('start')) or end - timedelta(days=self.DEFAULT_DAYS - 1)
+        except ValueError:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="start and end must be dates in YYYY-MM-DD format",
+                message_code="INVALID_DATE_RANGE",
+                status=False
+            )
+        if start > end:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="start must be on or before end",
+                message_code="INVALID_DATE_RANGE",
+                status=False
+            )
+
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Unique views retrieved successfully",
+            message_code="UNIQUE_VIEWS_RETRIEVED",
+            data={
+                "object": object_type,
+                "id": object_id,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "unique_views": unique_views_between(object_type, object_id, start, end),
+            }
+        )
+
+
+class EngagementEventViewSet(viewsets.ViewSet):
+    """
+    ViewSet for engagement event ingestion - POST operations only
+    """
+    DEFAULT_MAX_BATCH = 100
+
+    @swagger_auto_schema(
+        operation_description="""
+        Report a batch of like / share / download events.
+
+        Events are appended to a log and applied to the content counters by
+        `python manage.py rollup_engagement`; repeats from the same
+        `visitor_token` within `ENGAGEMENT_DEDUPE_WINDOW` are counted once.
+        Requests without a token are deduplicated on a hash of the client
+        IP and User-Agent instead.
+
+        **Supported events:** blog: like, share; casestudy: like, share, download; service: like
+        """,
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'visitor_token': openapi.Schema(
+                    type=openapi.TYPE_STRING,
+                    description='Anonymous, stable id of the visitor (used for deduplication; defaults to a hash of IP and User-Agent)',
+                    example='b1c2d3e4-5f60-4a7b-8c9d-0e1f2a3b4c5d'
+                ),
+                'events': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'type': openapi.Schema(type=openapi.TYPE_STRING, enum=['like', 'share', 'download']),
+                            'object': openapi.Schema(type=openapi.TYPE_STRING, enum=['blog', 'casestudy', 'service']),
+                            'id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        },
+                        required=['type', 'object', 'id']
+                    ),
+                    example=[{"type": "like", "object": "blog", "id": 12}, {"type": "download", "object": "casestudy", "id": 3}]
+                )
+            },
+            required=['events']
+        ),
+        responses={
+            202: openapi.Response(description='Events accepted'),
+            400: openapi.Response(description='Bad request - validation errors')
+        },
+        tags=['Engagement']
+    )
+    @rate_limit('engagement')
+    def create(self, request):
+        max_batch = getattr(settings, 'ENGAGEMENT_MAX_BATCH', self.DEFAULT_MAX_BATCH)
+        serializer = EngagementBatchSerializer(data=request.data, context={'max_batch': max_batch})
+        if not serializer.is_valid():
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="Invalid data",
+                message_code="INVALID_ENGAGEMENT_EVENTS",
+                data=serializer.errors,
+                status=False
+            )
+        visitor_token = serializer.validated_data['visitor_token'] or fallback_visitor_token(request)
+        accepted = record_events(serializer.validated_data['events'], visitor_token)
+        return create_response(
+            status_code=status.HTTP_202_ACCEPTED,
+            message="Events accepted",
+            message_code="ENGAGEMENT_EVENTS_ACCEPTED",
+            data={"accepted": accepted}
+        )
@@ -0,0 +1,157 @@
+"""
+Cold start benchmark: import time (python -X importtime) and time to first
+request of a fresh worker process.
+
+    python benchmarks/startup.py [--runs 7] [--path /api/blog/blogs/] [--budget-ms 750] [--json]
+
+Exits with status 1 when the median time to first request is over budget or a
+module that should load lazily (docs, admin, import-export) is imported at
+startup. Run it against a migrated database.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Median time to first request (ms), interpreter start included
+DEFAULT_BUDGET_MS = 750
+
+# Must not be imported before they are used (see martech_influence_backend/lazy.py)
+DEFERRED_MODULES = [
+    'drf_yasg.views',
+    'swagger_spec_validator',
+    'import_export.admin',
+    'import_export.formats.base_formats',
+    'tinymce.views',
+    'martech_influence_backend.docs',
+    'martech_influence_backend.admin_urls',
+    'blog.admin',
+    'casestudy.admin',
+]
+
+SETUP_CODE = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'martech_influence_backend.settings')
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+"""
+
+REQUEST_CODE = SETUP_CODE + """
+import io, sys
+from wsgiref.util import setup_testing_defaults
+environ = {'PATH_INFO': sys.argv[1], 'wsgi.input': io.BytesIO()}
+setup_testing_defaults(environ)
+statuses = []
+body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+b''.join(body)
+print(statuses[0])
+if len(sys.argv) > 2:
+    print(' '.join(sorted(sys.modules)))
+"""
+
+
+def run_python(args, code, extra_args=()):
+    env = dict(os.environ, PYTHONPATH=str(BASE_DIR))
+    return subprocess.run(
+        [sys.executable, *args, '-c', code, *extra_args],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+
+
+def import_profile(path, top):
+    """
+    Total import time and the slowest top-level imports of a first request.
+    importtime does not list every module, so the lazy-module check uses the
+    child's sys.modules instead.
+    """
+    result = run_python(['-X', 'importtime'], REQUEST_CODE, [path, '--modules'])
+    if result.returncode:
+        raise SystemExit(f"First request failed:\n{result.stderr}")
+    imported = set(result.stdout.splitlines()[-1].split())
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.replace('import time:', '', 1).split('|', 2)
+        modules.append((name.rstrip(), int(self_us), int(cumulative_us)))
+
+    # importtime indents nested imports by two spaces after one leading space
+    roots = [(name.strip(), cumulative) for name, _, cumulative in modules if not name.startswith('   ')]
+    roots.sort(key=lambda entry: entry[1], reverse=True)
+    return {
+        'total_ms': round(sum(self_us for _, self_us, _ in modules) / 1000, 1),
+        'modules': len(imported),
+        'slowest': [{'module': name, 'ms': round(cumulative / 1000, 1)} for name, cumulative in roots[:top]],
+        'eager_deferred': [
+            name for name in DEFERRED_MODULES
+            if name in imported
+        ],
+    }
+
+
+def time_to_first_request(path, runs):
+    timings = []
+    status = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = run_python([], REQUEST_CODE, [path])
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.returncode:
+            raise SystemExit(f"First request failed:\n{result.stderr}")
+        status = result.stdout.strip()
+    return {
+        'path': path,
+        'status': status,
+        'median_ms': round(statistics.median(timings), 1),
+        'min_ms': round(min(timings), 1),
+        'max_ms': round(max(timings), 1),
+        'runs': runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--path', default='/api/blog/blogs/', help="URL of the first request")
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', DEFAULT_BUDGET_MS)))
+    parser.add_argument('--top', type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument('--json', action='store_true', help="Print machine readable results")
+    options = parser.parse_args()
+
+    results = {
+        'imports': import_profile(options.path, options.top),
+        'first_request': time_to_first_request(options.path, options.runs),
+        'budget_ms': options.budget_ms,
+    }
+    over_budget = results['first_request']['median_ms'] > options.budget_ms
+    results['ok'] = not over_budget and not results['imports']['eager_deferred']
+
+    if options.json:
+        print(json.dumps(results, indent=2))
+    else:
+        imports = results['imports']
+        first_request = results['first_request']
+        print(f"Imports: {imports['modules']} modules, {imports['total_ms']} ms")
+        for entry in imports['slowest']:
+            print(f"  {entry['ms']:>8} ms  {entry['module']}")
+        print(
+            f"First request {first_request['path']} ({first_request['status']}): "
+            f"median {first_request['median_ms']} ms, min {first_request['min_ms']} ms, "
+            f"max {first_request['max_ms']} ms over {first_request['runs']} runs "
+            f"(budget {options.budget_ms:g} ms)"
+        )
+        if imports['eager_deferred']:
+            print(f"Imported at startup but should be lazy: {', '.join(imports['eager_deferred'])}")
+        print('OK' if results['ok'] else 'FAILED')
+
+    return 0 if results['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
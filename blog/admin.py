@@ -5,6 +5,8 @@ from django.urls import reverse
 from django import forms
 from tinymce.widgets import TinyMCE
 from .models import Category, Tag, Blog, BlogLeads
+from catalog.signals import content_bulk_changed
+from martech_influence_backend.lead_data import LeadDataSearchMixin
 
 
 class BlogAdminForm(forms.ModelForm):
@@ -90,11 +92,12 @@ class BlogAdmin(admin.ModelAdmin):
         'engagement_score', 'created_at', 'published_at'
     ]
     list_filter = ['status', 'is_featured', 'is_pinned', 'category', 'tags', 'created_at', 'published_at']
-    search_fields = ['title', 'short_title', 'content', 'short_description', 'meta_keywords']
+    search_fields = ['title', 'short_title', 'content_text', 'short_description', 'meta_keywords']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = [
-        'created_at', 'updated_at', 'views_count', 'likes_count',
-        'shares_count', 'banner_image_preview', 'mobile_image_preview', 'engagement_score_display', 'content_preview'
+        'created_at', 'updated_at', 'views_count', 'unique_views', 'likes_count',
+        'shares_count', 'banner_image_preview', 'engagement_score_display', 'content_preview',
+        'word_count', 'reading_time'
     ]
     filter_horizontal = ['tags']
     date_hierarchy = 'created_at'
@@ -107,11 +110,11 @@ class BlogAdmin(admin.ModelAdmin):
             'classes': ('wide',),
         }),
         ('📄 Content', {
-            'fields': ('short_description', 'content', 'content_preview', 'estimated_time'),
+            'fields': ('short_description', 'content', 'content_preview', 'word_count', 'reading_time', 'estimated_time'),
             'classes': ('wide',),
         }),
         ('🖼️ Images', {
-            'fields': ('banner_image', 'banner_image_preview', 'mobile_image', 'mobile_image_preview'),
+            'fields': ('banner_image', 'banner_image_preview', 'logo_image', 'lp_image'),
             'classes': ('wide',),
         }),
         ('🔍 SEO Settings', {
@@ -122,7 +125,7 @@ class BlogAdmin(admin.ModelAdmin):
             'fields': ('is_featured', 'is_pinned', 'published_at')
         }),
         ('📊 Engagement Metrics', {
-            'fields': ('views_count', 'likes_count', 'shares_count', 'engagement_score_display'),
+            'fields': ('views_count', 'unique_views', 'likes_count', 'shares_count', 'engagement_score_display'),
             'classes': ('collapse',)
         }),
         ('🕐 Timestamps', {
@@ -168,10 +171,10 @@ class BlogAdmin(admin.ModelAdmin):
     is_featured_badge.short_description = 'Featured'
 
     def estimated_time_display(self, obj):
-        if obj.estimated_time:
+        if obj.estimated_time or obj.reading_time:
             return format_html(
                 '<span style="background-color: #17a2b8; color: white; padding: 3px 8px; border-radius: 10px; font-size: 11px;">⏱ {} min</span>',
-                obj.estimated_time
+                obj.estimated_time or obj.reading_time
             )
         return mark_safe('<span style="color: #999;">—</span>')
     estimated_time_display.short_description = 'Read Time'
@@ -274,11 +277,9 @@ class BlogAdmin(admin.ModelAdmin):
     mobile_image_preview.short_description = "📱 Mobile Image Preview"
 
     def content_preview(self, obj):
-        if obj.content:
-            content = obj.content[:500] + "..." if len(obj.content) > 500 else obj.content
-            # Strip HTML tags for preview
-            import re
-            clean_content = re.sub(r'<[^>]+>', '', content)
+        if obj.content_text:
+            # Plain text is derived from the content on save
+            clean_content = obj.content_text[:500] + "..." if len(obj.content_text) > 500 else obj.content_text
             return format_html(
                 '<div style="max-height: 350px; overflow-y: auto; padding: 20px; background: linear-gradient(135deg, #e0f2fe 0%, #bae6fd 100%); border-radius: 12px; border: 2px solid #0ea5e9; margin: 15px 0; box-shadow: 0 4px 6px rgba(0,0,0,0.1);">'
                 '<h4 style="margin: 0 0 15px 0; color: #0369a1; font-size: 16px; font-weight: bold; display: flex; align-items: center;">'
@@ -298,27 +299,35 @@ class BlogAdmin(admin.ModelAdmin):
 
     def make_published(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='published', published_at=timezone.now())
+        now = timezone.now()
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='published', published_at=now, updated_at=now)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} blog(s) marked as published.')
     make_published.short_description = "Mark selected blogs as published"
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(status='draft')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='draft', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} blog(s) marked as draft.')
     make_draft.short_description = "Mark selected blogs as draft"
 
     def make_archived(self, request, queryset):
-        updated = queryset.update(status='archived')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='archived', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} blog(s) marked as archived.')
     make_archived.short_description = "Mark selected blogs as archived"
 
 
 @admin.register(BlogLeads)
-class BlogLeadsAdmin(admin.ModelAdmin):
+class BlogLeadsAdmin(LeadDataSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'blog', 'dynamic_columns', 'created_at')
     readonly_fields = ('formatted_data','created_at', 'updated_at')
     list_filter = ('blog', 'created_at')
-    search_fields = ('data',)
 
     fieldsets = (
         ('Blog Info', {
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_blog_processed_content'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', '-published_at'], name='blog_blog_status_0145f8_idx'),
+        ),
+    ]
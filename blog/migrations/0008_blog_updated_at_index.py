@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_blog_unique_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['updated_at', 'id'], name='blog_blog_updated_34a699_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+# Admin search matches full_name and company with istartswith, which PostgreSQL runs as
+# UPPER("column"::text) LIKE UPPER('term%'). A plain index on the column can't serve
+# that, an expression index on the same UPPER(...) with text_pattern_ops can. PostgreSQL
+# only, so the indexes aren't declared on the model
+COLUMNS = ('full_name', 'company')
+
+
+def create_name_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for column in COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS blog_blogleads_{column}_upper_like '
+                f'ON blog_blogleads (UPPER({column}::text) text_pattern_ops)'
+            )
+
+
+def drop_name_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for column in COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS blog_blogleads_{column}_upper_like')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_blogleads_lead_data_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_search_indexes, drop_name_search_indexes),
+    ]
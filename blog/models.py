@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
+from martech_influence_backend.content import PROCESSED_FIELDS, process_instance
+from martech_influence_backend.lead_data import LEAD_DATA_FIELDS, AtomicLeadSaveMixin, extract_instance
 
 from casestudy.models import CaseStudy
 
@@ -97,6 +99,14 @@ class Blog(TimeStampedModel):
     lp_image = models.ImageField(upload_to='casestudy_images/lp/', blank=True, null=True, help_text="Landing page image (Recommended: 600x600)")
     estimated_time = models.PositiveIntegerField(help_text="Estimated reading time in minutes", null=True, blank=True)
 
+    # Derived from content on save (martech_influence_backend.content)
+    content_html = models.TextField(null=True, blank=True, editable=False, help_text="Sanitized content HTML with heading anchors")
+    content_text = models.TextField(null=True, blank=True, editable=False, help_text="Plain text of the content, used for search")
+    excerpt = models.CharField(max_length=320, null=True, blank=True, editable=False, help_text="Auto excerpt of the content")
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=0, editable=False, help_text="Computed reading time in minutes")
+    toc = models.JSONField(default=list, blank=True, editable=False, help_text="Table of contents: [{level, text, id}]")
+
     # SEO fields
     meta_title = models.CharField(max_length=200, blank=True, null=True)
     meta_description = models.TextField(max_length=300, blank=True, null=True)
@@ -109,8 +119,10 @@ class Blog(TimeStampedModel):
 
     # Engagement metrics
     views_count = models.PositiveIntegerField(default=0, null=True, blank=True)
+    unique_views = models.PositiveIntegerField(default=0, editable=False, help_text="Estimated unique visitors (HyperLogLog), bots excluded")
     likes_count = models.PositiveIntegerField(default=0, null=True, blank=True)
     shares_count = models.PositiveIntegerField(default=0, null=True, blank=True)
+    trending_score = models.FloatField(default=0, editable=False, help_text="Time-decayed engagement, see catalog/trending.py")
 
     # Timestamps
     published_at = models.DateTimeField(null=True, blank=True)
@@ -121,6 +133,10 @@ class Blog(TimeStampedModel):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['slug']),
+            models.Index(fields=['status', '-published_at']),
+            models.Index(fields=['status', '-trending_score']),
+            # Delta sync (catalog/sync.py) pages by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -133,20 +149,47 @@ class Blog(TimeStampedModel):
         if self.status == 'published' and not self.published_at:
             from django.utils import timezone
             self.published_at = timezone.now()
+        # Re-derive the processed content unless only unrelated fields are saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'content' in update_fields:
+            process_instance(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(PROCESSED_FIELDS)
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse('blog:detail', kwargs={'slug': self.slug})
 
 
-class BlogLeads(TimeStampedModel):
+class BlogLeads(AtomicLeadSaveMixin, TimeStampedModel):
     blog = models.ForeignKey(
         Blog, on_delete=models.CASCADE, related_name='field_values'
     )
     data = models.JSONField(default=dict,blank=True,
         help_text="Stores dynamic lead data like name, email, mobile etc"
     )
+    # Set when accepted through the write-behind spool (analytics/lead_spool.py)
+    submission_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+    # Extracted from `data` on save (martech_influence_backend/lead_data.py) for indexed lookups
+    email = models.CharField(max_length=254, null=True, blank=True, editable=False, db_index=True)
+    phone = models.CharField(max_length=32, null=True, blank=True, editable=False, db_index=True, help_text="Digits only")
+    full_name = models.CharField(max_length=200, null=True, blank=True, editable=False)
+    company = models.CharField(max_length=200, null=True, blank=True, editable=False)
+    utm_source = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    utm_medium = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    utm_campaign = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    utm_term = models.CharField(max_length=100, null=True, blank=True, editable=False)
+    utm_content = models.CharField(max_length=100, null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"Lead for {self.blog.title}"
+
+    def save(self, *args, **kwargs):
+        # Re-extract the lookup columns unless only unrelated fields are saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'data' in update_fields:
+            extract_instance(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(LEAD_DATA_FIELDS)
+        super().save(*args, **kwargs)
     
\ No newline at end of file
@@ -1,3 +1,166 @@
-from django.test import TestCase
+import calendar
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .models import Blog, BlogLeads
+
+
+@override_settings(RATE_LIMIT_ENABLED=False)
+class BlogConditionalGetTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.blog = Blog.objects.create(title="Conditional requests", status='published')
+        self.url = f'/api/blog/blogs/{self.blog.pk}/'
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, HTTP_HOST='localhost', **headers)
+
+    def test_etag_is_weak_and_matches_with_304(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        not_modified = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertEqual(not_modified.content, b'')
+        # Clients may send the opaque tag without the weak prefix
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag[2:]).status_code, 304)
+
+    def test_304_from_if_modified_since(self):
+        response = self.get()
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+    def test_same_etag_when_compressed(self):
+        plain = self.get()
+        compressed = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['ETag'], plain['ETag'])
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=compressed['ETag'], HTTP_ACCEPT_ENCODING='gzip').status_code, 304)
+
+    def test_edit_changes_etag(self):
+        etag = self.get()['ETag']
+        self.blog.title = "Conditional requests, revised"
+        self.blog.save()
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_counter_update_keeps_etag(self):
+        etag = self.get()['ETag']
+        Blog.objects.filter(pk=self.blog.pk).update(likes_count=5)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_412_for_failed_preconditions(self):
+        response = self.get()
+        self.assertEqual(self.get(HTTP_IF_MATCH='"something-else"').status_code, 412)
+        # Weak ETags never satisfy the strong comparison of If-Match
+        self.assertEqual(self.get(HTTP_IF_MATCH=response['ETag']).status_code, 412)
+        self.assertEqual(self.get(HTTP_IF_UNMODIFIED_SINCE=http_date(86400)).status_code, 412)
+
+    def test_query_string_changes_etag(self):
+        etag = self.get()['ETag']
+        sparse = self.get(f'{self.url}?fields=id,title', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(sparse.status_code, 200)
+        self.assertNotEqual(sparse['ETag'], etag)
+        # Parameter order does not matter
+        first = self.get(f'{self.url}?fields=id&a=1')['ETag']
+        self.assertEqual(self.get(f'{self.url}?a=1&fields=id')['ETag'], first)
+
+    def test_unpublished_blog_has_no_validators(self):
+        self.blog.status = 'draft'
+        self.blog.save()
+        response = self.get()
+        self.assertFalse(response.has_header('ETag'))
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, ACTION_CACHE_ENABLED=False)
+class BlogListOrderingTests(TestCase):
+    def setUp(self):
+        self.popular = Blog.objects.create(title="Popular", status='published', views_count=50)
+        self.quiet = Blog.objects.create(title="Quiet", status='published', views_count=5)
+
+    def titles(self, query):
+        response = self.client.get(f'/api/blog/blogs/?{query}', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200, response.content)
+        return [item['title'] for item in response.json()['data']]
+
+    def test_declared_and_legacy_orderings(self):
+        self.assertEqual(self.titles('ordering=-created_at'), ["Quiet", "Popular"])
+        with self.assertLogs('martech_influence_backend.filtering', 'WARNING'):
+            self.assertEqual(self.titles('ordering=-views_count'), ["Popular", "Quiet"])
+            self.assertEqual(self.titles('ordering=views_count'), ["Quiet", "Popular"])
+            self.assertEqual(self.titles('ordering=title'), ["Popular", "Quiet"])
+
+    def test_unknown_ordering_is_400(self):
+        response = self.client.get('/api/blog/blogs/?ordering=content', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message_code'], 'INVALID_ORDERING')
+
+    @override_settings(ACTION_CACHE_ENABLED=True)
+    def test_legacy_orderings_are_marked_deprecated(self):
+        caches['default'].clear()
+        response = self.client.get('/api/blog/blogs/?ordering=-created_at', HTTP_HOST='localhost')
+        self.assertNotIn('Deprecation', response)
+        # A response served from the action cache is marked all the same
+        for expected in ('MISS', 'HIT'):
+            with self.assertLogs('martech_influence_backend.filtering', 'WARNING') as logs:
+                response = self.client.get('/api/blog/blogs/?ordering=-views_count', HTTP_HOST='localhost')
+            self.assertEqual(response['Deprecation'], 'true')
+            self.assertNotIn('Sunset', response)
+            self.assertEqual(response['X-Cache'], expected)
+            self.assertIn('-views_count on blog.Blog', logs.output[0])
+
+    def test_legacy_orderings_are_retired_at_the_sunset(self):
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with override_settings(LEGACY_ORDERINGS_SUNSET=tomorrow.isoformat()), self.assertLogs('martech_influence_backend.filtering'):
+            response = self.client.get('/api/blog/blogs/?ordering=title', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Sunset'], http_date(calendar.timegm(tomorrow.timetuple())))
+        with override_settings(LEGACY_ORDERINGS_SUNSET=timezone.localdate().isoformat()):
+            response = self.client.get('/api/blog/blogs/?ordering=-title', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message_code'], 'INVALID_ORDERING')
+        self.assertNotIn('title', response.json()['data']['allowed_orderings'])
+        self.assertNotIn('Deprecation', response)
+
+
+class BlogLeadsAdminSearchTests(TestCase):
+    def setUp(self):
+        blog = Blog.objects.create(title="Leads", status='published')
+        self.ada = BlogLeads.objects.create(blog=blog, data={
+            "Email Address": "Ada@Example.com", "Mobile No": "+44 20 7946 0018", "Company": "Analytical Engines",
+            "First Name": "Ada", "Last Name": "Lovelace",
+        })
+        self.grace = BlogLeads.objects.create(blog=blog, data={
+            "email": "grace@navy.example", "phone": "555-0100", "name": "Grace Hopper", "organisation": "US Navy",
+        })
+        self.model_admin = site._registry[BlogLeads]
+
+    def search(self, term):
+        request = RequestFactory().get('/admin/blog/blogleads/', {'q': term})
+        queryset, may_have_duplicates = self.model_admin.get_search_results(request, BlogLeads.objects.all(), term)
+        self.assertFalse(may_have_duplicates)
+        return set(queryset)
+
+    def test_columns_are_extracted_on_save(self):
+        self.assertEqual(
+            (self.ada.email, self.ada.phone, self.ada.full_name, self.ada.company),
+            ('ada@example.com', '442079460018', "Ada Lovelace", "Analytical Engines"),
+        )
+
+    def test_search_by_email_phone_name_and_company(self):
+        self.assertEqual(self.search("ADA@example"), {self.ada})
+        self.assertEqual(self.search("+44 20 79"), {self.ada})
+        self.assertEqual(self.search("555 01"), {self.grace})
+        self.assertEqual(self.search("grace h"), {self.grace})
+        self.assertEqual(self.search("analytical"), {self.ada})
+        self.assertEqual(self.search("us navy"), {self.grace})
+        # Prefix match only
+        self.assertEqual(self.search("Lovelace"), set())
+        self.assertEqual(self.search("  "), {self.ada, self.grace})
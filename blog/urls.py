@@ -4,6 +4,7 @@ from .views import BlogViewSet, BlogLeadsViewSet
 blog_list = BlogViewSet.as_view({'get': 'list'})
 blog_detail = BlogViewSet.as_view({'get': 'retrieve'})
 blog_lead_create = BlogLeadsViewSet.as_view({'post': 'create'})
+blog_lead_bulk_create = BlogLeadsViewSet.as_view({'post': 'bulk_create'})
 blog_dynamic_fields = BlogViewSet.as_view({'get': 'dynamic_fields'}) 
 
 urlpatterns = [
@@ -11,4 +12,5 @@ urlpatterns = [
     path('blogs/<int:pk>/', blog_detail, name='blog-detail'),
     path('blogs/dynamic-fields/', blog_dynamic_fields, name='blog-dynamic-fields'),
     path('blog-leads/', blog_lead_create, name='blog-lead-create'),
+    path('blog-leads/bulk/', blog_lead_bulk_create, name='blog-lead-bulk-create'),
 ]
@@ -1,9 +1,21 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
-from django.db.models import Q
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.conditional import conditional_get
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.filtering import FilterSet, FilterSetMixin, Filter, Ordering, parse_bool
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset, wants_field
+from martech_influence_backend.ratelimit import rate_limit
+from analytics.bulk_leads import bulk_create_leads
+from analytics.lead_spool import enqueue_lead, write_behind_enabled
+from analytics.unique_views import record_view
+from catalog.related import with_related
 from .models import Blog, BlogLeads, BlogDynamicField
 from .serializers import (
     BlogListSerializer, BlogDetailSerializer,
@@ -11,54 +23,48 @@ from .serializers import (
 )
 
 
-class BlogViewSet(viewsets.ViewSet):
+class BlogViewSet(FilterSetMixin, viewsets.ViewSet):
     """
     ViewSet for Blog - GET operations only
     """
     
+    filterset = FilterSet(
+        Blog,
+        filters={
+            'category': Filter('category__slug'),
+            'tag': Filter('tags__slug', distinct=True),
+            'is_featured': Filter('is_featured', parse_bool, index=False),
+        },
+        search=['title', 'short_title', 'short_description', 'content_text'],
+        orderings={
+            'created_at': Ordering('created_at', index=['created_at']),
+            'published_at': Ordering('published_at', index=['status', 'published_at'], nulls_last=True),
+            # Stored by `manage.py compute_trending_scores`
+            'trending': Ordering('trending_score', index=['status', 'trending_score'], then=['-created_at']),
+        },
+        default_ordering='-created_at',
+        # Accepted before orderings were declared; deprecated and sorted without an index
+        legacy_orderings=['id', 'title', 'updated_at', 'views_count', 'likes_count', 'shares_count', 'trending_score'],
+    )
+
     def get_queryset(self):
-        queryset = Blog.objects.select_related('author', 'category').prefetch_related('tags').filter(status='published')
-        
-        # Skip filtering during schema generation
-        if getattr(self, 'swagger_fake_view', False) or not hasattr(self, 'request') or self.request is None:
-            return queryset
-        
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category__slug=category)
-        
-        # Filter by tag
-        tag = self.request.query_params.get('tag', None)
-        if tag:
-            queryset = queryset.filter(tags__slug=tag)
-        
-        # Filter by featured
-        is_featured = self.request.query_params.get('is_featured', None)
-        if is_featured is not None:
-            queryset = queryset.filter(is_featured=is_featured.lower() == 'true')
-        
-        # Search
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(short_title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(content__icontains=search)
-            )
-        
-        # Order by
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        queryset = queryset.order_by(ordering)
-        
-        return queryset.distinct()
+        return Blog.objects.select_related('author', 'category').prefetch_related('tags').filter(status='published')
     
+    @cache_headers('blog', related={'category': 'blog-category', 'tags': 'blog-tag'})
+    @cached_action(depends_on=['blog.Blog', 'blog.Category', 'blog.Tag', 'blog.BlogDynamicField', 'auth.User'])
+    @read_from_replica
     def list(self, request):
         """List all published blogs with pagination"""
         from rest_framework.pagination import PageNumberPagination
         
-        queryset = self.get_queryset()
+        fields, error_response = get_sparse_fields(request, BlogListSerializer)
+        if error_response:
+            return error_response
+
+        queryset, error_response = self.apply_filterset(self.get_queryset())
+        if error_response:
+            return error_response
+        queryset = project_queryset(queryset, BlogListSerializer, fields)
         
         # Pagination
         paginator = PageNumberPagination()
@@ -66,7 +72,7 @@ class BlogViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = BlogListSerializer(page, many=True)
+            serializer = BlogListSerializer(page, many=True, fields=fields)
             paginated_response = paginator.get_paginated_response(serializer.data)
             
             return create_response(
@@ -79,7 +85,7 @@ class BlogViewSet(viewsets.ViewSet):
                 previous_link=paginated_response.data.get('previous')
             )
         
-        serializer = BlogListSerializer(queryset, many=True)
+        serializer = BlogListSerializer(queryset, many=True, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Blogs retrieved successfully",
@@ -87,10 +93,21 @@ class BlogViewSet(viewsets.ViewSet):
             data=serializer.data
         )
     
+    @cache_headers('blog', related={'category': 'blog-category', 'tags': 'blog-tag'})
+    @read_from_replica
+    @conditional_get(Blog, BlogDetailSerializer, depends_on=['blog.Blog', 'blog.Category', 'blog.Tag', 'auth.User'],
+                     filters={'status': 'published'}, view_type='blog')
     def retrieve(self, request, pk=None):
         """Retrieve a single blog"""
+        fields, error_response = get_sparse_fields(request, BlogDetailSerializer)
+        if error_response:
+            return error_response
+
+        queryset = Blog.objects.select_related('author', 'category').prefetch_related('tags')
+        if wants_field(fields, 'related_items'):
+            queryset = with_related(queryset, 'blog')
         try:
-            blog = Blog.objects.select_related('author', 'category').prefetch_related('tags').get(pk=pk, status='published')
+            blog = project_queryset(queryset, BlogDetailSerializer, fields).get(pk=pk, status='published')
         except Blog.DoesNotExist:
             return create_response(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -99,11 +116,13 @@ class BlogViewSet(viewsets.ViewSet):
                 status=False
             )
         
-        # Increment views count
-        blog.views_count += 1
-        blog.save(update_fields=['views_count'])
+        # Increment views count; the row may have been loaded without the column
+        Blog.objects.filter(pk=blog.pk).update(views_count=Coalesce(F('views_count'), 0) + 1)
+        if 'views_count' not in blog.get_deferred_fields():
+            blog.views_count = (blog.views_count or 0) + 1
+        record_view('blog', blog.pk, request)
         
-        serializer = BlogDetailSerializer(blog)
+        serializer = BlogDetailSerializer(blog, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Blog retrieved successfully",
@@ -224,13 +243,23 @@ class BlogLeadsViewSet(viewsets.ViewSet):
                     }
                 }
             ),
+            202: openapi.Response(description='Accepted into the write-behind queue (LEAD_WRITE_BEHIND); returns submission_id'),
             400: openapi.Response(description='Bad request - validation errors')
         },
         tags=['Blog Leads']
     )
+    @rate_limit('blog_lead')
     def create(self, request):
         serializer = BlogLeadsCreateSerializer(data=request.data)
         if serializer.is_valid():
+            if write_behind_enabled():
+                # Written by `manage.py flush_lead_spool`
+                return create_response(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    message="Lead received",
+                    message_code="BLOG_LEAD_QUEUED",
+                    data={"submission_id": enqueue_lead('blog_lead', serializer.validated_data)}
+                )
             lead = serializer.save()
             return create_response(
                 status_code=status.HTTP_201_CREATED,
@@ -248,4 +277,26 @@ class BlogLeadsViewSet(viewsets.ViewSet):
             message_code="INVALID_LEAD_DATA",
             data=serializer.errors,
             status=False
-        )
\ No newline at end of file
+        )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Submit up to LEAD_BULK_MAX_ITEMS blog leads at once (partner integrations). "
+            "Body: a JSON array, or NDJSON with Content-Type application/x-ndjson, of items shaped like "
+            "the single create endpoint, each with an optional submission_id (UUID) for safe retries. "
+            "Requires the blog.add_blogleads permission (HTTP Basic auth)."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={
+            200: openapi.Response(description='Per-item results: created (with id), duplicate or invalid (with errors)'),
+            400: openapi.Response(description='Body is not a JSON array or NDJSON'),
+            401: openapi.Response(description='Authentication required'),
+            403: openapi.Response(description='Missing blog.add_blogleads permission'),
+            413: openapi.Response(description='More than LEAD_BULK_MAX_ITEMS items'),
+        },
+        tags=['Blog Leads']
+    )
+    @rate_limit('lead_bulk')
+    def bulk_create(self, request):
+        """Create many blog leads in one request"""
+        return bulk_create_leads(request, 'blog_lead', BlogLeadsCreateSerializer, "BLOG_LEADS_BULK_PROCESSED")
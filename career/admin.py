@@ -8,6 +8,7 @@ from .models import (
     Department, JobCategory, JobLocation, JobType,
     JobPosting, JobApplication
 )
+from catalog.signals import content_bulk_changed
 
 
 class JobPostingAdminForm(forms.ModelForm):
@@ -185,7 +186,7 @@ class JobPostingAdmin(admin.ModelAdmin):
     ]
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = [
-        'created_at', 'updated_at', 'views_count', 'applications_count',
+        'created_at', 'updated_at', 'views_count', 'unique_views', 'applications_count',
         'shares_count', 'published_at', 'closed_at'
     ]
     date_hierarchy = 'created_at'
@@ -218,7 +219,7 @@ class JobPostingAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('📊 Engagement Metrics', {
-            'fields': ('views_count', 'applications_count', 'shares_count'),
+            'fields': ('views_count', 'unique_views', 'applications_count', 'shares_count'),
             'classes': ('collapse',)
         }),
         ('🕐 Timestamps', {
@@ -289,23 +290,35 @@ class JobPostingAdmin(admin.ModelAdmin):
 
     def make_published(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='published', published_at=timezone.now())
+        now = timezone.now()
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='published', published_at=now, updated_at=now)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} job posting(s) marked as published.')
     make_published.short_description = "Mark selected jobs as published"
 
     def make_closed(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='closed', closed_at=timezone.now())
+        now = timezone.now()
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='closed', closed_at=now, updated_at=now)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} job posting(s) marked as closed.')
     make_closed.short_description = "Mark selected jobs as closed"
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(status='draft')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='draft', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} job posting(s) marked as draft.')
     make_draft.short_description = "Mark selected jobs as draft"
 
     def make_archived(self, request, queryset):
-        updated = queryset.update(status='archived')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='archived', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} job posting(s) marked as archived.')
     make_archived.short_description = "Mark selected jobs as archived"
 
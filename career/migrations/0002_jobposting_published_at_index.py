@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', '-published_at'], name='career_jobp_status_a02f20_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0002_jobposting_published_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='unique_views',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Estimated unique visitors (HyperLogLog), bots excluded'),
+        ),
+    ]
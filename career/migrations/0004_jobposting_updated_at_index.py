@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('career', '0003_jobposting_unique_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['updated_at', 'id'], name='career_jobp_updated_cf6585_idx'),
+        ),
+    ]
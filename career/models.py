@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
+from martech_influence_backend.lead_data import AtomicLeadSaveMixin
 
 
 class TimeStampedModel(models.Model):
@@ -159,6 +160,7 @@ class JobPosting(TimeStampedModel):
     
     # Engagement Metrics
     views_count = models.PositiveIntegerField(default=0, null=True, blank=True)
+    unique_views = models.PositiveIntegerField(default=0, editable=False, help_text="Estimated unique visitors (HyperLogLog), bots excluded")
     applications_count = models.PositiveIntegerField(default=0, null=True, blank=True)
     shares_count = models.PositiveIntegerField(default=0, null=True, blank=True)
     
@@ -173,8 +175,11 @@ class JobPosting(TimeStampedModel):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['slug']),
+            models.Index(fields=['status', '-published_at']),
             models.Index(fields=['department']),
             models.Index(fields=['category']),
+            # Delta sync (catalog/sync.py) pages by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -197,7 +202,7 @@ class JobPosting(TimeStampedModel):
         return reverse('career:detail', kwargs={'slug': self.slug})
 
 
-class JobApplication(TimeStampedModel):
+class JobApplication(AtomicLeadSaveMixin, TimeStampedModel):
     """Model for job applications"""
     STATUS_CHOICES = [
         ('pending', 'Pending Review'),
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from martech_influence_backend.fieldsets import SparseFieldsMixin
 from .models import (
     Department, JobCategory, JobLocation, JobType,
     JobPosting, JobApplication
@@ -29,7 +30,7 @@ class JobTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'slug', 'description', 'is_active', 'created_at', 'updated_at']
 
 
-class JobPostingListSerializer(serializers.ModelSerializer):
+class JobPostingListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for job posting list view"""
     department = DepartmentSerializer(read_only=True)
     category = JobCategorySerializer(read_only=True)
@@ -50,7 +51,7 @@ class JobPostingListSerializer(serializers.ModelSerializer):
         ]
 
 
-class JobPostingDetailSerializer(serializers.ModelSerializer):
+class JobPostingDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for job posting detail view"""
     department = DepartmentSerializer(read_only=True)
     category = JobCategorySerializer(read_only=True)
@@ -70,9 +71,12 @@ class JobPostingDetailSerializer(serializers.ModelSerializer):
             'experience_years_min', 'experience_years_max', 'education_required',
             'application_deadline', 'application_url', 'application_email',
             'application_instructions', 'is_featured', 'is_pinned', 'is_urgent',
-            'meta_title', 'meta_description', 'meta_keywords', 'views_count',
+            'meta_title', 'meta_description', 'meta_keywords', 'views_count', 'unique_views',
             'applications_count', 'shares_count', 'published_at', 'created_at', 'updated_at'
         ]
+        field_dependencies = {
+            'recruiter_full_name': ['recruiter__first_name', 'recruiter__last_name', 'recruiter__username'],
+        }
     
     def get_recruiter_full_name(self, obj):
         if obj.recruiter:
@@ -1,8 +1,17 @@
 from rest_framework import viewsets, status
-from django.db.models import Q
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.conditional import conditional_get
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.filtering import FilterSet, FilterSetMixin, Filter, Ordering, parse_bool
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset
+from martech_influence_backend.ratelimit import rate_limit
+from analytics.unique_views import record_view
 from .models import JobPosting, JobApplication
 from .serializers import (
     JobPostingListSerializer, JobPostingDetailSerializer,
@@ -10,82 +19,55 @@ from .serializers import (
 )
 
 
-class JobPostingViewSet(viewsets.ViewSet):
+class JobPostingViewSet(FilterSetMixin, viewsets.ViewSet):
     """
     ViewSet for Job Posting - GET operations only
     """
     
+    filterset = FilterSet(
+        JobPosting,
+        filters={
+            'department': Filter('department__slug'),
+            'category': Filter('category__slug'),
+            'job_type': Filter('job_type__slug'),
+            'location': Filter('location__slug'),
+            'is_remote': Filter('location__is_remote', parse_bool, index=False),
+            'experience_level': Filter('experience_level', index=False),
+            'is_featured': Filter('is_featured', parse_bool, index=False),
+            'is_urgent': Filter('is_urgent', parse_bool, index=False),
+        },
+        search=['title', 'short_title', 'short_description', 'job_description', 'skills_required'],
+        orderings={
+            'created_at': Ordering('created_at', index=['created_at']),
+            'published_at': Ordering('published_at', index=['status', 'published_at'], nulls_last=True),
+        },
+        default_ordering='-created_at',
+        # Accepted before orderings were declared; deprecated and sorted without an index
+        legacy_orderings=['id', 'title', 'updated_at', 'views_count', 'applications_count', 'shares_count'],
+    )
+
     def get_queryset(self):
-        queryset = JobPosting.objects.select_related(
+        return JobPosting.objects.select_related(
             'department', 'category', 'job_type', 'location', 'recruiter'
         ).filter(status='published')
-        
-        # Skip filtering during schema generation
-        if getattr(self, 'swagger_fake_view', False) or not hasattr(self, 'request') or self.request is None:
-            return queryset
-        
-        # Filter by department
-        department = self.request.query_params.get('department', None)
-        if department:
-            queryset = queryset.filter(department__slug=department)
-        
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category__slug=category)
-        
-        # Filter by job type
-        job_type = self.request.query_params.get('job_type', None)
-        if job_type:
-            queryset = queryset.filter(job_type__slug=job_type)
-        
-        # Filter by location
-        location = self.request.query_params.get('location', None)
-        if location:
-            queryset = queryset.filter(location__slug=location)
-        
-        # Filter by remote
-        is_remote = self.request.query_params.get('is_remote', None)
-        if is_remote is not None:
-            queryset = queryset.filter(location__is_remote=is_remote.lower() == 'true')
-        
-        # Filter by experience level
-        experience_level = self.request.query_params.get('experience_level', None)
-        if experience_level:
-            queryset = queryset.filter(experience_level=experience_level)
-        
-        # Filter by featured
-        is_featured = self.request.query_params.get('is_featured', None)
-        if is_featured is not None:
-            queryset = queryset.filter(is_featured=is_featured.lower() == 'true')
-        
-        # Filter by urgent
-        is_urgent = self.request.query_params.get('is_urgent', None)
-        if is_urgent is not None:
-            queryset = queryset.filter(is_urgent=is_urgent.lower() == 'true')
-        
-        # Search
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(short_title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(job_description__icontains=search) |
-                Q(skills_required__icontains=search)
-            )
-        
-        # Order by
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        queryset = queryset.order_by(ordering)
-        
-        return queryset
     
+    @cache_headers('job', related={
+        'department': 'job-department', 'category': 'job-category', 'job_type': 'job-type', 'location': 'job-location',
+    })
+    @cached_action(depends_on=['career.JobPosting', 'career.Department', 'career.JobCategory', 'career.JobType', 'career.JobLocation'])
+    @read_from_replica
     def list(self, request):
         """List all published job postings with pagination"""
         from rest_framework.pagination import PageNumberPagination
         
-        queryset = self.get_queryset()
+        fields, error_response = get_sparse_fields(request, JobPostingListSerializer)
+        if error_response:
+            return error_response
+
+        queryset, error_response = self.apply_filterset(self.get_queryset())
+        if error_response:
+            return error_response
+        queryset = project_queryset(queryset, JobPostingListSerializer, fields)
         
         # Pagination
         paginator = PageNumberPagination()
@@ -93,7 +75,7 @@ class JobPostingViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = JobPostingListSerializer(page, many=True)
+            serializer = JobPostingListSerializer(page, many=True, fields=fields)
             paginated_response = paginator.get_paginated_response(serializer.data)
             
             return create_response(
@@ -106,7 +88,7 @@ class JobPostingViewSet(viewsets.ViewSet):
                 previous_link=paginated_response.data.get('previous')
             )
         
-        serializer = JobPostingListSerializer(queryset, many=True)
+        serializer = JobPostingListSerializer(queryset, many=True, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Job postings retrieved successfully",
@@ -114,12 +96,24 @@ class JobPostingViewSet(viewsets.ViewSet):
             data=serializer.data
         )
     
+    @cache_headers('job', related={
+        'department': 'job-department', 'category': 'job-category', 'job_type': 'job-type', 'location': 'job-location',
+    })
+    @read_from_replica
+    @conditional_get(JobPosting, JobPostingDetailSerializer,
+                     depends_on=['career.JobPosting', 'career.Department', 'career.JobCategory', 'career.JobType', 'career.JobLocation'],
+                     filters={'status': 'published'}, view_type='job')
     def retrieve(self, request, pk=None):
         """Retrieve a single job posting"""
+        fields, error_response = get_sparse_fields(request, JobPostingDetailSerializer)
+        if error_response:
+            return error_response
+
+        queryset = JobPosting.objects.select_related(
+            'department', 'category', 'job_type', 'location', 'recruiter'
+        )
         try:
-            job_posting = JobPosting.objects.select_related(
-                'department', 'category', 'job_type', 'location', 'recruiter'
-            ).get(pk=pk, status='published')
+            job_posting = project_queryset(queryset, JobPostingDetailSerializer, fields).get(pk=pk, status='published')
         except JobPosting.DoesNotExist:
             return create_response(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -128,11 +122,13 @@ class JobPostingViewSet(viewsets.ViewSet):
                 status=False
             )
         
-        # Increment views count
-        job_posting.views_count += 1
-        job_posting.save(update_fields=['views_count'])
+        # Increment views count; the row may have been loaded without the column
+        JobPosting.objects.filter(pk=job_posting.pk).update(views_count=Coalesce(F('views_count'), 0) + 1)
+        if 'views_count' not in job_posting.get_deferred_fields():
+            job_posting.views_count = (job_posting.views_count or 0) + 1
+        record_view('job', job_posting.pk, request)
         
-        serializer = JobPostingDetailSerializer(job_posting)
+        serializer = JobPostingDetailSerializer(job_posting, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Job posting retrieved successfully",
@@ -182,6 +178,7 @@ class JobApplicationViewSet(viewsets.ViewSet):
         },
         tags=['Job Applications']
     )
+    @rate_limit('job_application')
     def create(self, request):
         """Create a new job application"""
         serializer = JobApplicationCreateSerializer(data=request.data)
@@ -9,6 +9,8 @@ from import_export import resources,fields
 from import_export.widgets import CharWidget
 from import_export.admin import ImportExportModelAdmin
 from .models import CaseStudyCategory, CaseStudy, CaseStudyLead, CaseStudyTag, CaseStudyDynamicField
+from catalog.signals import content_bulk_changed
+from martech_influence_backend.lead_data import LeadDataSearchMixin
 
 
 class CaseStudyAdminForm(forms.ModelForm):
@@ -117,10 +119,11 @@ class CaseStudyAdmin(ImportExportModelAdmin):
         'created_at', 'published_at'
     ]
     list_filter = ['status', 'category', 'tags', 'client_industry', 'created_at', 'published_at']
-    search_fields = ['title', 'short_title', 'content', 'short_description', 'client_name', 'client_industry', 'meta_keywords']
+    search_fields = ['title', 'content_text', 'short_description', 'client_name', 'client_industry', 'meta_keywords']
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = [
-        'created_at', 'updated_at', 'banner_image_preview', 'mobile_image_preview', 'logo_image_preview', 'lp_image_preview', 'content_preview'
+        'created_at', 'updated_at', 'banner_image_preview', 'mobile_image_preview', 'logo_image_preview', 'lp_image_preview', 'content_preview',
+        'word_count', 'reading_time'
     ]
     date_hierarchy = 'created_at'
     list_per_page = 25
@@ -137,7 +140,7 @@ class CaseStudyAdmin(ImportExportModelAdmin):
             'classes': ('wide',),
         }),
         ('📄 Content', {
-            'fields': ('short_description', 'content', 'content_preview'),
+            'fields': ('short_description', 'content', 'content_preview', 'word_count', 'reading_time', 'estimated_time'),
             'classes': ('wide',),
         }),
         ('🖼️ Images', {
@@ -244,9 +247,8 @@ class CaseStudyAdmin(ImportExportModelAdmin):
     # Content Preview
     # ----------------------------
     def content_preview(self, obj):
-        if obj.content:
-            import re
-            content = re.sub(r'<[^>]+>', '', obj.content[:500]) + ("..." if len(obj.content) > 500 else "")
+        if obj.content_text:
+            content = obj.content_text[:500] + ("..." if len(obj.content_text) > 500 else "")
             return format_html(
                 '<div style="padding:10px; background:#e0f2fe; border-radius:8px;">{}</div>', content
             )
@@ -260,17 +262,26 @@ class CaseStudyAdmin(ImportExportModelAdmin):
 
     def make_published(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='published', published_at=timezone.now())
+        now = timezone.now()
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='published', published_at=now, updated_at=now)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} case study(ies) marked as published.')
     make_published.short_description = "Mark selected case studies as published"
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(status='draft')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='draft', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} case study(ies) marked as draft.')
     make_draft.short_description = "Mark selected case studies as draft"
 
     def make_archived(self, request, queryset):
-        updated = queryset.update(status='archived')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='archived', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} case study(ies) marked as archived.')
     make_archived.short_description = "Mark selected case studies as archived"
 
@@ -306,12 +317,11 @@ class CaseStudyLeadResource(resources.ModelResource):
     
     
 @admin.register(CaseStudyLead)
-class CaseStudyLeadAdmin(ExportMixin, admin.ModelAdmin):
+class CaseStudyLeadAdmin(LeadDataSearchMixin, ExportMixin, admin.ModelAdmin):
     resource_class = CaseStudyLeadResource
 
     list_display = ('id', 'case_study', 'dynamic_columns', 'created_at')
     list_filter = ('case_study', 'created_at')
-    search_fields = ('data',)
     readonly_fields = (
         'formatted_data',
         'created_at',
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:47
+
+from django.db import migrations, models
+
+
+def process_existing_content(apps, schema_editor):
+    from martech_influence_backend.content import PROCESSED_FIELDS, process_instance
+
+    CaseStudy = apps.get_model('casestudy', 'CaseStudy')
+    rows = list(CaseStudy.objects.only('id', 'content'))
+    for row in rows:
+        process_instance(row)
+    CaseStudy.objects.bulk_update(rows, PROCESSED_FIELDS, batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0005_casestudy_downloadable_file_casestudy_external_link'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casestudy',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized content HTML with heading anchors', null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudy',
+            name='content_text',
+            field=models.TextField(blank=True, editable=False, help_text='Plain text of the content, used for search', null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudy',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Auto excerpt of the content', max_length=320, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudy',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Computed reading time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='casestudy',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Table of contents: [{level, text, id}]'),
+        ),
+        migrations.AddField(
+            model_name='casestudy',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(process_existing_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0006_casestudy_processed_content'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(fields=['status', '-published_at'], name='casestudy_c_status_294777_idx'),
+        ),
+    ]
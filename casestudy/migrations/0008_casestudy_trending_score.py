@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0007_casestudy_published_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casestudy',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, help_text='Time-decayed engagement, see catalog/trending.py'),
+        ),
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(fields=['status', '-trending_score'], name='casestudy_c_status_a979c6_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0009_casestudy_unique_views'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(fields=['updated_at', 'id'], name='casestudy_c_updated_c2dc83_idx'),
+        ),
+    ]
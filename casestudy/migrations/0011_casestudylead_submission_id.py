@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0010_casestudy_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casestudylead',
+            name='submission_id',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,146 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:24
+
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of the extraction in martech_influence_backend/lead_data.py as it was when
+# this migration was written; the live module may change, this migration must not
+LEAD_DATA_FIELDS = (
+    'email', 'phone', 'full_name', 'company',
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+)
+
+KEY_ALIASES = {
+    'email': ('email', 'emailaddress', 'emailid', 'workemail', 'businessemail', 'mail'),
+    'phone': (
+        'phone', 'phoneno', 'phonenumber', 'mobile', 'mobileno', 'mobilenumber', 'contactno',
+        'contactnumber', 'whatsapp', 'whatsappno', 'whatsappnumber', 'telephone',
+    ),
+    'full_name': ('fullname', 'name', 'yourname'),
+    'company': (
+        'company', 'companyname', 'organization', 'organisation', 'organizationname',
+        'organisationname', 'business', 'businessname',
+    ),
+    'utm_source': ('utmsource',),
+    'utm_medium': ('utmmedium',),
+    'utm_campaign': ('utmcampaign',),
+    'utm_term': ('utmterm',),
+    'utm_content': ('utmcontent',),
+}
+
+MAX_LENGTHS = {'email': 254, 'phone': 32, 'full_name': 200, 'company': 200}
+UTM_MAX_LENGTH = 100
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+NON_DIGIT_RE = re.compile(r'\D')
+
+
+def _text(value):
+    if value is None or isinstance(value, (dict, list)):
+        return ''
+    return str(value).strip()
+
+
+def extract_lead_data(data):
+    values = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            text = _text(value)
+            if text:
+                values.setdefault(NON_ALNUM_RE.sub('', str(key).lower()), text)
+
+    extracted = {}
+    for column, aliases in KEY_ALIASES.items():
+        value = next((values[alias] for alias in aliases if alias in values), '')
+        if column == 'full_name' and not value:
+            value = ' '.join(part for part in (values.get('firstname'), values.get('lastname')) if part)
+        elif column == 'email':
+            value = value.lower()
+        elif column == 'phone':
+            value = NON_DIGIT_RE.sub('', value)
+        extracted[column] = value[:MAX_LENGTHS.get(column, UTM_MAX_LENGTH)] or None
+    return extracted
+
+
+def extract_existing_leads(apps, schema_editor):
+    CaseStudyLead = apps.get_model('casestudy', 'CaseStudyLead')
+    batch = []
+    for row in CaseStudyLead.objects.only('id', 'data').order_by('pk').iterator(chunk_size=500):
+        for column, value in extract_lead_data(row.data).items():
+            setattr(row, column, value)
+        batch.append(row)
+        if len(batch) >= 500:
+            CaseStudyLead.objects.bulk_update(batch, LEAD_DATA_FIELDS)
+            batch = []
+    CaseStudyLead.objects.bulk_update(batch, LEAD_DATA_FIELDS)
+
+
+# GIN index over the JSON for containment and key lookups (data__contains, data__has_key);
+# PostgreSQL only, so it isn't declared on the model
+def create_data_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE INDEX IF NOT EXISTS casestudy_casestudylead_data_gin ON casestudy_casestudylead USING gin (data)')
+
+
+def drop_data_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS casestudy_casestudylead_data_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casestudy', '0011_casestudylead_submission_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casestudylead',
+            name='company',
+            field=models.CharField(blank=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='email',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='phone',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text='Digits only', max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='utm_campaign',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='utm_content',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='utm_medium',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='utm_source',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='casestudylead',
+            name='utm_term',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(extract_existing_leads, migrations.RunPython.noop),
+        migrations.RunPython(create_data_gin_index, drop_data_gin_index),
+    ]
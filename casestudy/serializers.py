@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from martech_influence_backend.bulk import PrefetchedPrimaryKeyRelatedField
+from martech_influence_backend.fieldsets import SparseFieldsMixin
 from .models import CaseStudyCategory, CaseStudy, CaseStudyLead, CaseStudyTag, CaseStudyDynamicField
 
 
@@ -14,29 +16,39 @@ class CaseStudyTagSerializer(serializers.ModelSerializer):
         model = CaseStudyTag
         fields = ['id', 'name', 'slug', 'created_at']
         
-class CaseStudyListSerializer(serializers.ModelSerializer):
+class CaseStudyListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for case study list view"""
     category = CaseStudyCategorySerializer(read_only=True)
     tags = CaseStudyTagSerializer(many=True, read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     author_full_name = serializers.SerializerMethodField()
     dynamic_fields = serializers.SerializerMethodField()
+    estimated_time = serializers.SerializerMethodField()
     
     class Meta:
         model = CaseStudy
         fields = [
             'id', 'title', 'slug', 'author_username', 'author_full_name',
             'category', 'tags', 'short_description', 'banner_image', 'logo_image','lp_image',
-            'client_name', 'client_industry', 'estimated_time', 'status','dynamic_fields',
+            'client_name', 'client_industry', 'excerpt', 'reading_time', 'estimated_time', 'status','dynamic_fields',
             'is_featured', 'is_pinned', 'views_count', 'likes_count',
-            'shares_count', 'downloads_count', 'published_at',
+            'shares_count', 'downloads_count', 'trending_score', 'published_at',
             'created_at', 'updated_at'
         ]
+        field_dependencies = {
+            'author_full_name': ['author__first_name', 'author__last_name', 'author__username'],
+            'dynamic_fields': [],
+            'estimated_time': ['estimated_time', 'reading_time'],
+        }
     
     def get_author_full_name(self, obj):
         if obj.author:
             return f"{obj.author.first_name} {obj.author.last_name}".strip() or obj.author.username
         return None
+
+    def get_estimated_time(self, obj):
+        # Editor's value wins, otherwise the reading time computed from the content
+        return obj.estimated_time or obj.reading_time or None
     
     def get_dynamic_fields(self, obj):
         qs = obj.dynamic_fields.filter(is_active=True).order_by('sequence')
@@ -48,32 +60,50 @@ class CaseStudyDynamicFieldSerializer(serializers.ModelSerializer):
         fields = ['id', 'field_name', 'placeholder', 'sequence', 'is_active']
 
 
-class CaseStudyDetailSerializer(serializers.ModelSerializer):
+class CaseStudyDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for case study detail view"""
     category = CaseStudyCategorySerializer(read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     author_full_name = serializers.SerializerMethodField()
     engagement_score = serializers.SerializerMethodField()
     dynamic_fields = serializers.SerializerMethodField()
+    related_items = serializers.SerializerMethodField()
+    content = serializers.SerializerMethodField()
+    estimated_time = serializers.SerializerMethodField()
     
     class Meta:
         model = CaseStudy
         fields = [
             'id', 'title', 'slug', 'author', 'author_username', 'author_full_name',
-            'category', 'short_description', 'content', 'banner_image', 'logo_image','lp_image',
+            'category', 'short_description', 'content', 'excerpt', 'word_count', 'reading_time', 'toc', 'banner_image', 'logo_image','lp_image',
             'external_link','downloadable_file',
             'client_name', 'client_industry', 'project_duration', 'project_budget',
             'results_summary', 'estimated_time', 'meta_title', 'meta_description',
             'meta_keywords', 'status', 'is_featured', 'is_pinned',
-            'views_count', 'likes_count', 'shares_count', 'downloads_count',
-            'engagement_score','dynamic_fields', 'published_at', 'created_at', 'updated_at'
+            'views_count', 'unique_views', 'likes_count', 'shares_count', 'downloads_count',
+            'engagement_score','dynamic_fields', 'related_items', 'published_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['slug', 'views_count', 'likes_count', 'shares_count', 'downloads_count', 'published_at']
+        field_dependencies = {
+            'author_full_name': ['author__first_name', 'author__last_name', 'author__username'],
+            'engagement_score': ['views_count', 'likes_count', 'shares_count', 'downloads_count'],
+            'dynamic_fields': [],
+            'related_items': ['related_payload'],
+            'content': ['content_html', 'content'],
+            'estimated_time': ['estimated_time', 'reading_time'],
+        }
+        read_only_fields = ['slug', 'views_count', 'unique_views', 'likes_count', 'shares_count', 'downloads_count', 'published_at']
     
     def get_author_full_name(self, obj):
         if obj.author:
             return f"{obj.author.first_name} {obj.author.last_name}".strip() or obj.author.username
         return None
+
+    def get_estimated_time(self, obj):
+        return obj.estimated_time or obj.reading_time or None
+
+    def get_content(self, obj):
+        # Sanitized at save time; rows not processed yet fall back to the raw HTML
+        return obj.content_html or obj.content
     
     def get_engagement_score(self, obj):
         return obj.views_count + (obj.likes_count * 2) + (obj.shares_count * 3) + (obj.downloads_count * 5)
@@ -82,6 +112,10 @@ class CaseStudyDetailSerializer(serializers.ModelSerializer):
         qs = obj.dynamic_fields.filter(is_active=True).order_by('sequence')
         return CaseStudyDynamicFieldSerializer(qs, many=True).data
 
+    def get_related_items(self, obj):
+        # Annotated by catalog.related.with_related in the detail view
+        return getattr(obj, 'related_payload', None) or []
+
 
 class CaseStudyLeadSerializer(serializers.ModelSerializer):
     """Serializer for case study leads"""
@@ -101,6 +135,9 @@ class CaseStudyLeadSerializer(serializers.ModelSerializer):
 
 class CaseStudyLeadCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating case study leads"""
+    # Bulk submissions resolve ids from one prefetch per batch
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     class Meta:
         model = CaseStudyLead
         fields = ['case_study', 'data']
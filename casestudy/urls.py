@@ -4,6 +4,7 @@ from .views import CaseStudyViewSet, CaseStudyLeadViewSet
 case_study_list = CaseStudyViewSet.as_view({'get': 'list'})
 case_study_detail = CaseStudyViewSet.as_view({'get': 'retrieve'})
 case_study_lead_create = CaseStudyLeadViewSet.as_view({'post': 'create'})
+case_study_lead_bulk_create = CaseStudyLeadViewSet.as_view({'post': 'bulk_create'})
 case_study_dynamic_fields = CaseStudyViewSet.as_view({'get': 'dynamic_fields'}) 
 
 urlpatterns = [
@@ -11,4 +12,5 @@ urlpatterns = [
     path('case-studies/<int:pk>/', case_study_detail, name='case-study-detail'),
     path('case-studies/dynamic-fields/', case_study_dynamic_fields, name='case-study-dynamic-fields'),
     path('case-study-leads/', case_study_lead_create, name='case-study-lead-create'),
+    path('case-study-leads/bulk/', case_study_lead_bulk_create, name='case-study-lead-bulk-create'),
 ]
@@ -1,8 +1,20 @@
 from rest_framework import viewsets, status
-from django.db.models import Q
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.conditional import conditional_get
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.filtering import FilterSet, FilterSetMixin, Filter, Ordering, parse_bool
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset, wants_field
+from martech_influence_backend.ratelimit import rate_limit
+from analytics.bulk_leads import bulk_create_leads
+from analytics.lead_spool import enqueue_lead, write_behind_enabled
+from analytics.unique_views import record_view
+from catalog.related import with_related
 from .models import CaseStudy, CaseStudyLead, CaseStudyDynamicField
 from .serializers import (
     CaseStudyListSerializer, CaseStudyDetailSerializer,
@@ -10,56 +22,48 @@ from .serializers import (
 )
 
 
-class CaseStudyViewSet(viewsets.ViewSet):
+class CaseStudyViewSet(FilterSetMixin, viewsets.ViewSet):
     """
     ViewSet for Case Study - GET operations only
     """
     
+    filterset = FilterSet(
+        CaseStudy,
+        filters={
+            'category': Filter('category__slug'),
+            'industry': Filter('client_industry__icontains', index=False),
+            'is_featured': Filter('is_featured', parse_bool, index=False),
+        },
+        search=['title', 'short_description', 'content_text', 'client_name', 'client_industry'],
+        orderings={
+            'created_at': Ordering('created_at', index=['created_at']),
+            'published_at': Ordering('published_at', index=['status', 'published_at'], nulls_last=True),
+            # Stored by `manage.py compute_trending_scores`
+            'trending': Ordering('trending_score', index=['status', 'trending_score'], then=['-created_at']),
+        },
+        default_ordering='-created_at',
+        # Accepted before orderings were declared; deprecated and sorted without an index
+        legacy_orderings=['id', 'title', 'updated_at', 'views_count', 'likes_count', 'shares_count', 'downloads_count', 'trending_score'],
+    )
+
     def get_queryset(self):
-        queryset = CaseStudy.objects.select_related('author', 'category').filter(status='published')
-        
-        # Skip filtering during schema generation
-        if getattr(self, 'swagger_fake_view', False) or not hasattr(self, 'request') or self.request is None:
-            return queryset
-        
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category__slug=category)
-        
-        # Filter by client industry
-        industry = self.request.query_params.get('industry', None)
-        if industry:
-            queryset = queryset.filter(client_industry__icontains=industry)
-        
-        # Filter by featured
-        is_featured = self.request.query_params.get('is_featured', None)
-        if is_featured is not None:
-            queryset = queryset.filter(is_featured=is_featured.lower() == 'true')
-        
-        # Search
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(short_title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(content__icontains=search) |
-                Q(client_name__icontains=search) |
-                Q(client_industry__icontains=search)
-            )
-        
-        # Order by
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        queryset = queryset.order_by(ordering)
-        
-        return queryset
+        return CaseStudy.objects.select_related('author', 'category').filter(status='published')
     
+    @cache_headers('casestudy', related={'category': 'casestudy-category', 'tags': 'casestudy-tag'})
+    @cached_action(depends_on=['casestudy.CaseStudy', 'casestudy.CaseStudyCategory', 'casestudy.CaseStudyTag', 'casestudy.CaseStudyDynamicField', 'auth.User'])
+    @read_from_replica
     def list(self, request):
         """List all published case studies with pagination"""
         from rest_framework.pagination import PageNumberPagination
         
-        queryset = self.get_queryset()
+        fields, error_response = get_sparse_fields(request, CaseStudyListSerializer)
+        if error_response:
+            return error_response
+
+        queryset, error_response = self.apply_filterset(self.get_queryset())
+        if error_response:
+            return error_response
+        queryset = project_queryset(queryset, CaseStudyListSerializer, fields)
         
         # Pagination
         paginator = PageNumberPagination()
@@ -67,7 +71,7 @@ class CaseStudyViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = CaseStudyListSerializer(page, many=True)
+            serializer = CaseStudyListSerializer(page, many=True, fields=fields)
             paginated_response = paginator.get_paginated_response(serializer.data)
             
             return create_response(
@@ -80,7 +84,7 @@ class CaseStudyViewSet(viewsets.ViewSet):
                 previous_link=paginated_response.data.get('previous')
             )
         
-        serializer = CaseStudyListSerializer(queryset, many=True)
+        serializer = CaseStudyListSerializer(queryset, many=True, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Case studies retrieved successfully",
@@ -88,10 +92,22 @@ class CaseStudyViewSet(viewsets.ViewSet):
             data=serializer.data
         )
     
+    @cache_headers('casestudy', related={'category': 'casestudy-category', 'tags': 'casestudy-tag'})
+    @read_from_replica
+    @conditional_get(CaseStudy, CaseStudyDetailSerializer,
+                     depends_on=['casestudy.CaseStudy', 'casestudy.CaseStudyCategory', 'casestudy.CaseStudyTag', 'auth.User'],
+                     filters={'status': 'published'}, view_type='casestudy')
     def retrieve(self, request, pk=None):
         """Retrieve a single case study"""
+        fields, error_response = get_sparse_fields(request, CaseStudyDetailSerializer)
+        if error_response:
+            return error_response
+
+        queryset = CaseStudy.objects.select_related('author', 'category')
+        if wants_field(fields, 'related_items'):
+            queryset = with_related(queryset, 'casestudy')
         try:
-            case_study = CaseStudy.objects.select_related('author', 'category').get(pk=pk, status='published')
+            case_study = project_queryset(queryset, CaseStudyDetailSerializer, fields).get(pk=pk, status='published')
         except CaseStudy.DoesNotExist:
             return create_response(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -100,11 +116,13 @@ class CaseStudyViewSet(viewsets.ViewSet):
                 status=False
             )
         
-        # Increment views count
-        case_study.views_count += 1
-        case_study.save(update_fields=['views_count'])
+        # Increment views count; the row may have been loaded without the column
+        CaseStudy.objects.filter(pk=case_study.pk).update(views_count=Coalesce(F('views_count'), 0) + 1)
+        if 'views_count' not in case_study.get_deferred_fields():
+            case_study.views_count = (case_study.views_count or 0) + 1
+        record_view('casestudy', case_study.pk, request)
         
-        serializer = CaseStudyDetailSerializer(case_study)
+        serializer = CaseStudyDetailSerializer(case_study, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Case study retrieved successfully",
@@ -224,13 +242,23 @@ class CaseStudyLeadViewSet(viewsets.ViewSet):
                     }
                 }
             ),
+            202: openapi.Response(description='Accepted into the write-behind queue (LEAD_WRITE_BEHIND); returns submission_id'),
             400: openapi.Response(description='Bad request - validation errors')
         },
         tags=['Case Study Leads']
     )
+    @rate_limit('case_study_lead')
     def create(self, request):
         serializer = CaseStudyLeadCreateSerializer(data=request.data)
         if serializer.is_valid():
+            if write_behind_enabled():
+                # Written by `manage.py flush_lead_spool`
+                return create_response(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    message="Lead received",
+                    message_code="CASE_STUDY_LEAD_QUEUED",
+                    data={"submission_id": enqueue_lead('case_study_lead', serializer.validated_data)}
+                )
             lead = serializer.save()
             return create_response(
                 status_code=status.HTTP_201_CREATED,
@@ -249,3 +277,25 @@ class CaseStudyLeadViewSet(viewsets.ViewSet):
             data=serializer.errors,
             status=False
         )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Submit up to LEAD_BULK_MAX_ITEMS case study leads at once (partner integrations). "
+            "Body: a JSON array, or NDJSON with Content-Type application/x-ndjson, of items shaped like "
+            "the single create endpoint, each with an optional submission_id (UUID) for safe retries. "
+            "Requires the casestudy.add_casestudylead permission (HTTP Basic auth)."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={
+            200: openapi.Response(description='Per-item results: created (with id), duplicate or invalid (with errors)'),
+            400: openapi.Response(description='Body is not a JSON array or NDJSON'),
+            401: openapi.Response(description='Authentication required'),
+            403: openapi.Response(description='Missing casestudy.add_casestudylead permission'),
+            413: openapi.Response(description='More than LEAD_BULK_MAX_ITEMS items'),
+        },
+        tags=['Case Study Leads']
+    )
+    @rate_limit('lead_bulk')
+    def bulk_create(self, request):
+        """Create many case study leads in one request"""
+        return bulk_create_leads(request, 'case_study_lead', CaseStudyLeadCreateSerializer, "CASE_STUDY_LEADS_BULK_PROCESSED")
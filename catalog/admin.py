@@ -0,0 +1,41 @@
+from django.contrib import admin
+from .models import PendingRebuild, RelatedContent, Tombstone
+
+
+@admin.register(RelatedContent)
+class RelatedContentAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'object_id', 'related_count', 'updated_at']
+    list_filter = ['kind']
+    search_fields = ['object_id']
+    readonly_fields = ['kind', 'object_id', 'items', 'created_at', 'updated_at']
+    list_per_page = 50
+
+    def related_count(self, obj):
+        return len(obj.items or [])
+    related_count.short_description = 'Related Items'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Tombstone)
+class TombstoneAdmin(admin.ModelAdmin):
+    list_display = ['model', 'object_id', 'deleted_at']
+    list_filter = ['model']
+    search_fields = ['object_id']
+    readonly_fields = ['model', 'object_id', 'deleted_at']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(PendingRebuild)
+class PendingRebuildAdmin(admin.ModelAdmin):
+    list_display = ['task', 'requested_at', 'attempts']
+    search_fields = ['task']
+    readonly_fields = ['task', 'requested_at', 'attempts', 'last_error']
+    list_per_page = 50
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,177 @@
+"""
+Homepage aggregate: featured blogs and case studies, popular services, urgent
+jobs, social links and the privacy policy link in one response.
+
+Each section is a single query (plus the tags prefetch for blogs and case
+studies) that loads only the columns its fields need. Sections are cached
+independently under a version number that catalog.signals bumps when one of
+the section's models changes, so editing a blog does not drop the cached
+jobs section.
+"""
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from martech_influence_backend import metrics
+from martech_influence_backend.fieldsets import project_queryset
+
+
+DEFAULT_CACHE_TIMEOUT = 300
+
+# section -> queryset, serializer fields and the models whose changes invalidate it
+HOMEPAGE_SECTIONS = {
+    'featured_blogs': {
+        'model': 'blog.Blog',
+        'serializer': 'blog.serializers.BlogListSerializer',
+        'filter': {'status': 'published', 'is_featured': True},
+        'ordering': ['-published_at', '-created_at'],
+        'fields': [
+            'id', 'title', 'short_title', 'slug', 'author_full_name', 'category', 'tags', 'short_description',
+            'banner_image', 'excerpt', 'reading_time', 'estimated_time', 'published_at',
+        ],
+        'limit': 6,
+        'depends_on': ['blog.Blog', 'blog.Category', 'blog.Tag'],
+    },
+    'featured_case_studies': {
+        'model': 'casestudy.CaseStudy',
+        'serializer': 'casestudy.serializers.CaseStudyListSerializer',
+        'filter': {'status': 'published', 'is_featured': True},
+        'ordering': ['-published_at', '-created_at'],
+        'fields': [
+            'id', 'title', 'slug', 'category', 'tags', 'short_description', 'banner_image', 'logo_image',
+            'client_name', 'client_industry', 'excerpt', 'reading_time', 'estimated_time', 'published_at',
+        ],
+        'limit': 6,
+        'depends_on': ['casestudy.CaseStudy', 'casestudy.CaseStudyCategory', 'casestudy.CaseStudyTag'],
+    },
+    'popular_services': {
+        'model': 'services.Service',
+        'serializer': 'services.serializers.ServiceListSerializer',
+        'filter': {'status': 'published', 'is_popular': True},
+        'ordering': ['-published_at', '-created_at'],
+        'fields': [
+            'id', 'title', 'short_title', 'slug', 'category', 'short_description', 'banner_image_url',
+            'icon_url', 'price_starting_from', 'price_currency', 'price_period', 'is_free',
+            'has_custom_pricing', 'service_type',
+        ],
+        'limit': 6,
+        'depends_on': ['services.Service', 'services.ServiceCategory'],
+    },
+    'urgent_jobs': {
+        'model': 'career.JobPosting',
+        'serializer': 'career.serializers.JobPostingListSerializer',
+        'filter': {'status': 'published', 'is_urgent': True},
+        'ordering': ['-published_at', '-created_at'],
+        'fields': [
+            'id', 'title', 'short_title', 'slug', 'department', 'job_type', 'location',
+            'experience_level', 'application_deadline', 'published_at',
+        ],
+        'limit': 6,
+        'depends_on': [
+            'career.JobPosting', 'career.Department', 'career.JobCategory', 'career.JobType', 'career.JobLocation',
+        ],
+    },
+    'social_links': {
+        'model': 'socialmedia.SocialMedia',
+        'serializer': 'socialmedia.serializers.SocialMediaSerializer',
+        'filter': {'is_active': True},
+        'ordering': ['platform'],
+        'fields': ['id', 'platform', 'display_name', 'url', 'icon_url'],
+        'limit': None,
+        'depends_on': ['socialmedia.SocialMedia'],
+    },
+    'privacy_policy': {
+        'model': 'privacy_policy.PrivacyPolicy',
+        'serializer': 'privacy_policy.serializers.PrivacyPolicySerializer',
+        'filter': {'is_active': True},
+        'ordering': ['-published_at'],
+        'fields': ['id', 'title', 'version', 'published_at', 'updated_at'],
+        'limit': 1,
+        'single': True,
+        'url_name': 'privacy-policy-list',
+        'depends_on': ['privacy_policy.PrivacyPolicy'],
+    },
+}
+
+# model label -> sections to invalidate when it changes
+MODEL_HOMEPAGE_SECTIONS = {}
+for _name, _config in HOMEPAGE_SECTIONS.items():
+    for _label in _config['depends_on']:
+        MODEL_HOMEPAGE_SECTIONS.setdefault(_label, []).append(_name)
+
+
+def get_cache_timeout():
+    return getattr(settings, 'HOMEPAGE_CACHE_TIMEOUT', DEFAULT_CACHE_TIMEOUT)
+
+
+def _version_key(name):
+    return f'homepage:{name}:version'
+
+
+def invalidate_section(name):
+    """Bump the section's version; payloads cached under the old one are never read again"""
+    try:
+        cache.incr(_version_key(name))
+    except ValueError:
+        # Missing (evicted or never read): a fresh, time based version cannot match old payloads
+        cache.add(_version_key(name), time.time_ns(), timeout=None)
+
+
+def get_versions(names):
+    """Current version of each section, starting unknown ones at a time based value"""
+    keys = {name: _version_key(name) for name in names}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for name, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions[name] = version
+    return versions
+
+
+def build_section(name, request):
+    config = HOMEPAGE_SECTIONS[name]
+    serializer_class = import_string(config['serializer'])
+    queryset = apps.get_model(config['model']).objects.filter(**config['filter']).order_by(*config['ordering'])
+    queryset = project_queryset(queryset, serializer_class, config['fields'])
+    if config['limit'] is not None:
+        queryset = queryset[:config['limit']]
+    serializer = serializer_class(queryset, many=True, context={'request': request}, fields=config['fields'])
+    items = list(serializer.data)
+    if not config.get('single'):
+        return items
+    if not items:
+        return None
+    item = dict(items[0])
+    if config.get('url_name'):
+        item['url'] = request.build_absolute_uri(reverse(config['url_name']))
+    return item
+
+
+def get_sections(request):
+    """All homepage sections, from the cache where possible (one get_many and one set_many)"""
+    names = list(HOMEPAGE_SECTIONS)
+    versions = get_versions(names)
+    # Image and page URLs are absolute, so the site root is part of the key
+    base_url = request.build_absolute_uri('/')
+    keys = {name: f'homepage:{name}:{versions[name]}:{base_url}' for name in names}
+    cached = cache.get_many(keys.values())
+
+    sections, missing = {}, {}
+    for name in names:
+        key = keys[name]
+        if key in cached:
+            sections[name] = cached[key]
+            metrics.increment('homepage.section_hit', section=name)
+        else:
+            sections[name] = missing[key] = build_section(name, request)
+            metrics.increment('homepage.section_miss', section=name)
+    if missing:
+        cache.set_many(missing, get_cache_timeout())
+    return sections
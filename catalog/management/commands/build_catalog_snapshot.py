@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from catalog.snapshot import SNAPSHOT_TYPES, build_snapshot, get_snapshot_root
+
+
+class Command(BaseCommand):
+    help = "Write the published catalog to content-hashed, compressed JSON files plus a manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', choices=sorted(SNAPSHOT_TYPES), dest='types',
+            help="Only rebuild this content type (repeatable)",
+        )
+        parser.add_argument('--force', action='store_true', help="Rewrite files even if the content hash is unchanged")
+        parser.add_argument('--workers', type=int, default=None, help="Compression worker processes")
+
+    def handle(self, *args, **options):
+        manifest, changed = build_snapshot(types=options['types'], force=options['force'], workers=options['workers'])
+        if changed:
+            self.stdout.write(self.style.SUCCESS(
+                f"Snapshot v{manifest['version']} written to {get_snapshot_root()}: {', '.join(changed)} updated."
+            ))
+        else:
+            self.stdout.write(f"Snapshot v{manifest['version']} is up to date.")
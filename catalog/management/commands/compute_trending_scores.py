@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from catalog.trending import TRENDING_KINDS, compute_trending
+
+
+class Command(BaseCommand):
+    help = "Recompute time-decayed trending scores for blogs, case studies and services (run hourly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=sorted(TRENDING_KINDS), dest='kinds',
+            help="Only recompute this content kind (repeatable)",
+        )
+        parser.add_argument('--gravity', type=float, default=None, help="Decay exponent (default TRENDING_GRAVITY)")
+
+    def handle(self, *args, **options):
+        for kind in options['kinds'] or list(TRENDING_KINDS):
+            rows = compute_trending(kind, gravity=options['gravity'])
+            self.stdout.write(self.style.SUCCESS(f"{kind}: trending score stored for {rows} object(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from catalog.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete sync tombstones past SYNC_TOMBSTONE_RETENTION_DAYS (run daily)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help="Keep this many days instead of the setting")
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} tombstone(s)."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from catalog.related import CONTENT_KINDS, rebuild_related
+
+
+class Command(BaseCommand):
+    help = "Recompute related-content recommendations for blogs, case studies and services (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=sorted(CONTENT_KINDS), dest='kinds',
+            help="Only rebuild this content kind (repeatable)",
+        )
+        parser.add_argument('--top-n', type=int, default=None, help="Related items kept per object")
+
+    def handle(self, *args, **options):
+        for kind in options['kinds'] or list(CONTENT_KINDS):
+            rows = rebuild_related(kind, top_n=options['top_n'])
+            self.stdout.write(self.style.SUCCESS(f"{kind}: related items stored for {rows} object(s)."))
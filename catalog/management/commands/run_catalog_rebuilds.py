@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.rebuilds import run_pending
+
+
+class Command(BaseCommand):
+    help = "Run the related-content and snapshot rebuilds requested by content changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running every --interval seconds")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds between passes with --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            done = run_pending()
+            if done or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Ran {len(done)} rebuild(s){': ' + ', '.join(done) if done else ''}."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('kind', models.CharField(choices=[('blog', 'Blog'), ('casestudy', 'Case Study'), ('service', 'Service')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('items', models.JSONField(blank=True, default=list, help_text='Ranked related items with id, title, slug, banner_image and score')),
+            ],
+            options={
+                'verbose_name_plural': 'Related Content',
+                'ordering': ['kind', 'object_id'],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_related_content')],
+            },
+        ),
+    ]
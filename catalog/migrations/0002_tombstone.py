@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. blog.Blog', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['deleted_at', 'id'],
+                'indexes': [models.Index(fields=['model', 'deleted_at', 'id'], name='tombstone_sync_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model', 'object_id'), name='unique_tombstone')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingRebuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task', models.CharField(help_text='e.g. related:blog', max_length=100, unique=True)),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Failed runs so far')),
+                ('last_error', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['requested_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils import timezone
+
+
+class TimeStampedModel(models.Model):
+    """Abstract base model with created_at and updated_at fields"""
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class RelatedContent(TimeStampedModel):
+    """Precomputed top-N related items for a published blog, case study or service"""
+    KIND_CHOICES = [
+        ('blog', 'Blog'),
+        ('casestudy', 'Case Study'),
+        ('service', 'Service'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    items = models.JSONField(default=list, blank=True, help_text="Ranked related items with id, title, slug, banner_image and score")
+
+    class Meta:
+        verbose_name_plural = "Related Content"
+        ordering = ['kind', 'object_id']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_related_content'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({len(self.items or [])} related)"
+
+
+class Tombstone(models.Model):
+    """A hard-deleted content item, reported as a deletion by the sync endpoints"""
+    model = models.CharField(max_length=100, help_text="Model label, e.g. blog.Blog")
+    object_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='unique_tombstone'),
+        ]
+        indexes = [
+            models.Index(fields=['model', 'deleted_at', 'id'], name='tombstone_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class PendingRebuild(models.Model):
+    """A rebuild requested by content changes, run by `manage.py run_catalog_rebuilds` (catalog.rebuilds)"""
+    task = models.CharField(max_length=100, unique=True, help_text="e.g. related:blog")
+    requested_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0, help_text="Failed runs so far")
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        ordering = ['requested_at']
+
+    def __str__(self):
+        return self.task
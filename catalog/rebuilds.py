@@ -0,0 +1,74 @@
+"""
+Deferred catalog rebuilds. A content save only records what has to be
+rebuilt, as one PendingRebuild row per task (e.g. 'related:blog',
+'snapshot:blogs'), and `manage.py run_catalog_rebuilds --loop` runs the
+tasks outside any request, so an admin save never waits for a TF-IDF pass
+or a re-serialization of the whole type. Saves made before the next pass
+share one rebuild. Tasks run in the order they were last requested, so a
+type's related content is rebuilt before the snapshot that embeds it.
+
+A task that fails is retried on later passes, up to MAX_ATTEMPTS runs,
+then dropped with an error in the log.
+"""
+import logging
+import traceback
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import PendingRebuild
+from .related import rebuild_related
+from .snapshot import build_snapshot
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+# task prefix -> function called with the rest of the task name
+HANDLERS = {
+    'related': rebuild_related,
+    'snapshot': lambda name: build_snapshot(types=[name]),
+}
+
+
+def request_rebuild(task):
+    """Record that `task` has to run; cheap and idempotent, called after the change commits"""
+    now = timezone.now()
+    if PendingRebuild.objects.filter(task=task).update(requested_at=now):
+        return
+    try:
+        with transaction.atomic():
+            PendingRebuild.objects.create(task=task, requested_at=now)
+    except IntegrityError:
+        # Requested concurrently by another worker
+        PendingRebuild.objects.filter(task=task).update(requested_at=now)
+
+
+def run_task(task):
+    prefix, _, argument = task.partition(':')
+    HANDLERS[prefix](argument)
+
+
+def run_pending():
+    """Run every requested task once; returns the tasks that ran successfully"""
+    done = []
+    for pending in list(PendingRebuild.objects.order_by('requested_at', 'pk')):
+        # Claim by deleting: changes committed from now on request a new run,
+        # and a task another worker claimed first is skipped
+        if not PendingRebuild.objects.filter(pk=pending.pk).delete()[0]:
+            continue
+        try:
+            run_task(pending.task)
+        except Exception:
+            attempts = pending.attempts + 1
+            if attempts >= MAX_ATTEMPTS:
+                logger.exception("Giving up on catalog rebuild %s after %s attempts", pending.task, attempts)
+                continue
+            logger.exception("Catalog rebuild %s failed (attempt %s), will retry", pending.task, attempts)
+            PendingRebuild.objects.update_or_create(
+                task=pending.task, defaults={'attempts': attempts, 'last_error': traceback.format_exc()},
+            )
+            continue
+        done.append(pending.task)
+    return done
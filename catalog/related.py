@@ -0,0 +1,182 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import JSONField, OuterRef, Subquery
+
+from .models import RelatedContent
+
+
+# kind -> model and the fields used for scoring
+CONTENT_KINDS = {
+    'blog': {
+        'model': 'blog.Blog',
+        'text_fields': ['title', 'short_title', 'short_description', 'meta_keywords'],
+        'tags': 'tags',
+    },
+    'casestudy': {
+        'model': 'casestudy.CaseStudy',
+        'text_fields': ['title', 'short_description', 'client_industry', 'meta_keywords'],
+        'tags': 'tags',
+    },
+    'service': {
+        'model': 'services.Service',
+        'text_fields': ['title', 'short_title', 'short_description', 'service_type', 'meta_keywords'],
+        'tags': None,
+    },
+}
+
+# Fields whose change can move an item's neighbours
+SCORING_FIELDS = {'status', 'category', 'category_id', 'title', 'slug', 'banner_image', 'published_at'}
+
+CATEGORY_WEIGHT = 0.3
+TAG_WEIGHT = 0.2
+TEXT_WEIGHT = 0.5
+
+DEFAULT_TOP_N = 6
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from has have how in into is it its of on or our that the their this to
+we what when why with you your
+""".split())
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def get_top_n():
+    return getattr(settings, 'RELATED_CONTENT_TOP_N', DEFAULT_TOP_N)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if len(token) > 1 and token not in STOP_WORDS]
+
+
+def tfidf_vectors(documents):
+    """
+    Build L2-normalised sparse TF-IDF vectors ({term: weight}) for a list of
+    token lists, plus an inverted index (term -> [(doc, weight)]) so cosine
+    similarity only touches documents that share a term.
+    """
+    doc_freq = Counter()
+    for tokens in documents:
+        doc_freq.update(set(tokens))
+
+    total = len(documents)
+    idf = {term: math.log((1 + total) / (1 + df)) + 1 for term, df in doc_freq.items()}
+
+    vectors = []
+    postings = defaultdict(list)
+    for index, tokens in enumerate(documents):
+        counts = Counter(tokens)
+        vector = {term: (1 + math.log(count)) * idf[term] for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vector = {term: weight / norm for term, weight in vector.items()}
+        vectors.append(vector)
+        for term, weight in vector.items():
+            postings[term].append((index, weight))
+    return vectors, postings
+
+
+def cosine_scores(vectors, postings):
+    """Pairwise cosine similarity for every document pair sharing a term"""
+    scores = []
+    for vector in vectors:
+        row = defaultdict(float)
+        for term, weight in vector.items():
+            for other, other_weight in postings[term]:
+                row[other] += weight * other_weight
+        scores.append(row)
+    return scores
+
+
+def _image_url(image):
+    return image.url if image else None
+
+
+def _payload(obj, score):
+    return {
+        'id': obj.pk,
+        'title': obj.title,
+        'slug': obj.slug,
+        'banner_image': _image_url(obj.banner_image),
+        'published_at': obj.published_at.isoformat() if obj.published_at else None,
+        'score': round(score, 4),
+    }
+
+
+def compute_related(kind, top_n=None):
+    """Score every published item of a kind against the others, return {id: [payload, ...]}"""
+    config = CONTENT_KINDS[kind]
+    model = apps.get_model(config['model'])
+    top_n = top_n or get_top_n()
+
+    queryset = model.objects.filter(status='published').only(
+        'id', 'title', 'slug', 'banner_image', 'published_at', 'category_id', *config['text_fields']
+    ).order_by('pk')
+    if config['tags']:
+        queryset = queryset.prefetch_related(config['tags'])
+    items = list(queryset)
+
+    documents = [
+        tokenize(' '.join(getattr(obj, field) or '' for field in config['text_fields']))
+        for obj in items
+    ]
+    vectors, postings = tfidf_vectors(documents)
+    text_scores = cosine_scores(vectors, postings)
+
+    tag_sets = [
+        {tag.pk for tag in getattr(obj, config['tags']).all()} if config['tags'] else set()
+        for obj in items
+    ]
+
+    category_members = defaultdict(list)
+    tag_members = defaultdict(list)
+    for index, obj in enumerate(items):
+        if obj.category_id:
+            category_members[obj.category_id].append(index)
+        for tag in tag_sets[index]:
+            tag_members[tag].append(index)
+
+    related = {}
+    for index, obj in enumerate(items):
+        # Only items sharing a term, category or tag can score above zero
+        candidates = set(text_scores[index])
+        if obj.category_id:
+            candidates.update(category_members[obj.category_id])
+        for tag in tag_sets[index]:
+            candidates.update(tag_members[tag])
+        candidates.discard(index)
+
+        scored = []
+        for other in candidates:
+            score = TEXT_WEIGHT * text_scores[index].get(other, 0.0)
+            if obj.category_id and obj.category_id == items[other].category_id:
+                score += CATEGORY_WEIGHT
+            union = tag_sets[index] | tag_sets[other]
+            if union:
+                score += TAG_WEIGHT * len(tag_sets[index] & tag_sets[other]) / len(union)
+            if score > 0:
+                scored.append((score, items[other].published_at is not None, items[other].published_at, other))
+
+        scored.sort(key=lambda entry: (entry[0], entry[1], entry[2] or 0), reverse=True)
+        related[obj.pk] = [_payload(items[other], score) for score, _, _, other in scored[:top_n]]
+    return related
+
+
+def rebuild_related(kind, top_n=None):
+    """Recompute and replace the stored related items for one kind"""
+    related = compute_related(kind, top_n=top_n)
+    rows = [RelatedContent(kind=kind, object_id=object_id, items=items) for object_id, items in related.items()]
+    with transaction.atomic():
+        RelatedContent.objects.filter(kind=kind).delete()
+        RelatedContent.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def with_related(queryset, kind):
+    """Annotate `related_payload` onto a queryset so detail views need no extra query"""
+    related = RelatedContent.objects.filter(kind=kind, object_id=OuterRef('pk')).values('items')[:1]
+    return queryset.annotate(related_payload=Subquery(related, output_field=JSONField()))
@@ -0,0 +1,157 @@
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from martech_influence_backend.caching import get_dependencies, invalidate_model, is_dependency
+from martech_influence_backend.surrogate import SURROGATE_NAMESPACES, instance_keys, schedule_purge
+
+from .homepage import MODEL_HOMEPAGE_SECTIONS, invalidate_section
+from .rebuilds import request_rebuild
+from .related import CONTENT_KINDS, SCORING_FIELDS
+from .snapshot import SNAPSHOT_TYPES, read_manifest
+from .sync import SYNC_MODELS, clear_tombstone, record_tombstone
+
+
+MODEL_KINDS = {config['model']: kind for kind, config in CONTENT_KINDS.items()}
+MODEL_SNAPSHOT_TYPES = {config['model']: name for name, config in SNAPSHOT_TYPES.items()}
+
+# Saves touching only these fields don't trigger rebuilds
+COUNTER_FIELDS = {
+    'views_count', 'unique_views', 'likes_count', 'shares_count', 'downloads_count',
+    'inquiries_count', 'applications_count',
+}
+
+
+# Keys scheduled on this thread whose callback hasn't run yet
+_scheduled = threading.local()
+
+
+def _on_commit_once(key, func):
+    """
+    Run func once per key after the current transaction commits. Every call
+    queues a callback, so one discarded with a rolled-back savepoint never
+    suppresses a later one; the first callback to run for a pending key
+    clears it and runs func, the others find it cleared and do nothing.
+    """
+    pending = _scheduled.__dict__.setdefault('keys', set())
+    pending.add(key)
+
+    def run():
+        if key in pending:
+            pending.discard(key)
+            func()
+
+    run.once_key = key
+    transaction.on_commit(run)
+
+
+def schedule_related_rebuild(kind):
+    # Queued for `manage.py run_catalog_rebuilds`; a full TF-IDF pass is too slow for the request
+    if getattr(settings, 'RELATED_CONTENT_ON_SAVE', True):
+        _on_commit_once(('related', kind), lambda: request_rebuild(f'related:{kind}'))
+
+
+def schedule_snapshot_rebuild(name):
+    # Only keep an existing snapshot fresh; the first build is explicit
+    if getattr(settings, 'CATALOG_SNAPSHOT_AUTO_REBUILD', True) and read_manifest() is not None:
+        _on_commit_once(('snapshot', name), lambda: request_rebuild(f'snapshot:{name}'))
+
+
+def schedule_homepage_invalidation(section):
+    _on_commit_once(('homepage', section), lambda: invalidate_section(section))
+
+
+def schedule_action_cache_invalidation(label):
+    _on_commit_once(('action-cache', label), lambda: invalidate_model(label))
+
+
+def content_changed(model, fields=None):
+    label = model._meta.label
+    if is_dependency(label):
+        schedule_action_cache_invalidation(label)
+    kind = MODEL_KINDS.get(label)
+    if kind is not None and (fields is None or fields & (SCORING_FIELDS | set(CONTENT_KINDS[kind]['text_fields']))):
+        schedule_related_rebuild(kind)
+    # Registered after the related rebuild so the snapshot embeds fresh related items
+    snapshot_type = MODEL_SNAPSHOT_TYPES.get(label)
+    if snapshot_type is not None:
+        schedule_snapshot_rebuild(snapshot_type)
+    for section in MODEL_HOMEPAGE_SECTIONS.get(label, ()):
+        schedule_homepage_invalidation(section)
+
+
+def purge_changed(model, pks=None):
+    """Purge the reverse proxy's pages for objects `pks` of `model` (None: every page of the model)"""
+    label = model._meta.label
+    namespace = SURROGATE_NAMESPACES.get(label)
+    if namespace is None:
+        return
+    keys = {namespace} if pks is None else set().union(*(instance_keys(label, pk) for pk in pks))
+    if label in MODEL_HOMEPAGE_SECTIONS:
+        keys.add('homepage')
+    schedule_purge(keys)
+
+
+def content_bulk_changed(model, pks):
+    """For queryset.update() on content models (admin bulk actions), which sends no signals"""
+    content_changed(model)
+    purge_changed(model, pks)
+
+
+def content_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        clear_tombstone(sender, instance.pk)
+    fields = set(update_fields) if update_fields is not None else None
+    # Counter-only saves (e.g. views_count) don't change recommendations or snapshots
+    if fields is not None and fields <= COUNTER_FIELDS:
+        return
+    content_changed(sender, fields)
+    purge_changed(sender, [instance.pk])
+
+
+def content_deleted(sender, instance, **kwargs):
+    # In the deleting transaction, so the sync feed never misses a committed delete
+    record_tombstone(sender, instance.pk)
+    content_changed(sender)
+    purge_changed(sender, [instance.pk])
+
+
+def content_tags_changed(sender, instance, action, reverse=False, model=None, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # tag.blogs.add(...) arrives with the tag as instance
+    content_changed(model if reverse else type(instance))
+    if reverse:
+        purge_changed(model, pk_set)
+    else:
+        purge_changed(type(instance), [instance.pk])
+
+
+def watched_labels():
+    """Model labels the receivers above act on: catalog content and cached-view dependencies"""
+    return (
+        set(MODEL_KINDS) | set(MODEL_SNAPSHOT_TYPES) | set(MODEL_HOMEPAGE_SECTIONS)
+        | set(SURROGATE_NAMESPACES) | SYNC_MODELS | get_dependencies()
+    )
+
+
+def connect_receivers():
+    """
+    Connect the receivers for the watched models only. Other models (leads,
+    logs) send their signals to nobody, which also keeps their bulk deletes
+    on Django's fast path.
+    """
+    for label in sorted(watched_labels()):
+        model = apps.get_model(label)
+        post_save.connect(content_saved, sender=model, dispatch_uid=f'catalog-saved-{label}')
+        post_delete.connect(content_deleted, sender=model, dispatch_uid=f'catalog-deleted-{label}')
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            m2m_changed.connect(
+                content_tags_changed, sender=through, dispatch_uid=f'catalog-m2m-{through._meta.label}',
+            )
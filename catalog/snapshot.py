@@ -0,0 +1,216 @@
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from martech_influence_backend.filelock import file_lock
+
+from .related import with_related
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always written
+    brotli = None
+
+
+# snapshot type -> queryset factory, serializer and related-content kind
+SNAPSHOT_TYPES = {
+    'services': {
+        'model': 'services.Service',
+        'serializer': 'services.serializers.ServiceDetailSerializer',
+        'select_related': ['category', 'author'],
+        'prefetch_related': [],
+        'related_kind': 'service',
+    },
+    'blogs': {
+        'model': 'blog.Blog',
+        'serializer': 'blog.serializers.BlogDetailSerializer',
+        'select_related': ['author', 'category'],
+        'prefetch_related': ['tags'],
+        'related_kind': 'blog',
+    },
+    'case_studies': {
+        'model': 'casestudy.CaseStudy',
+        'serializer': 'casestudy.serializers.CaseStudyDetailSerializer',
+        'select_related': ['author', 'category'],
+        'prefetch_related': ['dynamic_fields'],
+        'related_kind': 'casestudy',
+    },
+    'jobs': {
+        'model': 'career.JobPosting',
+        'serializer': 'career.serializers.JobPostingDetailSerializer',
+        'select_related': ['department', 'category', 'job_type', 'location', 'recruiter'],
+        'prefetch_related': [],
+        'related_kind': None,
+    },
+}
+
+MANIFEST_NAME = 'manifest.json'
+LOCK_NAME = '.build.lock'
+
+
+def get_snapshot_root():
+    return Path(getattr(settings, 'CATALOG_SNAPSHOT_ROOT', Path(settings.MEDIA_ROOT) / 'catalog'))
+
+
+def get_snapshot_url():
+    """Base URL the snapshot files are served from (may be relative to the site root)"""
+    url = getattr(settings, 'CATALOG_SNAPSHOT_URL', None)
+    if url:
+        return url
+    media_url = settings.MEDIA_URL
+    if '://' not in media_url and not media_url.startswith('/'):
+        media_url = '/' + media_url
+    return media_url.rstrip('/') + '/catalog/'
+
+
+def read_manifest():
+    path = get_snapshot_root() / MANIFEST_NAME
+    try:
+        with open(path, 'rb') as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def serialize_type(name):
+    """Serialize every published item of a snapshot type to canonical JSON bytes"""
+    from django.apps import apps
+
+    config = SNAPSHOT_TYPES[name]
+    model = apps.get_model(config['model'])
+    queryset = model.objects.filter(status='published').select_related(
+        *config['select_related']
+    ).prefetch_related(*config['prefetch_related']).order_by('pk')
+    if config['related_kind']:
+        queryset = with_related(queryset, config['related_kind'])
+
+    serializer_class = import_string(config['serializer'])
+    items = serializer_class(queryset, many=True).data
+    payload = json.dumps(
+        {'type': name, 'count': len(items), 'items': items},
+        cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'), ensure_ascii=False,
+    ).encode('utf-8')
+    return payload, len(items)
+
+
+def write_variants(root, name, payload):
+    """
+    Write the plain, gzip and (when available) brotli files for one payload.
+    Runs in a worker process, so it only touches bytes and the filesystem.
+    """
+    digest = hashlib.sha256(payload).hexdigest()
+    stem = f'{name}.{digest[:16]}.json'
+    root = Path(root)
+
+    variants = {'json': payload, 'gzip': gzip.compress(payload, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(payload, quality=11)
+
+    suffixes = {'json': '', 'gzip': '.gz', 'br': '.br'}
+    entry = {'sha256': digest, 'files': {}, 'bytes': {}}
+    for variant, body in variants.items():
+        filename = stem + suffixes[variant]
+        _atomic_write(root / filename, body)
+        entry['files'][variant] = filename
+        entry['bytes'][variant] = len(body)
+    return name, entry
+
+
+def _atomic_write(path, body):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as handle:
+        handle.write(body)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def _cleanup(root, name, keep):
+    """Delete old files of a type, keeping the current and previous generations"""
+    for path in root.glob(f'{name}.*.json*'):
+        if path.name.endswith('.tmp'):
+            continue
+        digest_prefix = path.name[len(name) + 1:].split('.', 1)[0]
+        if digest_prefix not in keep:
+            path.unlink(missing_ok=True)
+
+
+def build_snapshot(types=None, force=False, workers=None):
+    """
+    Rebuild the catalog snapshot. Only types whose content hash changed are
+    rewritten; compression for several changed types runs in a process pool.
+    Returns the manifest and the list of types that changed.
+
+    Builds hold an exclusive lock on the snapshot directory, so two builders
+    (a worker and a manual run) never both bump the manifest version from the
+    same previous manifest, or clean up files the other just referenced.
+    """
+    root = get_snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+    with file_lock(root / LOCK_NAME):
+        return _build_snapshot(root, types, force, workers)
+
+
+def _build_snapshot(root, types, force, workers):
+    previous = read_manifest() or {'version': 0, 'types': {}}
+    names = list(types or SNAPSHOT_TYPES)
+
+    pending = {}
+    counts = {}
+    for name in names:
+        payload, count = serialize_type(name)
+        counts[name] = count
+        digest = hashlib.sha256(payload).hexdigest()
+        old_entry = previous['types'].get(name)
+        if force or not old_entry or old_entry['sha256'] != digest:
+            pending[name] = payload
+
+    entries = {}
+    if len(pending) > 1:
+        max_workers = workers or getattr(settings, 'CATALOG_SNAPSHOT_WORKERS', None)
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(write_variants, str(root), name, payload) for name, payload in pending.items()]
+            for future in futures:
+                name, entry = future.result()
+                entries[name] = entry
+    else:
+        for name, payload in pending.items():
+            name, entry = write_variants(root, name, payload)
+            entries[name] = entry
+
+    if not entries:
+        return previous, []
+
+    manifest_types = dict(previous['types'])
+    for name, entry in entries.items():
+        old_entry = previous['types'].get(name)
+        entry['count'] = counts[name]
+        entry['previous_sha256'] = old_entry['sha256'] if old_entry else None
+        manifest_types[name] = entry
+
+    manifest = {
+        'version': previous['version'] + 1,
+        'generated_at': timezone.now().isoformat(),
+        'compression': ['gzip', 'br'] if brotli is not None else ['gzip'],
+        'types': manifest_types,
+    }
+    _atomic_write(
+        root / MANIFEST_NAME,
+        json.dumps(manifest, sort_keys=True, indent=2).encode('utf-8'),
+    )
+
+    for name, entry in entries.items():
+        keep = {entry['sha256'][:16]}
+        if entry['previous_sha256']:
+            keep.add(entry['previous_sha256'][:16])
+        _cleanup(root, name, keep)
+
+    return manifest, sorted(entries)
@@ -0,0 +1,179 @@
+"""
+Delta sync for content consumers (the static site builder, the app's offline
+cache): what changed in a snapshot type since a point in time.
+
+    GET /api/catalog/sync/<type>/?updated_since=2026-01-01T00:00:00Z
+    GET /api/catalog/sync/<type>/?sync_token=<token from the previous page>
+
+Changes are ordered by (updated_at, id) and paged. Published items come as
+`upsert` with the same payload as the snapshot; drafts, archived or closed
+items and hard-deleted ones (Tombstone rows, written by catalog.signals) come
+as `delete`. Each page returns a `sync_token` to resume from and `has_more`.
+
+Changes newer than SYNC_SAFETY_WINDOW seconds are held back: `updated_at` is
+set when a row is saved, not when its transaction commits, so a slow
+transaction could otherwise appear behind a token a consumer already holds.
+Tombstones are kept SYNC_TOMBSTONE_RETENTION_DAYS (`manage.py
+prune_tombstones`); tokens older than that are refused and the consumer
+starts over from the snapshot.
+"""
+from datetime import timedelta, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .models import Tombstone
+from .related import with_related
+from .snapshot import SNAPSHOT_TYPES
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+DEFAULT_SAFETY_WINDOW = 5
+DEFAULT_TOMBSTONE_RETENTION_DAYS = 365
+TOKEN_SALT = 'catalog.sync'
+
+# Within one timestamp, item rows sort before tombstones
+ROW, TOMBSTONE = 0, 1
+
+SYNC_MODELS = {config['model'] for config in SNAPSHOT_TYPES.values()}
+
+
+class SyncTokenExpired(Exception):
+    pass
+
+
+def encode_token(name, cursor):
+    """The content type is signed in, so a token can't resume the sync of another type"""
+    timestamp, source, pk = cursor
+    return signing.dumps([name, timestamp.isoformat(), source, pk], salt=TOKEN_SALT)
+
+
+def get_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', DEFAULT_TOMBSTONE_RETENTION_DAYS))
+
+
+def decode_token(token, name):
+    """
+    sync_token for snapshot type `name` -> cursor. Raises SyncTokenExpired for
+    tokens issued before the tombstone retention period and ValueError for tokens
+    this server did not issue or issued for another type.
+    """
+    try:
+        value = signing.loads(token, salt=TOKEN_SALT, max_age=get_retention())
+    except signing.SignatureExpired:
+        raise SyncTokenExpired()
+    except signing.BadSignature:
+        raise ValueError("Invalid sync token")
+    if isinstance(value, list) and len(value) == 3:
+        # Issued before tokens named their type: the consumer starts over
+        raise SyncTokenExpired()
+    try:
+        token_name, timestamp, source, pk = value
+        cursor = parse_datetime(timestamp), int(source), int(pk)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid sync token")
+    if cursor[0] is None:
+        raise ValueError("Invalid sync token")
+    if token_name != name:
+        raise ValueError("Sync token was issued for another content type")
+    return cursor
+
+
+def parse_since(value):
+    """ISO 8601 timestamp -> cursor including everything changed at or after it"""
+    timestamp = parse_datetime(value or '')
+    if timestamp is None:
+        raise ValueError("updated_since must be an ISO 8601 timestamp")
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp, dt_timezone.utc)
+    if timestamp < timezone.now() - get_retention():
+        # Deletions that old may have been pruned
+        raise SyncTokenExpired()
+    return timestamp, ROW - 1, 0
+
+
+def _after(cursor, field, source):
+    """Entries of `source` that sort after `cursor` on (timestamp, source, pk)"""
+    timestamp, cursor_source, pk = cursor
+    if cursor_source < source:
+        return Q(**{f'{field}__gte': timestamp})
+    if cursor_source > source:
+        return Q(**{f'{field}__gt': timestamp})
+    return Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'pk__gt': pk})
+
+
+def get_changes(name, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """One page of changes for snapshot type `name` after `cursor` (None: from the beginning)"""
+    config = SNAPSHOT_TYPES[name]
+    model = apps.get_model(config['model'])
+    until = timezone.now() - timedelta(seconds=getattr(settings, 'SYNC_SAFETY_WINDOW', DEFAULT_SAFETY_WINDOW))
+
+    rows = model.objects.filter(updated_at__isnull=False, updated_at__lte=until)
+    tombstones = Tombstone.objects.filter(model=config['model'], deleted_at__lte=until)
+    if cursor is not None:
+        rows = rows.filter(_after(cursor, 'updated_at', ROW))
+        tombstones = tombstones.filter(_after(cursor, 'deleted_at', TOMBSTONE))
+
+    # Keys only; at most limit + 1 from each side decides the page
+    entries = [
+        (updated_at, ROW, pk, pk, status)
+        for pk, updated_at, status in rows.order_by('updated_at', 'pk').values_list('pk', 'updated_at', 'status')[:limit + 1]
+    ] + [
+        (deleted_at, TOMBSTONE, pk, object_id, 'deleted')
+        for pk, object_id, deleted_at in tombstones.order_by('deleted_at', 'pk').values_list('pk', 'object_id', 'deleted_at')[:limit + 1]
+    ]
+    entries.sort(key=lambda entry: entry[:3])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    published = [entry[3] for entry in entries if entry[1] == ROW and entry[4] == 'published']
+    items = {}
+    if published:
+        queryset = model.objects.filter(pk__in=published, status='published').select_related(
+            *config['select_related']
+        ).prefetch_related(*config['prefetch_related'])
+        if config['related_kind']:
+            queryset = with_related(queryset, config['related_kind'])
+        serializer_class = import_string(config['serializer'])
+        items = {item['id']: item for item in serializer_class(queryset, many=True).data}
+
+    changes = []
+    for timestamp, source, _, object_id, status in entries:
+        if source == ROW and object_id in items:
+            changes.append({'op': 'upsert', 'id': object_id, 'updated_at': timestamp, 'item': items[object_id]})
+        else:
+            # Unpublished since the keys were read: it comes again with its new updated_at
+            reason = 'unpublished' if status == 'published' else status
+            changes.append({'op': 'delete', 'id': object_id, 'updated_at': timestamp, 'reason': reason})
+
+    next_cursor = entries[-1][:3] if entries else cursor
+    return {
+        'changes': changes,
+        'has_more': has_more,
+        'sync_token': encode_token(name, next_cursor) if next_cursor is not None else None,
+    }
+
+
+def record_tombstone(model, pk):
+    label = model._meta.label
+    if label in SYNC_MODELS:
+        Tombstone.objects.update_or_create(model=label, object_id=pk, defaults={'deleted_at': timezone.now()})
+
+
+def clear_tombstone(model, pk):
+    """An id can be reused after a delete (SQLite); the new row supersedes the tombstone"""
+    label = model._meta.label
+    if label in SYNC_MODELS:
+        Tombstone.objects.filter(model=label, object_id=pk).delete()
+
+
+def prune_tombstones(retention_days=None):
+    retention = get_retention() if retention_days is None else timedelta(days=retention_days)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - retention).delete()
+    return deleted
@@ -0,0 +1,331 @@
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from analytics.models import EngagementEvent
+from blog.models import Blog, Category, Tag
+from contact.models import Contact
+from martech_influence_backend.caching import is_dependency
+
+from martech_influence_backend.filelock import file_lock
+
+from . import rebuilds, snapshot, sync
+from .models import PendingRebuild, RelatedContent, Tombstone
+from .related import compute_related, cosine_scores, tfidf_vectors, tokenize
+from .signals import _on_commit_once
+
+
+def once_keys(callbacks):
+    return [getattr(callback, 'once_key', None) for callback in callbacks]
+
+
+class OnCommitOnceTests(TestCase):
+    def test_key_runs_once_per_transaction(self):
+        calls = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            _on_commit_once(('test', 1), lambda: calls.append(1))
+            _on_commit_once(('test', 1), lambda: calls.append(2))
+        self.assertEqual(calls, [1])
+        # The key is free again for the next transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            _on_commit_once(('test', 1), lambda: calls.append(3))
+        self.assertEqual(calls, [1, 3])
+
+    def test_rolled_back_save_does_not_suppress_later_scheduling(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            try:
+                with transaction.atomic():
+                    Blog.objects.create(title="Rolled back", status='published')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Blog.objects.create(title="Committed", status='published')
+        self.assertIn(('action-cache', 'blog.Blog'), once_keys(callbacks))
+        self.assertEqual(once_keys(callbacks).count(('action-cache', 'blog.Blog')), 1)
+
+
+class ReceiverTests(TestCase):
+    def test_receivers_are_connected_for_watched_models_only(self):
+        for model in (Blog, Category, Tag, Blog.tags.through, User):
+            self.assertTrue(
+                post_save.has_listeners(model) or m2m_changed.has_listeners(model), model._meta.label,
+            )
+        self.assertTrue(post_delete.has_listeners(Blog))
+        # Leads and logs keep Django's fast bulk delete (e.g. when archiving leads)
+        self.assertFalse(post_delete.has_listeners(Contact))
+        self.assertFalse(post_delete.has_listeners(EngagementEvent))
+
+
+class ActionCacheInvalidationTests(TestCase):
+    def test_only_dependencies_are_invalidated(self):
+        self.assertTrue(is_dependency('blog.Blog'))
+        self.assertTrue(is_dependency('auth.User'))
+        self.assertFalse(is_dependency('contact.Contact'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            Contact.objects.create(full_name="Ada", email='ada@example.com')
+        self.assertNotIn(('action-cache', 'contact.Contact'), once_keys(callbacks))
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name="Marketing")
+        self.assertIn(('action-cache', 'blog.Category'), once_keys(callbacks))
+
+
+class ScoringTests(TestCase):
+    def test_tokenize_drops_stop_words_and_single_characters(self):
+        self.assertEqual(tokenize("How to Grow your B2B SaaS, a guide"), ['grow', 'b2b', 'saas', 'guide'])
+
+    def test_tfidf_vectors_are_normalised_and_weight_rare_terms(self):
+        vectors, postings = tfidf_vectors([['seo', 'audit'], ['seo', 'content'], ['seo']])
+        for vector in vectors:
+            self.assertAlmostEqual(sum(weight * weight for weight in vector.values()), 1.0)
+        self.assertGreater(vectors[0]['audit'], vectors[0]['seo'])
+        self.assertEqual([doc for doc, _ in postings['seo']], [0, 1, 2])
+
+    def test_cosine_scores_only_pairs_sharing_a_term(self):
+        vectors, postings = tfidf_vectors([['seo', 'audit'], ['seo', 'audit'], ['branding']])
+        scores = cosine_scores(vectors, postings)
+        self.assertAlmostEqual(scores[0][1], 1.0)
+        self.assertNotIn(2, scores[0])
+        self.assertEqual(dict(scores[2]), {2: scores[2][2]})
+
+    def test_compute_related_ranks_category_tags_and_text(self):
+        category = Category.objects.create(name="Marketing")
+        tag = Tag.objects.create(name="Growth")
+        base = Blog.objects.create(title="Technical SEO audit checklist", status='published', category=category)
+        base.tags.add(tag)
+        same_category = Blog.objects.create(title="Email newsletters", status='published', category=category)
+        same_tag = Blog.objects.create(title="Podcast launch", status='published')
+        same_tag.tags.add(tag)
+        same_text = Blog.objects.create(title="SEO audit for ecommerce", status='published')
+        Blog.objects.create(title="Unrelated hiring news", status='published')
+        Blog.objects.create(title="SEO audit draft", status='draft', category=category)
+
+        related = compute_related('blog', top_n=5)
+        ids = [item['id'] for item in related[base.pk]]
+        self.assertEqual(ids, [same_category.pk, same_text.pk, same_tag.pk])
+        scores = [item['score'] for item in related[base.pk]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(related[same_text.pk][0]['id'], base.pk)
+
+    def test_compute_related_respects_top_n(self):
+        category = Category.objects.create(name="Marketing")
+        blogs = [Blog.objects.create(title=f"Post {n}", status='published', category=category) for n in range(4)]
+        self.assertEqual(len(compute_related('blog', top_n=2)[blogs[0].pk]), 2)
+
+
+class RelatedRebuildSignalTests(TestCase):
+    def test_save_queues_rebuild_instead_of_running_it(self):
+        with mock.patch('catalog.rebuilds.rebuild_related') as rebuild:
+            with self.captureOnCommitCallbacks(execute=True):
+                Blog.objects.create(title="First", status='published')
+                Blog.objects.create(title="Second", status='published')
+            rebuild.assert_not_called()
+        self.assertEqual(list(PendingRebuild.objects.values_list('task', flat=True)), ['related:blog'])
+
+    def test_counter_only_save_queues_nothing(self):
+        blog = Blog.objects.create(title="First", status='published')
+        PendingRebuild.objects.all().delete()
+        blog.views_count = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            blog.save(update_fields=['views_count'])
+        self.assertFalse(PendingRebuild.objects.exists())
+
+    @override_settings(RELATED_CONTENT_ON_SAVE=False)
+    def test_disabled_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title="First", status='published')
+        self.assertFalse(PendingRebuild.objects.exists())
+
+    def test_command_runs_queued_rebuild(self):
+        category = Category.objects.create(name="Marketing")
+        with self.captureOnCommitCallbacks(execute=True):
+            first = Blog.objects.create(title="First", status='published', category=category)
+            Blog.objects.create(title="Second", status='published', category=category)
+        self.assertFalse(RelatedContent.objects.exists())
+        call_command('run_catalog_rebuilds', stdout=mock.MagicMock())
+        self.assertFalse(PendingRebuild.objects.exists())
+        self.assertEqual(len(RelatedContent.objects.get(kind='blog', object_id=first.pk).items), 1)
+
+
+class RunPendingTests(TestCase):
+    def test_failed_task_is_retried_then_dropped(self):
+        rebuilds.request_rebuild('related:blog')
+        with mock.patch.dict(rebuilds.HANDLERS, {'related': mock.Mock(side_effect=RuntimeError("boom"))}):
+            with self.assertLogs('catalog.rebuilds', 'ERROR'):
+                for attempt in range(1, rebuilds.MAX_ATTEMPTS):
+                    self.assertEqual(rebuilds.run_pending(), [])
+                    pending = PendingRebuild.objects.get(task='related:blog')
+                    self.assertEqual(pending.attempts, attempt)
+                    self.assertIn("boom", pending.last_error)
+                rebuilds.run_pending()
+        self.assertFalse(PendingRebuild.objects.exists())
+
+    def test_request_rebuild_is_idempotent(self):
+        rebuilds.request_rebuild('related:blog')
+        rebuilds.request_rebuild('related:blog')
+        self.assertEqual(PendingRebuild.objects.count(), 1)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        override = override_settings(CATALOG_SNAPSHOT_ROOT=self.root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.payloads = {name: (b'{"items":[]}', 0) for name in snapshot.SNAPSHOT_TYPES}
+        patcher = mock.patch('catalog.snapshot.serialize_type', side_effect=lambda name: self.payloads[name])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def files(self, name):
+        return sorted(path.name for path in snapshot.get_snapshot_root().glob(f'{name}.*.json'))
+
+    def test_only_changed_types_bump_the_version(self):
+        manifest, changed = snapshot.build_snapshot()
+        self.assertEqual((manifest['version'], changed), (1, sorted(snapshot.SNAPSHOT_TYPES)))
+        manifest, changed = snapshot.build_snapshot()
+        self.assertEqual((manifest['version'], changed), (1, []))
+
+        first = self.files('blogs')
+        self.payloads['blogs'] = (b'{"items":[1]}', 1)
+        manifest, changed = snapshot.build_snapshot(types=['blogs'])
+        self.assertEqual((manifest['version'], changed), (2, ['blogs']))
+        self.assertEqual(manifest['types']['blogs']['count'], 1)
+        self.assertEqual(snapshot.read_manifest(), manifest)
+        # The previous generation stays for clients holding the old manifest, older ones go
+        self.assertEqual(len(self.files('blogs')), 2)
+        self.payloads['blogs'] = (b'{"items":[1,2]}', 2)
+        snapshot.build_snapshot(types=['blogs'])
+        self.assertEqual(len(self.files('blogs')), 2)
+        self.assertFalse(set(first) & set(self.files('blogs')))
+
+    def test_concurrent_build_waits_for_the_lock(self):
+        snapshot.build_snapshot()
+        self.payloads['blogs'] = (b'{"items":[1]}', 1)
+        results = []
+        with file_lock(snapshot.get_snapshot_root() / snapshot.LOCK_NAME):
+            builder = threading.Thread(target=lambda: results.append(snapshot.build_snapshot(types=['blogs'])))
+            builder.start()
+            time.sleep(0.2)
+            self.assertTrue(builder.is_alive())
+            self.assertEqual(snapshot.read_manifest()['version'], 1)
+        builder.join(5)
+        self.assertEqual(results[0][0]['version'], 2)
+
+    def test_save_queues_snapshot_after_related_rebuild(self):
+        snapshot.build_snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title="First", status='published')
+        self.assertEqual(
+            list(PendingRebuild.objects.order_by('requested_at', 'pk').values_list('task', flat=True)),
+            ['related:blog', 'snapshot:blogs'],
+        )
+
+        calls = []
+        handlers = {
+            'related': lambda kind: calls.append(('related', kind)),
+            'snapshot': lambda name: calls.append(('snapshot', name)),
+        }
+        with mock.patch.dict(rebuilds.HANDLERS, handlers):
+            rebuilds.run_pending()
+        self.assertEqual(calls, [('related', 'blog'), ('snapshot', 'blogs')])
+
+    def test_no_snapshot_rebuild_before_first_build(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title="First", status='published')
+        self.assertFalse(PendingRebuild.objects.filter(task__startswith='snapshot:').exists())
+
+
+@override_settings(SYNC_SAFETY_WINDOW=0, RATE_LIMIT_ENABLED=False)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.moment = timezone.now() - timedelta(minutes=5)
+
+    def blog(self, title, status='published', at=None):
+        blog = Blog.objects.create(title=title, status=status)
+        Blog.objects.filter(pk=blog.pk).update(updated_at=at or self.moment)
+        return blog
+
+    def pages(self, name='blogs', limit=2):
+        changes, cursor = [], None
+        while True:
+            page = sync.get_changes(name, cursor, limit)
+            changes += page['changes']
+            cursor = sync.decode_token(page['sync_token'], name)
+            if not page['has_more']:
+                return changes, page['sync_token']
+
+    def get(self, query):
+        return self.client.get(f'/api/catalog/sync/blogs/?{query}', HTTP_HOST='localhost')
+
+    def test_keyset_pages_cover_ties_exactly_once(self):
+        blogs = [self.blog(f"Post {n}") for n in range(5)]
+        draft = self.blog("Draft", status='draft')
+        changes, token = self.pages()
+        self.assertEqual([change['id'] for change in changes], [blog.pk for blog in blogs] + [draft.pk])
+        self.assertEqual([change['op'] for change in changes], ['upsert'] * 5 + ['delete'])
+        self.assertEqual(changes[-1]['reason'], 'draft')
+
+        # Nothing new after the last token; a later edit comes once
+        self.assertEqual(sync.get_changes('blogs', sync.decode_token(token, 'blogs'))['changes'], [])
+        Blog.objects.filter(pk=blogs[0].pk).update(updated_at=self.moment + timedelta(seconds=1))
+        later = sync.get_changes('blogs', sync.decode_token(token, 'blogs'))
+        self.assertEqual([change['id'] for change in later['changes']], [blogs[0].pk])
+
+    def test_tombstones_sort_after_rows_with_the_same_timestamp(self):
+        kept = self.blog("Kept")
+        gone = self.blog("Gone")
+        gone_pk = gone.pk
+        gone.delete()
+        tombstone = Tombstone.objects.get(model='blog.Blog', object_id=gone_pk)
+        Tombstone.objects.filter(pk=tombstone.pk).update(deleted_at=self.moment)
+        other = self.blog("Other")
+
+        changes, _ = self.pages(limit=1)
+        self.assertEqual(
+            [(change['op'], change['id']) for change in changes],
+            [('upsert', kept.pk), ('upsert', other.pk), ('delete', gone_pk)],
+        )
+        self.assertEqual(changes[-1]['reason'], 'deleted')
+
+    def test_updated_since_includes_the_boundary(self):
+        blog = self.blog("Boundary")
+        self.blog("Earlier", at=self.moment - timedelta(seconds=1))
+        since = self.moment.isoformat().replace('+00:00', 'Z')
+        changes = sync.get_changes('blogs', sync.parse_since(since))['changes']
+        self.assertEqual([change['id'] for change in changes], [blog.pk])
+
+    def test_token_is_bound_to_its_type(self):
+        self.blog("Post")
+        token = sync.get_changes('blogs')['sync_token']
+        with self.assertRaisesMessage(ValueError, "another content type"):
+            sync.decode_token(token, 'services')
+        response = self.client.get(f'/api/catalog/sync/services/?sync_token={token}', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message_code'], 'INVALID_SYNC_PARAMETERS')
+        self.assertEqual(self.get('sync_token=forged').status_code, 400)
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_expired_tokens_are_gone(self):
+        self.blog("Post")
+        issued = time.time() - 31 * 86400
+        with mock.patch('django.core.signing.time.time', return_value=issued):
+            old_token = sync.get_changes('blogs')['sync_token']
+        response = self.get(f'sync_token={old_token}')
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json()['message_code'], 'SYNC_TOKEN_EXPIRED')
+
+        since = (timezone.now() - timedelta(days=31)).isoformat().replace('+00:00', 'Z')
+        self.assertEqual(self.get(f'updated_since={since}').status_code, 410)
+        # Tokens from before the type was signed in
+        legacy = sync.signing.dumps([self.moment.isoformat(), sync.ROW, 1], salt=sync.TOKEN_SALT)
+        self.assertEqual(self.get(f'sync_token={legacy}').status_code, 410)
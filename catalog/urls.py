@@ -0,0 +1,12 @@
+from django.urls import path
+from .views import CatalogSnapshotViewSet, HomepageViewSet, SyncViewSet
+
+catalog_manifest = CatalogSnapshotViewSet.as_view({'get': 'manifest'})
+homepage = HomepageViewSet.as_view({'get': 'list'})
+catalog_sync = SyncViewSet.as_view({'get': 'list'})
+
+urlpatterns = [
+    path('manifest/', catalog_manifest, name='catalog-manifest'),
+    path('homepage/', homepage, name='homepage'),
+    path('sync/<str:content_type>/', catalog_sync, name='catalog-sync'),
+]
@@ -0,0 +1,118 @@
+from rest_framework import viewsets, status
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.utils import create_response
+from .homepage import get_sections
+from .snapshot import SNAPSHOT_TYPES, get_snapshot_url, read_manifest
+from .sync import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SyncTokenExpired, decode_token, get_changes, parse_since
+
+
+class CatalogSnapshotViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the prebuilt catalog snapshot - GET operations only
+    """
+
+    def manifest(self, request):
+        """Return the current snapshot manifest with absolute file URLs"""
+        manifest = read_manifest()
+        if manifest is None:
+            return create_response(
+                status_code=status.HTTP_404_NOT_FOUND,
+                message="Catalog snapshot has not been built",
+                message_code="CATALOG_SNAPSHOT_NOT_FOUND",
+                status=False
+            )
+
+        base_url = request.build_absolute_uri(get_snapshot_url())
+        types = {}
+        for name, entry in manifest['types'].items():
+            types[name] = {
+                'count': entry['count'],
+                'sha256': entry['sha256'],
+                'bytes': entry['bytes'],
+                'urls': {variant: base_url + filename for variant, filename in entry['files'].items()},
+            }
+
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Catalog manifest retrieved successfully",
+            message_code="CATALOG_MANIFEST_RETRIEVED",
+            data={
+                'version': manifest['version'],
+                'generated_at': manifest['generated_at'],
+                'compression': manifest['compression'],
+                'types': types,
+            }
+        )
+
+
+class HomepageViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the homepage aggregate - GET operations only
+    """
+
+    @cache_headers('homepage')
+    def list(self, request):
+        """Return every homepage section in one response"""
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Homepage retrieved successfully",
+            message_code="HOMEPAGE_RETRIEVED",
+            data=get_sections(request)
+        )
+
+
+class SyncViewSet(viewsets.ViewSet):
+    """
+    ViewSet for delta sync of a snapshot type - GET operations only
+    """
+
+    def list(self, request, content_type=None):
+        """
+        Changes since ?updated_since=<ISO 8601> or ?sync_token=<token>, oldest first
+        (no parameter: everything). Page size ?limit= (default 100, max 500).
+        Reads the primary: a lagging replica could hide changes behind the token.
+        """
+        if content_type not in SNAPSHOT_TYPES:
+            return create_response(
+                status_code=status.HTTP_404_NOT_FOUND,
+                message=f"Unknown content type. Use one of: {', '.join(SNAPSHOT_TYPES)}",
+                message_code="SYNC_TYPE_NOT_FOUND",
+                status=False
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="limit must be an integer",
+                message_code="INVALID_SYNC_PARAMETERS",
+                status=False
+            )
+
+        token = request.query_params.get('sync_token')
+        since = request.query_params.get('updated_since')
+        try:
+            cursor = decode_token(token, content_type) if token else parse_since(since) if since else None
+            data = get_changes(content_type, cursor, min(max(limit, 1), MAX_PAGE_SIZE))
+        except SyncTokenExpired:
+            return create_response(
+                status_code=status.HTTP_410_GONE,
+                message="Sync token has expired; start again from the catalog snapshot",
+                message_code="SYNC_TOKEN_EXPIRED",
+                status=False
+            )
+        except ValueError as exc:
+            return create_response(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message=str(exc),
+                message_code="INVALID_SYNC_PARAMETERS",
+                status=False
+            )
+
+        return create_response(
+            status_code=status.HTTP_200_OK,
+            message="Changes retrieved successfully",
+            message_code="SYNC_CHANGES_RETRIEVED",
+            data=data
+        )
@@ -1,4 +1,5 @@
 from django.db import models
+from martech_influence_backend.lead_data import AtomicLeadSaveMixin
 
 
 class TimeStampedModel(models.Model):
@@ -10,7 +11,7 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
-class Contact(TimeStampedModel):
+class Contact(AtomicLeadSaveMixin, TimeStampedModel):
     """Contact form model"""
     
     # Contact Information
@@ -26,6 +27,8 @@ class Contact(TimeStampedModel):
     utm_campaign = models.CharField(max_length=100, blank=True, null=True)
     utm_term = models.CharField(max_length=100, blank=True, null=True)
     utm_content = models.CharField(max_length=100, blank=True, null=True)
+    # Set when accepted through the write-behind spool (analytics/lead_spool.py)
+    submission_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Contacts"
@@ -2,7 +2,9 @@ from django.urls import path
 from .views import ContactViewSet
 
 contact_create = ContactViewSet.as_view({'post': 'create'})
+contact_bulk_create = ContactViewSet.as_view({'post': 'bulk_create'})
 
 urlpatterns = [
     path('contacts/', contact_create, name='contact-create'),
+    path('contacts/bulk/', contact_bulk_create, name='contact-bulk-create'),
 ]
@@ -2,6 +2,9 @@ from rest_framework import viewsets, status
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.ratelimit import rate_limit
+from analytics.bulk_leads import bulk_create_leads
+from analytics.lead_spool import enqueue_lead, write_behind_enabled
 from .models import Contact
 from .serializers import ContactCreateSerializer
 
@@ -75,14 +78,24 @@ class ContactViewSet(viewsets.ViewSet):
         ),
         responses={
             201: openapi.Response(description='Contact form submitted successfully'),
+            202: openapi.Response(description='Accepted into the write-behind queue (LEAD_WRITE_BEHIND); returns submission_id'),
             400: openapi.Response(description='Bad request - validation errors')
         },
         tags=['Contact']
     )
+    @rate_limit('contact')
     def create(self, request):
         """Create a new contact (public API)"""
         serializer = ContactCreateSerializer(data=request.data)
         if serializer.is_valid():
+            if write_behind_enabled():
+                # Written by `manage.py flush_lead_spool`
+                return create_response(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    message="Contact form received",
+                    message_code="CONTACT_QUEUED",
+                    data={"submission_id": enqueue_lead('contact', serializer.validated_data)}
+                )
             serializer.save()
             return create_response(
                 status_code=status.HTTP_201_CREATED,
@@ -97,3 +110,25 @@ class ContactViewSet(viewsets.ViewSet):
             status=False,
             data=serializer.errors
         )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Submit up to LEAD_BULK_MAX_ITEMS contacts at once (partner integrations). "
+            "Body: a JSON array, or NDJSON with Content-Type application/x-ndjson, of items shaped like "
+            "the single create endpoint, each with an optional submission_id (UUID) for safe retries. "
+            "Requires the contact.add_contact permission (HTTP Basic auth)."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={
+            200: openapi.Response(description='Per-item results: created (with id), duplicate or invalid (with errors)'),
+            400: openapi.Response(description='Body is not a JSON array or NDJSON'),
+            401: openapi.Response(description='Authentication required'),
+            403: openapi.Response(description='Missing contact.add_contact permission'),
+            413: openapi.Response(description='More than LEAD_BULK_MAX_ITEMS items'),
+        },
+        tags=['Contact']
+    )
+    @rate_limit('lead_bulk')
+    def bulk_create(self, request):
+        """Create many contacts in one request"""
+        return bulk_create_leads(request, 'contact', ContactCreateSerializer, "CONTACTS_BULK_PROCESSED")
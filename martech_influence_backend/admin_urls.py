@@ -0,0 +1,6 @@
+from django.contrib import admin
+
+# Imported lazily through lazy_include('admin/', ...) in urls.py
+admin.autodiscover()
+
+urlpatterns = admin.site.get_urls()
@@ -0,0 +1,86 @@
+"""
+Helpers for bulk write endpoints: JSON array / NDJSON bodies and
+validation of many items with one query per related model.
+
+    class LeadCreateSerializer(serializers.ModelSerializer):
+        serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
+    context = {'prefetched': prefetch_related_targets(LeadCreateSerializer, items)}
+    LeadCreateSerializer(data=items, many=True, context=context).is_valid()
+
+Without a 'prefetched' context the field behaves like PrimaryKeyRelatedField,
+so single-item endpoints are unaffected.
+"""
+import json
+
+from django.core.exceptions import ValidationError
+from rest_framework.relations import PrimaryKeyRelatedField
+
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class InvalidLine:
+    """Placeholder for an NDJSON line that isn't valid JSON, reported per item"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def parse_ndjson(body):
+    """One item per non-empty line; unreadable lines become InvalidLine"""
+    items = []
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as exc:
+            items.append(InvalidLine(f"Invalid JSON: {exc}"))
+    return items
+
+
+def get_items(request):
+    """Items from a JSON array or NDJSON body; None when the body is neither"""
+    content_type = (request.content_type or '').split(';', 1)[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        return parse_ndjson(request.body)
+    data = request.data
+    return data if isinstance(data, list) else None
+
+
+def _to_pk(model, value):
+    try:
+        return model._meta.pk.to_python(value)
+    except (ValidationError, TypeError, ValueError):
+        return None
+
+
+def prefetch_related_targets(serializer_class, items):
+    """{field name: {pk: object}} for the serializer's writable primary key fields, one query each"""
+    prefetched = {}
+    for name, field in serializer_class().fields.items():
+        if not isinstance(field, PrimaryKeyRelatedField) or field.read_only:
+            continue
+        queryset = field.get_queryset()
+        pks = {_to_pk(queryset.model, item.get(name)) for item in items if isinstance(item, dict)} - {None}
+        prefetched[name] = queryset.in_bulk(pks)
+    return prefetched
+
+
+class PrefetchedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """Resolves ids from context['prefetched'] when present instead of one query per item"""
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get('prefetched', {}).get(self.field_name)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        pk = _to_pk(self.get_queryset().model, data)
+        if pk is None:
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return prefetched[pk]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
@@ -0,0 +1,216 @@
+"""
+Two-tier Django cache backend: a bounded in-process LRU in front of a shared
+cache (Redis/Memcached, or the file-based cache on a single host).
+
+    CACHES = {'default': {
+        'BACKEND': 'martech_influence_backend.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://...'},
+            'LOCAL_MAX_BYTES': 16 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 5,
+        },
+    }}
+
+Reads are served from local memory for up to LOCAL_TIMEOUT seconds, then
+from the shared cache. Writes go to the shared cache and update this
+worker's copy; other workers can keep their copy until it expires locally.
+
+Invalidation is therefore broadcast through version keys: cached content is
+stored under keys that embed a version (homepage sections, @cached_action),
+and bumping the version in the shared cache makes every worker compute new
+keys. Version keys (VERSION_KEYS patterns) are kept locally for only
+VERSION_LOCAL_TIMEOUT seconds, and locks and counters (SHARED_ONLY patterns)
+are never kept locally.
+"""
+import fnmatch
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+
+DEFAULT_LOCAL_MAX_ENTRIES = 10000
+DEFAULT_LOCAL_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_LOCAL_TIMEOUT = 5
+DEFAULT_VERSION_LOCAL_TIMEOUT = 1
+DEFAULT_VERSION_KEYS = ['*:version', '*:version:*']
+DEFAULT_SHARED_ONLY = ['*:lock', 'ratelimit:*']
+
+
+class LocalLRU:
+    """Process-local LRU of pickled values with per-entry expiry, bounded by entries and bytes"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()  # key -> (expires_at, pickled value)
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        """(True, pickled value) or (False, None) when missing or expired"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return False, None
+            if item[0] <= now:
+                self._pop(key)
+                return False, None
+            self._items.move_to_end(key)
+            return True, item[1]
+
+    def set(self, key, pickled, expires_at):
+        with self._lock:
+            self._pop(key)
+            if len(pickled) > self.max_bytes:
+                return
+            self._items[key] = (expires_at, pickled)
+            self.size += len(pickled)
+            while self.size > self.max_bytes or len(self._items) > self.max_entries:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def _pop(self, key):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= len(item[1])
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        shared = dict(options['SHARED'])
+        backend = import_string(shared.pop('BACKEND'))
+        self.shared = backend(shared.pop('LOCATION', ''), shared)
+        self.local = LocalLRU(
+            options.get('LOCAL_MAX_ENTRIES', DEFAULT_LOCAL_MAX_ENTRIES),
+            options.get('LOCAL_MAX_BYTES', DEFAULT_LOCAL_MAX_BYTES),
+        )
+        self.local_timeout = options.get('LOCAL_TIMEOUT', DEFAULT_LOCAL_TIMEOUT)
+        self.version_local_timeout = options.get('VERSION_LOCAL_TIMEOUT', DEFAULT_VERSION_LOCAL_TIMEOUT)
+        self.version_keys = list(options.get('VERSION_KEYS', DEFAULT_VERSION_KEYS))
+        self.shared_only = list(options.get('SHARED_ONLY', DEFAULT_SHARED_ONLY))
+
+    # -- local tier -----------------------------------------------------------
+
+    def _local_ttl(self, key, timeout=DEFAULT_TIMEOUT):
+        """Seconds `key` may be served from local memory (0: never)"""
+        if any(fnmatch.fnmatchcase(key, pattern) for pattern in self.shared_only):
+            return 0
+        ttl = self.local_timeout
+        if any(fnmatch.fnmatchcase(key, pattern) for pattern in self.version_keys):
+            ttl = self.version_local_timeout
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            ttl = min(ttl, timeout - time.time())
+        return ttl
+
+    def _remember(self, key, version, value, timeout=DEFAULT_TIMEOUT):
+        local_key = self.make_and_validate_key(key, version=version)
+        ttl = self._local_ttl(key, timeout)
+        if ttl > 0:
+            self.local.set(local_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+        else:
+            self.local.delete(local_key)
+
+    def _recall(self, key, version):
+        found, pickled = self.local.get(self.make_and_validate_key(key, version=version), time.time())
+        return found, pickle.loads(pickled) if found else None
+
+    def _forget(self, key, version):
+        self.local.delete(self.make_and_validate_key(key, version=version))
+
+    # -- cache API ------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        found, value = self._recall(key, version)
+        if found:
+            return value
+        sentinel = object()
+        value = self.shared.get(key, sentinel, version=version)
+        if value is sentinel:
+            return default
+        self._remember(key, version, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        results, missing = {}, []
+        for key in keys:
+            found, value = self._recall(key, version)
+            if found:
+                results[key] = value
+            else:
+                missing.append(key)
+        if missing:
+            fetched = self.shared.get_many(missing, version=version)
+            for key, value in fetched.items():
+                self._remember(key, version, value)
+            results.update(fetched)
+        return results
+
+    def has_key(self, key, version=None):
+        found, _ = self._recall(key, version)
+        return found or self.shared.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._remember(key, version, value, timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        for key, value in data.items():
+            if key not in failed:
+                self._remember(key, version, value, timeout)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Decided by the shared cache, so locks taken with add() hold across workers
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._remember(key, version, value, timeout)
+        else:
+            self._forget(key, version)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self._forget(key, version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        value = self.shared.decr(key, delta, version=version)
+        self._forget(key, version)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._forget(key, version)
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._forget(key, version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._forget(key, version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,208 @@
+"""
+Stampede-protected response caching for ViewSet actions.
+
+    @cached_action(depends_on=['blog.Blog', 'blog.Category', 'blog.Tag'])
+    @read_from_replica
+    def list(self, request):
+        ...
+
+Successful responses are cached per URL (path and sorted query string) for
+ACTION_CACHE_TIMEOUT seconds and kept ACTION_CACHE_STALE_TTL seconds longer
+as stale copies. On top of that:
+
+- single flight: on a miss only the request holding the per-key lock runs
+  the action; the others wait for its result instead of recomputing it
+- probabilistic early recompute (XFetch): shortly before expiry a request
+  may refresh the entry, with a probability that grows as expiry nears and
+  with the time the action takes, so popular keys rarely expire at all
+- stale-while-revalidate: while one request refreshes an expired entry,
+  everyone else is served the stale copy
+
+Saving or deleting a model listed in `depends_on` bumps its version
+(catalog.signals), which every key of the actions depending on it includes.
+Only labels some @cached_action or @conditional_get lists are bumped, so
+saving a lead or a log row costs no cache write.
+With a per-process cache (LocMemCache) this coalesces within one worker;
+a shared cache (Redis/Memcached) coalesces across workers.
+"""
+import functools
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import get_resolver
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_STALE_TTL = 300
+DEFAULT_LOCK_TIMEOUT = 10
+DEFAULT_BETA = 1.0
+WAIT_INTERVAL = 0.05
+
+
+def get_cache(alias=None):
+    return caches[alias or getattr(settings, 'ACTION_CACHE_ALIAS', 'default')]
+
+
+# Model labels listed in some depends_on
+_dependencies = set()
+_dependencies_loaded = False
+_dependencies_lock = threading.Lock()
+
+
+def register_dependencies(labels):
+    _dependencies.update(labels)
+
+
+def _load_dependencies():
+    global _dependencies_loaded
+    if not _dependencies_loaded:
+        with _dependencies_lock:
+            if not _dependencies_loaded:
+                # The decorators register while the views are imported; a management
+                # command or worker saving content may not have imported them yet
+                get_resolver().url_patterns
+                _dependencies_loaded = True
+
+
+def get_dependencies():
+    """Model labels some cached action or ETag depends on"""
+    _load_dependencies()
+    return frozenset(_dependencies)
+
+
+def is_dependency(label):
+    """Whether any cached action or ETag depends on model `label`"""
+    _load_dependencies()
+    return label in _dependencies
+
+
+def _version_key(label):
+    return f'action-cache:version:{label}'
+
+
+def invalidate_model(label, alias=None):
+    """Bump the version of a model label; entries cached under the old one are never read again"""
+    cache = get_cache(alias)
+    try:
+        cache.incr(_version_key(label))
+    except ValueError:
+        cache.add(_version_key(label), time.time_ns(), timeout=None)
+
+
+def get_versions(labels, cache):
+    keys = [_version_key(label) for label in labels]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions.append(str(version))
+    return versions
+
+
+def request_key(prefix, request, versions):
+    query = '&'.join(sorted(f'{name}={value}' for name, values in request.GET.lists() for value in values))
+    raw = '|'.join([request.build_absolute_uri(request.path), query, *versions])
+    return f'action-cache:{prefix}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+
+def should_refresh(entry, now, beta):
+    """XFetch: refresh early with probability rising as expiry nears, scaled by compute time"""
+    if now >= entry['expires_at']:
+        return True
+    return now - entry['delta'] * beta * math.log(1.0 - random.random()) >= entry['expires_at']
+
+
+def _store(cache, key, response, delta, timeout, stale_ttl):
+    entry = {
+        'data': response.data,
+        'status': response.status_code,
+        'delta': delta,
+        'expires_at': time.time() + timeout,
+    }
+    cache.set(key, entry, timeout + stale_ttl)
+    return entry
+
+
+def _respond(entry, outcome):
+    response = Response(entry['data'], status=entry['status'])
+    response['X-Cache'] = outcome
+    return response
+
+
+def cached_action(timeout=None, stale_ttl=None, depends_on=(), beta=None, lock_timeout=None, alias=None):
+    """Cache a ViewSet action's 200 responses with stampede protection (see module docstring)"""
+    register_dependencies(depends_on)
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not getattr(settings, 'ACTION_CACHE_ENABLED', True) or request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            cache = get_cache(alias)
+            fresh_for = timeout if timeout is not None else getattr(settings, 'ACTION_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+            stale_for = stale_ttl if stale_ttl is not None else getattr(settings, 'ACTION_CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+            lock_for = lock_timeout or getattr(settings, 'ACTION_CACHE_LOCK_TIMEOUT', DEFAULT_LOCK_TIMEOUT)
+            scale = beta if beta is not None else getattr(settings, 'ACTION_CACHE_BETA', DEFAULT_BETA)
+            name = f'{type(self).__name__}.{view_method.__name__}'
+            key = request_key(name, request, get_versions(depends_on, cache))
+            lock_key = f'{key}:lock'
+
+            def compute(outcome):
+                started = time.monotonic()
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code == status.HTTP_200_OK:
+                    _store(cache, key, response, time.monotonic() - started, fresh_for, stale_for)
+                response['X-Cache'] = outcome
+                metrics.increment('action_cache.computed', action=name)
+                return response
+
+            entry = cache.get(key)
+            if entry is not None and not should_refresh(entry, time.time(), scale):
+                metrics.increment('action_cache.hit', action=name)
+                return _respond(entry, 'HIT')
+
+            token = uuid.uuid4().hex
+            if cache.add(lock_key, token, lock_for):
+                try:
+                    return compute('MISS' if entry is None else 'REFRESH')
+                finally:
+                    # After lock_for the lock may have expired and been taken by another
+                    # request; only release our own
+                    if cache.get(lock_key) == token:
+                        cache.delete(lock_key)
+
+            if entry is not None:
+                # Someone else is refreshing it
+                if time.time() < entry['expires_at']:
+                    metrics.increment('action_cache.hit', action=name)
+                    return _respond(entry, 'HIT')
+                metrics.increment('action_cache.stale', action=name)
+                return _respond(entry, 'STALE')
+
+            # Wait for the request computing it rather than running the same queries
+            deadline = time.monotonic() + lock_for
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    metrics.increment('action_cache.coalesced', action=name)
+                    return _respond(entry, 'HIT')
+                if cache.get(lock_key) is None:
+                    break  # it finished without a cacheable response (or gave up)
+            return compute('MISS')
+        return wrapper
+    return decorator
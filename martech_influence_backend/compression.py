@@ -0,0 +1,165 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+DEFAULT_MIN_SIZE = 1024
+DEFAULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# HTML is left alone: admin pages carry CSRF tokens (BREACH)
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/openapi+json', 'application/javascript', 'application/xml',
+    'application/yaml', 'application/x-ndjson', 'image/svg+xml', 'text/css', 'text/csv',
+    'text/javascript', 'text/plain', 'text/xml',
+)
+
+
+def parse_accept_encoding(header):
+    """'br;q=1.0, gzip;q=0.5, *;q=0' -> {'br': 1.0, 'gzip': 0.5, '*': 0.0}"""
+    preferences = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences[name] = quality
+    return preferences
+
+
+def choose_encoding(header):
+    """Best encoding the client accepts; brotli wins ties when it is installed"""
+    preferences = parse_accept_encoding(header or '')
+    best, best_quality = None, 0.0
+    for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        quality = preferences.get(encoding, preferences.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding, cached=False):
+    """Cached variants are compressed once, so they get a higher (slower) level"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=9 if cached else 5)
+    return gzip.compress(body, compresslevel=9 if cached else 6, mtime=0)
+
+
+class VariantCache:
+    """Process-local LRU of compressed bodies keyed by (sha256 of body, encoding)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+
+variant_cache = VariantCache(getattr(settings, 'COMPRESSION_CACHE_MAX_BYTES', DEFAULT_CACHE_MAX_BYTES))
+
+
+def is_cacheable(response):
+    """Responses a shared cache may keep; their compressed variants are kept too"""
+    cache_control = response.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control or 'private' in cache_control:
+        return False
+    return response.has_header('ETag') or any(
+        directive in cache_control for directive in ('max-age', 's-maxage', 'public', 'no-cache')
+    )
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip content negotiation for API responses. Bodies under
+    COMPRESSION_MIN_SIZE are sent as-is. For cacheable responses the
+    compressed variant is stored keyed by the body digest, so repeated
+    bodies are compressed once per process.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        body = response.content
+        if is_cacheable(response):
+            key = (hashlib.sha256(body).digest(), encoding)
+            compressed = variant_cache.get(key)
+            if compressed is None:
+                compressed = compress(body, encoding, cached=True)
+                variant_cache.set(key, compressed)
+                metrics.increment('compression.variant_miss', encoding=encoding)
+            else:
+                metrics.increment('compression.variant_hit', encoding=encoding)
+        else:
+            compressed = compress(body, encoding)
+            metrics.increment('compression.dynamic', encoding=encoding)
+
+        if len(compressed) >= len(body):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The representation changed, so a strong validator must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
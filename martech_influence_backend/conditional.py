@@ -0,0 +1,100 @@
+"""
+Conditional GETs (ETag / Last-Modified) for ViewSet detail actions.
+
+    @cache_headers('blog', ...)
+    @read_from_replica
+    @conditional_get(Blog, BlogDetailSerializer, depends_on=['blog.Blog', 'blog.Category', 'blog.Tag'],
+                     filters={'status': 'published'}, view_type='blog')
+    def retrieve(self, request, pk=None):
+        ...
+
+Before the action runs, one indexed `values_list('updated_at')` lookup by
+primary key decides freshness. The ETag hashes the row's
+`updated_at`, the serializer version (class name, Meta.fields and an
+optional `etag_version` attribute to bump when a representation changes),
+the query string (sparse fieldsets change the body) and the @cached_action
+versions of `depends_on`, so renaming a category or retagging a post also
+changes the ETag. If-None-Match / If-Modified-Since matches are answered 304
+without loading or serializing the object.
+
+The ETag is weak (W/"..."): counters (views_count, unique_views, likes)
+change through .update() without touching `updated_at`, so the same ETag
+covers bodies that differ in those counts, and a 304 can leave them a little
+behind; with `view_type` set, a 304 still counts as a view. Being weak also
+makes it the same validator whether or not CompressionMiddleware encodes the
+body (it would weaken a strong ETag there anyway). If-None-Match compares
+weakly, so 304s work; If-Match needs a strong match and fails with 412.
+"""
+import functools
+import hashlib
+
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+
+from . import metrics
+from .caching import get_cache, get_versions, register_dependencies
+
+
+@functools.lru_cache(maxsize=None)
+def serializer_version(serializer_class):
+    meta = getattr(serializer_class, 'Meta', None)
+    fields = getattr(meta, 'fields', ())
+    if not isinstance(fields, str):
+        fields = ','.join(fields)
+    return f"{serializer_class.__name__}:{getattr(serializer_class, 'etag_version', 1)}:{fields}"
+
+
+def make_etag(label, pk, updated_at, serializer_class, request, versions):
+    query = '&'.join(sorted(f'{name}={value}' for name, values in request.GET.lists() for value in values))
+    raw = '|'.join([label, str(pk), updated_at.isoformat(), serializer_version(serializer_class), query, *versions])
+    return 'W/' + quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+
+
+def count_view(model, view_type, pk, request):
+    """What a detail action records for a view, without loading the row"""
+    from analytics.unique_views import record_view
+
+    model.objects.filter(pk=pk).update(views_count=Coalesce(F('views_count'), 0) + 1)
+    record_view(view_type, pk, request)
+
+
+def conditional_get(model, serializer_class, depends_on=(), filters=None, view_type=None):
+    """Answer conditional GETs of a detail action with 304 when `updated_at` says nothing changed"""
+    label = model._meta.label
+    register_dependencies(depends_on)
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+            pk = kwargs.get('pk')
+            try:
+                updated_at = model.objects.filter(pk=pk, **(filters or {})).values_list('updated_at', flat=True).first()
+            except (TypeError, ValueError):
+                updated_at = None
+            if updated_at is None:
+                # Missing, unpublished or never timestamped: no validators, the action answers
+                return view_method(self, request, *args, **kwargs)
+
+            etag = make_etag(label, pk, updated_at, serializer_class, request, get_versions(depends_on, get_cache()))
+            last_modified = int(updated_at.timestamp())
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                if not_modified.status_code == status.HTTP_304_NOT_MODIFIED:
+                    if view_type:
+                        count_view(model, view_type, pk, request)
+                    metrics.increment('conditional.not_modified', model=label)
+                response = not_modified
+            else:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            return response
+        return wrapper
+    return decorator
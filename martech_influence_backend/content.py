@@ -0,0 +1,299 @@
+"""
+Save-time processing of rich-text (TinyMCE) content: sanitized HTML with
+heading anchors, plain text, excerpt, word count, reading time and a table
+of contents. Used by Blog and CaseStudy.
+
+Inline styles keep only the declarations in STYLE_PROPERTIES with plain
+values, so nothing can position content over the page or load URLs. Element
+ids and anchor names get ID_PREFIX, so content can't clobber globals such as
+`window.config` (DOM clobbering); in-page `#fragment` links are rewritten to
+match, and the table of contents carries the prefixed ids.
+"""
+import math
+import re
+from html import escape
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils.text import slugify
+
+# Model fields written by process_instance()
+PROCESSED_FIELDS = ('content_html', 'content_text', 'excerpt', 'word_count', 'reading_time', 'toc')
+
+# Models with a rich-text `content` field and the processed fields above
+CONTENT_MODELS = {
+    'blog': 'blog.Blog',
+    'casestudy': 'casestudy.CaseStudy',
+}
+
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'caption', 'code', 'col', 'colgroup', 'dd', 'del', 'div', 'dl', 'dt',
+    'em', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'iframe', 'img', 'ins', 'li',
+    'mark', 'ol', 'p', 'pre', 's', 'small', 'span', 'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'tfoot',
+    'th', 'thead', 'tr', 'u', 'ul',
+}
+VOID_TAGS = {'br', 'col', 'hr', 'img'}
+# Dropped together with everything inside them
+DROP_CONTENT_TAGS = {'script', 'style', 'noscript', 'template', 'object', 'embed', 'form', 'select', 'textarea'}
+
+GLOBAL_ATTRIBUTES = {'class', 'id', 'title', 'style', 'dir', 'lang'}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'target', 'rel', 'name'},
+    'img': {'src', 'alt', 'width', 'height', 'loading'},
+    'iframe': {'src', 'width', 'height', 'allow', 'allowfullscreen', 'frameborder'},
+    'td': {'colspan', 'rowspan', 'align', 'valign'},
+    'th': {'colspan', 'rowspan', 'align', 'valign', 'scope'},
+    'col': {'span', 'width'},
+    'colgroup': {'span'},
+    'ol': {'start', 'type', 'reversed'},
+    'table': {'border', 'cellpadding', 'cellspacing', 'width'},
+}
+URL_ATTRIBUTES = {'href', 'src'}
+SAFE_URL_SCHEMES = {'', 'http', 'https', 'mailto', 'tel'}
+DEFAULT_IFRAME_HOSTS = ('www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com')
+# Inline style declarations the editor produces that can't escape their box
+STYLE_PROPERTIES = {
+    'background-color', 'border', 'border-bottom', 'border-collapse', 'border-color', 'border-left',
+    'border-right', 'border-style', 'border-top', 'border-width', 'color', 'font-size', 'font-style',
+    'font-weight', 'height', 'line-height', 'list-style-type', 'margin', 'margin-bottom', 'margin-left',
+    'margin-right', 'margin-top', 'max-width', 'padding', 'padding-bottom', 'padding-left', 'padding-right',
+    'padding-top', 'text-align', 'text-decoration', 'vertical-align', 'white-space', 'width',
+}
+# Keywords, lengths, percentages, #hex and rgb()/rgba(); no escapes, quotes, comments or url()
+STYLE_VALUE_RE = re.compile(r'(?:[#\w\s.,%+-]|rgba?\([\d\s.,%]*\))+')
+# Prepended to every id and anchor name in the content
+ID_PREFIX = 'content-'
+ID_ATTRIBUTES = {'id', 'name'}
+
+BLOCK_TAGS = {
+    'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'hr', 'li', 'ol', 'p', 'pre', 'table', 'td', 'th', 'tr', 'ul',
+}
+TOC_TAGS = {'h2': 2, 'h3': 3, 'h4': 4}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+# A new one of these closes an unclosed sibling (<li>one<li>two)
+IMPLICIT_CLOSE_TAGS = {'li', 'p', 'dt', 'dd', 'tr', 'td', 'th'}
+
+EXCERPT_LENGTH = 300
+DEFAULT_WORDS_PER_MINUTE = 200
+
+WORD_RE = re.compile(r'\w+(?:[\'’-]\w+)*')
+SPACE_RE = re.compile(r'[ \t\r\f\v ]+')
+NEWLINES_RE = re.compile(r'\s*\n\s*')
+
+
+class ContentProcessor(HTMLParser):
+    """Single pass over the HTML that writes the sanitized markup, the text and the headings"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.html = []
+        self.text = []
+        self.body_text = []
+        self.toc = []
+        self.open_tags = []
+        self.drop_depth = 0
+        self.heading = None
+        self.unnamed_headings = []
+        self.used_ids = set()
+        self.iframe_hosts = set(getattr(settings, 'CONTENT_IFRAME_HOSTS', DEFAULT_IFRAME_HOSTS))
+
+    # -- sanitizing -------------------------------------------------------
+
+    def _safe_url(self, tag, value):
+        value = value.strip()
+        try:
+            parts = urlsplit(value)
+        except ValueError:
+            return None
+        if parts.scheme.lower() not in SAFE_URL_SCHEMES:
+            return None
+        if tag == 'iframe' and parts.hostname not in self.iframe_hosts:
+            return None
+        return value
+
+    @staticmethod
+    def _clean_style(value):
+        declarations = []
+        for declaration in value.split(';'):
+            name, _, style_value = declaration.partition(':')
+            name, style_value = name.strip().lower(), style_value.strip()
+            if name in STYLE_PROPERTIES and STYLE_VALUE_RE.fullmatch(style_value):
+                declarations.append(f'{name}: {style_value}')
+        return '; '.join(declarations) or None
+
+    @staticmethod
+    def _prefix_id(value):
+        value = value.strip()
+        if not value:
+            return None
+        return value if value.startswith(ID_PREFIX) else ID_PREFIX + value
+
+    def _clean_attrs(self, tag, attrs):
+        allowed = GLOBAL_ATTRIBUTES | ALLOWED_ATTRIBUTES.get(tag, set())
+        cleaned = {}
+        for name, value in attrs:
+            name = name.lower()
+            if name not in allowed:
+                continue
+            value = '' if value is None else value
+            if name in URL_ATTRIBUTES:
+                value = self._safe_url(tag, value)
+                if value is not None and name == 'href' and value.startswith('#') and len(value) > 1:
+                    value = '#' + self._prefix_id(value[1:])
+            elif name == 'style':
+                value = self._clean_style(value)
+            elif name in ID_ATTRIBUTES:
+                value = self._prefix_id(value)
+            if value is None:
+                continue
+            cleaned[name] = value
+        if tag == 'a' and cleaned.get('target') == '_blank':
+            cleaned['rel'] = 'noopener noreferrer'
+        if tag == 'iframe' and 'src' not in cleaned:
+            return None
+        return cleaned
+
+    def _unique_id(self, text):
+        base = ID_PREFIX + (slugify(text)[:80] or 'section')
+        anchor, suffix = base, 2
+        while anchor in self.used_ids:
+            anchor, suffix = f'{base}-{suffix}', suffix + 1
+        self.used_ids.add(anchor)
+        return anchor
+
+    # -- parser callbacks -------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        if self.drop_depth or tag in DROP_CONTENT_TAGS:
+            if tag in DROP_CONTENT_TAGS:
+                self.drop_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag in IMPLICIT_CLOSE_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+        cleaned = self._clean_attrs(tag, attrs)
+        if cleaned is None:
+            return
+        if cleaned.get('id'):
+            self.used_ids.add(cleaned['id'])
+
+        if tag in TOC_TAGS and self.heading is None:
+            # The id is only known once the heading text is read
+            self.heading = {'tag': tag, 'attrs': cleaned, 'position': len(self.html), 'text': []}
+            self.html.append(None)
+        else:
+            self.html.append(self._render_start(tag, cleaned))
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS and self.open_tags and self.open_tags[-1] == tag:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self.drop_depth = max(self.drop_depth - 1, 0)
+            return
+        if self.drop_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self.text.append('\n')
+        if tag not in self.open_tags:
+            return
+        # Close anything left open inside this tag
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if self.heading and open_tag == self.heading['tag']:
+                self._finish_heading()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.drop_depth:
+            return
+        self.html.append(escape(data, quote=False))
+        self.text.append(data)
+        if self.heading is not None:
+            self.heading['text'].append(data)
+        elif not HEADING_TAGS.intersection(self.open_tags):
+            self.body_text.append(data)
+
+    def _finish_heading(self):
+        heading, self.heading = self.heading, None
+        text = SPACE_RE.sub(' ', ''.join(heading['text'])).strip()
+        entry = {'level': TOC_TAGS[heading['tag']], 'text': text, 'id': heading['attrs'].get('id')}
+        if text:
+            self.toc.append(entry)
+        if entry['id']:
+            self.html[heading['position']] = self._render_start(heading['tag'], heading['attrs'])
+        else:
+            # Named in result(), once every author id is known
+            self.unnamed_headings.append((heading, entry))
+
+    def _name_headings(self):
+        for heading, entry in self.unnamed_headings:
+            heading['attrs']['id'] = entry['id'] = self._unique_id(entry['text'])
+            self.html[heading['position']] = self._render_start(heading['tag'], heading['attrs'])
+        self.unnamed_headings = []
+
+    @staticmethod
+    def _render_start(tag, attrs):
+        rendered = ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items())
+        return f'<{tag}{rendered}>'
+
+    def result(self):
+        self.close()
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.html.append(f'</{open_tag}>')
+            if self.heading and open_tag == self.heading['tag']:
+                self._finish_heading()
+        self._name_headings()
+        text = NEWLINES_RE.sub('\n', SPACE_RE.sub(' ', ''.join(self.text))).strip()
+        return ''.join(self.html), text, ' '.join(self.body_text), self.toc
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """First `length` characters of the text, cut at a word boundary"""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length + 1].rsplit(' ', 1)[0].rstrip(' ,;:-')
+    return cut + '…'
+
+
+def reading_time(word_count):
+    """Minutes to read `word_count` words, at least one when there is any text"""
+    if not word_count:
+        return 0
+    words_per_minute = getattr(settings, 'CONTENT_WORDS_PER_MINUTE', DEFAULT_WORDS_PER_MINUTE)
+    return max(1, math.ceil(word_count / words_per_minute))
+
+
+def process_content(html):
+    """Return the derived values for one piece of HTML, keyed like PROCESSED_FIELDS"""
+    parser = ContentProcessor()
+    parser.feed(html or '')
+    clean_html, text, body_text, toc = parser.result()
+    words = len(WORD_RE.findall(text))
+    return {
+        'content_html': clean_html,
+        'content_text': text,
+        'excerpt': make_excerpt(body_text or text),
+        'word_count': words,
+        'reading_time': reading_time(words),
+        'toc': toc,
+    }
+
+
+def process_instance(instance):
+    """Set the processed fields on a model instance from its `content`"""
+    for field, value in process_content(instance.content).items():
+        setattr(instance, field, value)
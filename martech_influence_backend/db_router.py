@@ -0,0 +1,111 @@
+"""
+Read replica routing.
+
+Replicas are configured with DATABASE_REPLICA_URLS and listed in
+settings.DATABASE_REPLICAS. Reads go to the primary unless they run inside
+a ViewSet action decorated with @read_from_replica, which picks one replica
+for the whole request. Writes always go to the primary, and so do:
+
+- reads later in the same request, once it has written something
+- requests from a client that wrote within the last REPLICA_STICKY_SECONDS
+  (ReplicaStickinessMiddleware sets a cookie after successful writes), so a
+  visitor sees their own changes despite replication lag
+"""
+import contextvars
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from . import metrics
+
+
+DEFAULT_STICKY_SECONDS = 10
+DEFAULT_STICKY_COOKIE = 'primary_until'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replica alias for reads in the current request, None for the primary
+_read_alias = contextvars.ContextVar('replica_read_alias', default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def get_sticky_cookie():
+    return getattr(settings, 'REPLICA_STICKY_COOKIE', DEFAULT_STICKY_COOKIE)
+
+
+def is_sticky(request):
+    """True while the client's last write may not have reached the replicas"""
+    try:
+        return float(request.COOKIES.get(get_sticky_cookie(), 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def choose_replica(request):
+    """Replica alias for this request, or None when it should read from the primary"""
+    replicas = get_replicas()
+    if not replicas or request.method not in SAFE_METHODS:
+        return None
+    if is_sticky(request):
+        metrics.increment('replica.sticky_primary')
+        return None
+    return random.choice(replicas)
+
+
+def read_from_replica(view_method):
+    """Route the reads of a ViewSet action (list / retrieve) to a read replica"""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        token = _read_alias.set(choose_replica(request))
+        try:
+            return view_method(self, request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+    return wrapper
+
+
+class ReplicaRouter:
+    """DATABASE_ROUTERS entry: replica reads only inside @read_from_replica"""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is not None:
+            metrics.increment('replica.reads', database=alias)
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Read your own writes for the rest of the request
+        if _read_alias.get() is not None:
+            _read_alias.set(None)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """After a successful write, keep the client on the primary for REPLICA_STICKY_SECONDS"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in SAFE_METHODS or response.status_code >= 400 or not get_replicas():
+            return response
+        seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+        if seconds > 0:
+            response.set_cookie(
+                get_sticky_cookie(), f'{time.time() + seconds:.3f}',
+                max_age=seconds, httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        return response
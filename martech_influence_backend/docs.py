@@ -0,0 +1,55 @@
+"""
+Swagger / ReDoc views. drf_yasg.views (and the spec validators it pulls in) is
+only imported when a docs URL is first requested, see lazy_view in urls.py.
+"""
+from rest_framework import permissions
+from drf_yasg.views import get_schema_view
+from drf_yasg import openapi
+from .schema import cache_schema
+
+# Swagger/OpenAPI Schema View (generated once per code version, see schema.py)
+schema_view = cache_schema(get_schema_view(
+    openapi.Info(
+        title="Martech Influence Backend API",
+        default_version='v1',
+        description="""
+        Complete API documentation for Martech Influence Backend.
+        
+        ## Features
+        - **Blog**: Blog posts, categories, tags, and lead management
+        - **Case Study**: Case studies with client information and lead tracking
+        - **Career**: Job postings, applications, departments, and locations
+        - **Contact**: Contact form submissions with UTM tracking
+        - **Social Media**: Dynamic social media links management
+        - **Services**: Service listings, categories, and inquiry management
+        
+        ## Authentication
+        Currently, the API does not require authentication for public endpoints.
+        Admin endpoints require Django admin authentication.
+        
+        ## Response Format
+        All API responses follow a standardized format:
+        ```json
+        {
+            "status": true,
+            "status_code": 200,
+            "message_code": "SUCCESS",
+            "message": "Operation Successful",
+            "data": {...},
+            "count": 10,
+            "next": "...",
+            "previous": "..."
+        }
+        ```
+        """,
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@martechinfluence.com"),
+        license=openapi.License(name="BSD License"),
+    ),
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+))
+
+schema_json = schema_view.without_ui(cache_timeout=0)
+swagger_ui = schema_view.with_ui('swagger', cache_timeout=0)
+redoc_ui = schema_view.with_ui('redoc', cache_timeout=0)
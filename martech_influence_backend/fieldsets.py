@@ -0,0 +1,119 @@
+"""
+Sparse fieldsets: `?fields=id,title,slug` trims the serialized payload, and
+the queryset is projected to match: .only() the columns those fields read,
+and join or prefetch only the relations they touch.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers, status
+
+from .utils import create_response
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin taking a `fields` argument: fields not listed are dropped.
+
+    Meta.field_dependencies maps method fields and model properties to the
+    model lookups they read, so project_queryset() can load just those.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def parse_fields(request):
+    """?fields=a,b,c -> ['a', 'b', 'c']; None when the parameter is absent or empty"""
+    raw = request.query_params.get('fields')
+    if raw is None:
+        return None
+    fields = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    return fields or None
+
+
+def get_sparse_fields(request, serializer_class):
+    """
+    Requested fields for `serializer_class`, as (fields, None), or
+    (None, error_response) when a name is not one of its fields.
+    """
+    fields = parse_fields(request)
+    if fields is None:
+        return None, None
+    available = list(serializer_class.Meta.fields)
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        return None, create_response(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message=f"Unknown fields: {', '.join(unknown)}",
+            message_code="INVALID_FIELDS",
+            data={'available_fields': available},
+            status=False
+        )
+    return fields, None
+
+
+def wants_field(fields, name):
+    """True when `name` is part of the response (fields=None means all of them)"""
+    return fields is None or name in fields
+
+
+def _add_lookup(model, lookup, whole_object, only, select, prefetch):
+    path = []
+    parts = lookup.split('__')
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            # Annotation or property: whatever it reads is listed in field_dependencies
+            return
+        path.append(part)
+        joined = '__'.join(path)
+        if field.many_to_many or field.one_to_many:
+            prefetch.add(joined)
+            return
+        only.add(joined)
+        if not field.is_relation:
+            return
+        last = index == len(parts) - 1
+        if not last or whole_object:
+            # Nested serializer (whole object) or a column on the related row
+            select.add(joined)
+        if last:
+            return
+        model = field.related_model
+
+
+def project_queryset(queryset, serializer_class, fields):
+    """
+    Restrict `queryset` to what `fields` of `serializer_class` need. Existing
+    select_related/prefetch_related calls are replaced by the ones required.
+    With fields=None the queryset is returned unchanged.
+    """
+    if fields is None:
+        return queryset
+    model = queryset.model
+    declared = serializer_class().fields
+    dependencies = getattr(serializer_class.Meta, 'field_dependencies', {})
+    only, select, prefetch = {model._meta.pk.name}, set(), set()
+
+    for name in fields:
+        field = declared[name]
+        if name in dependencies:
+            lookups, whole_object = dependencies[name], False
+        elif isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+            # Nothing tells us what it reads, so load everything
+            return queryset
+        else:
+            lookups = ['__'.join(field.source_attrs)]
+            whole_object = isinstance(field, serializers.BaseSerializer)
+        for lookup in lookups:
+            _add_lookup(model, lookup, whole_object, only, select, prefetch)
+
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch))
+    return queryset.only(*sorted(only))
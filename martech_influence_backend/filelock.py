@@ -0,0 +1,60 @@
+"""
+Advisory locks on a lock file, shared between processes on one host.
+
+POSIX uses flock(), with shared and exclusive locks. Windows has no shared
+byte-range locks in msvcrt, so there every lock is exclusive: still correct,
+only appenders wait for each other.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+
+# How often a blocking lock is retried on Windows (msvcrt.LK_LOCK gives up after 10s)
+WINDOWS_RETRY_INTERVAL = 0.05
+
+
+def _acquire(fd, shared, blocking):
+    if sys.platform == 'win32':
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if not blocking:
+                    raise BlockingIOError("lock is held by another process")
+                time.sleep(WINDOWS_RETRY_INTERVAL)
+    operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    if not blocking:
+        operation |= fcntl.LOCK_NB
+    fcntl.flock(fd, operation)
+
+
+def _release(fd):
+    if sys.platform == 'win32':
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    # flock() locks go away with the descriptor
+
+
+@contextmanager
+def file_lock(path, shared=False, blocking=True):
+    """
+    Hold a lock on `path` (created if missing) for the block. With
+    blocking=False raises BlockingIOError when another process holds it.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        _acquire(fd, shared, blocking)
+        try:
+            yield
+        finally:
+            _release(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,328 @@
+"""
+Declarative query parameter filtering and ordering for the content ViewSets.
+
+Each ViewSet declares a FilterSet once, at class definition:
+
+    filterset = FilterSet(
+        Blog,
+        filters={'category': Filter('category__slug'), 'is_featured': Filter('is_featured', parse_bool, index=False)},
+        search=['title', 'short_description'],
+        orderings={'created_at': Ordering('created_at', index=['created_at'])},
+        default_ordering='-created_at',
+    )
+
+Filters and orderings are checked against the model's indexes when the
+FilterSet is built, so a ViewSet cannot offer a new sort the database has to
+do without an index. `?ordering=` only accepts the declared names (prefix `-`
+for descending), and apply() returns a normalized signature of the request
+that caches can key on.
+
+Before FilterSets, `?ordering=` was passed straight to order_by(), so
+clients may sort by any column (e.g. `?ordering=-views_count`). The columns
+named in `legacy_orderings` keep working, sorted without an index over the
+published rows, but are deprecated: their responses carry a `Deprecation`
+header (and `Sunset` once LEGACY_ORDERINGS_SUNSET is set), each use is logged
+so the remaining clients can be found, and after the sunset date they return
+400 like any other unsupported ordering.
+"""
+import calendar
+import logging
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework import status
+
+from . import metrics
+from .utils import create_response
+
+logger = logging.getLogger(__name__)
+
+TRUE_VALUES = {'true', '1', 'yes'}
+FALSE_VALUES = {'false', '0', 'no'}
+
+
+class FilterError(Exception):
+    """Invalid filter value or ordering; response() is the 400 to return"""
+
+    def __init__(self, message, message_code, data=None):
+        super().__init__(message)
+        self.message = message
+        self.message_code = message_code
+        self.data = data
+
+    def response(self):
+        return create_response(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message=self.message,
+            message_code=self.message_code,
+            data=self.data,
+            status=False
+        )
+
+
+# -- value parsers: return the parsed value, raise ValueError when invalid --
+
+def parse_text(value):
+    return value.strip()
+
+
+def parse_bool(value):
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError("Expected true or false")
+
+
+def parse_decimal(value):
+    try:
+        number = Decimal(value.strip())
+    except InvalidOperation:
+        raise ValueError("Expected a number")
+    if not number.is_finite():
+        raise ValueError("Expected a number")
+    return number
+
+
+def normalize(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, Decimal):
+        return format(value.normalize(), 'f')
+    return str(value)
+
+
+def get_legacy_sunset():
+    """LEGACY_ORDERINGS_SUNSET as a date, or None while no date is set"""
+    value = getattr(settings, 'LEGACY_ORDERINGS_SUNSET', None)
+    if not value or isinstance(value, date):
+        return value or None
+    return date.fromisoformat(value)
+
+
+# -- index lookups ------------------------------------------------------------
+
+def _column(model, name):
+    return model._meta.get_field(name).column
+
+
+def index_prefixes(model):
+    """Column tuples of every index on the model's table (Meta.indexes, unique and db_index fields)"""
+    indexed = set()
+    for field in model._meta.local_concrete_fields:
+        if field.primary_key or field.unique or field.db_index:
+            indexed.add((field.column,))
+    for index in model._meta.indexes:
+        if index.fields and not getattr(index, 'condition', None):
+            indexed.add(tuple(_column(model, name.lstrip('-')) for name in index.fields))
+    for fields in model._meta.unique_together:
+        indexed.add(tuple(_column(model, name) for name in fields))
+    return indexed
+
+
+def has_index(model, fields):
+    """True when an index on `model` starts with the columns of `fields`"""
+    columns = tuple(_column(model, name) for name in fields)
+    return any(prefix[:len(columns)] == columns for prefix in index_prefixes(model))
+
+
+def _check_lookup_indexed(model, lookup):
+    """Every hop of `lookup` (join columns and the compared column) must be indexed"""
+    field = None
+    for part in lookup.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            if field is not None and not field.is_relation:
+                break  # a lookup such as __lte on the column already checked
+            raise
+        if field.many_to_many or field.one_to_many:
+            # Joined through the other table's foreign key, which Django indexes
+            model = field.related_model
+            continue
+        if not has_index(model, [part]):
+            return False
+        if field.is_relation:
+            model = field.related_model
+    return True
+
+
+# -- declarations -------------------------------------------------------------
+
+class Filter:
+    """
+    ?<param>=<value> -> .filter(<lookup>=parse(value)). With index=True every
+    column of the lookup must be indexed; a list names the columns of a
+    composite index that serves it instead. index=False marks a column without
+    an index, filtered on rows the status index already narrowed.
+    distinct=True for lookups across a many-valued relation.
+    """
+
+    def __init__(self, lookup, parse=parse_text, index=True, distinct=False):
+        self.lookup = lookup
+        self.parse = parse
+        self.index = index
+        self.distinct = distinct
+
+
+class Ordering:
+    """
+    ?ordering=<name> / -<name>. `fields` are the order_by() fields for the
+    ascending direction; `index` the columns of the index that serves it
+    (False only for legacy orderings). nulls_last keeps empty values at the
+    end in both directions.
+    """
+
+    def __init__(self, *fields, index, nulls_last=False, then=None):
+        self.fields = fields
+        self.index = index
+        self.nulls_last = nulls_last
+        self.then = then or []
+
+    def order_by(self, descending):
+        options = {'nulls_last': True} if self.nulls_last else {}
+        expressions = [F(name).desc(**options) if descending else F(name).asc(**options) for name in self.fields]
+        return expressions + list(self.then)
+
+
+class FilterSet:
+    """Compiled filters, search and orderings for one model"""
+
+    def __init__(self, model, filters=None, search=None, orderings=None, default_ordering=None, legacy_orderings=()):
+        self.model = model
+        self.filters = dict(sorted((filters or {}).items()))
+        self.search = list(search or [])
+        self.orderings = dict(orderings or {})
+        self.legacy_orderings = {name for name in legacy_orderings if name not in self.orderings}
+        for name in self.legacy_orderings:
+            self.orderings[name] = Ordering(name, index=False)
+        self.default_ordering = default_ordering
+        self._validate()
+        self.ordering_names = sorted(
+            [name for name in self.orderings] + [f'-{name}' for name in self.orderings]
+        )
+
+    def _validate(self):
+        try:
+            for param, spec in self.filters.items():
+                if spec.index is True:
+                    indexed = _check_lookup_indexed(self.model, spec.lookup)
+                else:
+                    indexed = not spec.index or has_index(self.model, spec.index)
+                if not indexed:
+                    raise ImproperlyConfigured(
+                        f"{self.model.__name__} filter '{param}' ({spec.lookup}) has no backing index; "
+                        f"add one or declare it with index=False"
+                    )
+            for name, spec in self.orderings.items():
+                if spec.index is False:
+                    for field in spec.fields:
+                        self.model._meta.get_field(field)
+                elif not has_index(self.model, spec.index):
+                    raise ImproperlyConfigured(
+                        f"{self.model.__name__} ordering '{name}' needs an index on {', '.join(spec.index)}"
+                    )
+        except FieldDoesNotExist as error:
+            raise ImproperlyConfigured(f"{self.model.__name__} FilterSet: {error}")
+        if self.default_ordering and self.default_ordering.removeprefix('-') not in self.orderings:
+            raise ImproperlyConfigured(
+                f"{self.model.__name__} default ordering '{self.default_ordering}' is not a declared ordering"
+            )
+
+    def legacy_ordering(self, query_params):
+        """The requested ordering when it is a deprecated legacy one, else None"""
+        ordering = (query_params.get('ordering') or '').strip()
+        return ordering if ordering.removeprefix('-') in self.legacy_orderings else None
+
+    def apply(self, queryset, query_params):
+        """
+        Filter and order `queryset` from `query_params`. Returns the queryset
+        and the normalized signature (sorted `param=value` pairs, ordering
+        last). Raises FilterError for invalid values or orderings.
+        """
+        signature = []
+        distinct = False
+        for param, spec in self.filters.items():
+            raw = query_params.get(param)
+            if raw is None or not raw.strip():
+                continue
+            try:
+                value = spec.parse(raw)
+            except ValueError as error:
+                raise FilterError(
+                    f"Invalid value for {param}: {error}", 'INVALID_FILTER', {'param': param}
+                )
+            queryset = queryset.filter(**{spec.lookup: value})
+            distinct = distinct or spec.distinct
+            signature.append(f'{param}={normalize(value)}')
+
+        search = ' '.join((query_params.get('search') or '').split())
+        if search and self.search:
+            condition = Q()
+            for name in self.search:
+                condition |= Q(**{f'{name}__icontains': search})
+            queryset = queryset.filter(condition)
+            signature.append(f'search={search.lower()}')
+
+        ordering = (query_params.get('ordering') or '').strip() or self.default_ordering
+        if ordering:
+            descending = ordering.startswith('-')
+            name = ordering[1:] if descending else ordering
+            spec = self.orderings.get(name)
+            sunset = get_legacy_sunset()
+            if name in self.legacy_orderings and sunset is not None and timezone.localdate() >= sunset:
+                raise FilterError(
+                    f"Ordering {ordering} was retired on {sunset.isoformat()}", 'INVALID_ORDERING',
+                    {'allowed_orderings': [
+                        value for value in self.ordering_names if value.removeprefix('-') not in self.legacy_orderings
+                    ]}
+                )
+            if spec is None:
+                raise FilterError(
+                    f"Unsupported ordering: {ordering}", 'INVALID_ORDERING',
+                    {'allowed_orderings': self.ordering_names}
+                )
+            queryset = queryset.order_by(*spec.order_by(descending))
+            signature.append(f'ordering={ordering}')
+
+        if distinct:
+            queryset = queryset.distinct()
+        return queryset, '&'.join(signature)
+
+
+class FilterSetMixin:
+    """ViewSet mixin applying the class's `filterset` to list querysets"""
+
+    filterset = None
+    filter_signature = ''
+
+    def apply_filterset(self, queryset):
+        """Returns (queryset, None), or (None, error_response) for invalid parameters"""
+        try:
+            queryset, self.filter_signature = self.filterset.apply(queryset, self.request.query_params)
+        except FilterError as error:
+            return None, error.response()
+        return queryset, None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Here rather than in apply_filterset, so responses served from the action cache are marked too
+        response = super().finalize_response(request, response, *args, **kwargs)
+        ordering = self.filterset.legacy_ordering(request.query_params) if self.action == 'list' else None
+        if ordering is not None and response.status_code < 400:
+            response['Deprecation'] = 'true'
+            sunset = get_legacy_sunset()
+            if sunset is not None:
+                response['Sunset'] = http_date(calendar.timegm(sunset.timetuple()))
+            label = self.filterset.model._meta.label
+            logger.warning(
+                "Deprecated ordering %s on %s list (User-Agent: %s)",
+                ordering, label, request.META.get('HTTP_USER_AGENT', ''),
+            )
+            metrics.increment('filtering.legacy_ordering', model=label, ordering=ordering.removeprefix('-'))
+        return response
@@ -0,0 +1,68 @@
+"""
+Helpers that keep the docs views, admin and TinyMCE out of the startup import
+graph. API workers only pay for them when one of their URLs is first used.
+
+drf_yasg.utils and drf_yasg.openapi do load at startup: the API views apply
+swagger_auto_schema when their modules are imported. They are small (about
+5 ms of a ~460 ms first request measured with benchmarks/startup.py); the
+deferred part is drf_yasg.views and the spec validators behind it.
+"""
+import threading
+
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils.module_loading import import_string
+
+
+def lazy_include(route, urlconf_name, app_name=None, namespace=None):
+    """
+    Same as path(route, include(urlconf_name)), except the URLconf module is
+    imported the first time a URL under `route` is resolved (or any URL is
+    reversed) instead of when the root URLconf loads.
+    """
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False), urlconf_name,
+        app_name=app_name, namespace=namespace or app_name,
+    )
+
+
+def lazy_view(dotted_path):
+    """
+    View that imports `dotted_path` on its first call. Meant for GET-only
+    views: attributes such as csrf_exempt are not visible before the import.
+    """
+    lock = threading.Lock()
+    target = []
+
+    def view(request, *args, **kwargs):
+        if not target:
+            with lock:
+                if not target:
+                    target.append(import_string(dotted_path))
+        return target[0](request, *args, **kwargs)
+
+    view.__name__ = dotted_path.rsplit('.', 1)[-1]
+    view.__qualname__ = view.__name__
+    return view
+
+
+def check_admin_app_lazily(app_configs, **kwargs):
+    from django.contrib import admin
+
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class LazyAdminConfig(SimpleAdminConfig):
+    """
+    django.contrib.admin without autodiscover in ready(). The admin.py modules
+    (and import_export / TinyMCE widgets with them) load from admin_urls.py
+    on the first admin request, or when system checks run.
+    """
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_admin_app_lazily, checks.Tags.admin)
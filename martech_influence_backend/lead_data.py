@@ -0,0 +1,145 @@
+"""
+Save-time extraction of the common keys of free-form lead data (BlogLeads
+and CaseStudyLead `data`) into columns: email and phone (indexed),
+full_name, company and the UTM parameters, named like the ServiceLead
+columns. Form labels vary ("Email", "Email Address", "Mobile No"), so keys
+are compared by their lowercase letters and digits only.
+
+bulk_create skips save(); code inserting these models in bulk calls
+extract_instances() first.
+
+AtomicLeadSaveMixin is shared by every lead model (analytics LEAD_SOURCES).
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+# Model fields written by extract_instance()
+LEAD_DATA_FIELDS = (
+    'email', 'phone', 'full_name', 'company',
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+)
+
+# Models with a free-form `data` field and the columns above
+LEAD_DATA_MODELS = {
+    'blog': 'blog.BlogLeads',
+    'casestudy': 'casestudy.CaseStudyLead',
+}
+
+# column -> normalized keys it is read from, first match wins
+KEY_ALIASES = {
+    'email': ('email', 'emailaddress', 'emailid', 'workemail', 'businessemail', 'mail'),
+    'phone': (
+        'phone', 'phoneno', 'phonenumber', 'mobile', 'mobileno', 'mobilenumber', 'contactno',
+        'contactnumber', 'whatsapp', 'whatsappno', 'whatsappnumber', 'telephone',
+    ),
+    'full_name': ('fullname', 'name', 'yourname'),
+    'company': (
+        'company', 'companyname', 'organization', 'organisation', 'organizationname',
+        'organisationname', 'business', 'businessname',
+    ),
+    'utm_source': ('utmsource',),
+    'utm_medium': ('utmmedium',),
+    'utm_campaign': ('utmcampaign',),
+    'utm_term': ('utmterm',),
+    'utm_content': ('utmcontent',),
+}
+
+MAX_LENGTHS = {'email': 254, 'phone': 32, 'full_name': 200, 'company': 200}
+UTM_MAX_LENGTH = 100
+
+NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+NON_DIGIT_RE = re.compile(r'\D')
+# What an admin types when looking for a phone number (with at least PHONE_TERM_MIN_DIGITS digits)
+PHONE_TERM_RE = re.compile(r'\+?[\d\s().-]+')
+PHONE_TERM_MIN_DIGITS = 4
+
+
+def normalize_key(key):
+    return NON_ALNUM_RE.sub('', str(key).lower())
+
+
+def normalize_phone(value):
+    """Digits only, so '+1 (234) 567-890' and '1234567890' match"""
+    return NON_DIGIT_RE.sub('', value)
+
+
+def _text(value):
+    if value is None or isinstance(value, (dict, list)):
+        return ''
+    return str(value).strip()
+
+
+def extract_lead_data(data):
+    """{column: value} for LEAD_DATA_FIELDS from a lead's data; missing keys give None"""
+    values = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            text = _text(value)
+            if text:
+                values.setdefault(normalize_key(key), text)
+
+    extracted = {}
+    for column, aliases in KEY_ALIASES.items():
+        value = next((values[alias] for alias in aliases if alias in values), '')
+        if column == 'full_name' and not value:
+            value = ' '.join(part for part in (values.get('firstname'), values.get('lastname')) if part)
+        elif column == 'email':
+            value = value.lower()
+        elif column == 'phone':
+            value = normalize_phone(value)
+        extracted[column] = value[:MAX_LENGTHS.get(column, UTM_MAX_LENGTH)] or None
+    return extracted
+
+
+def extract_instance(obj):
+    """Set the extracted columns on a lead instance from its data"""
+    for column, value in extract_lead_data(obj.data).items():
+        setattr(obj, column, value)
+
+
+def extract_instances(model, instances):
+    """extract_instance() for leads about to be bulk_create'd; other lead models are left alone"""
+    if model._meta.label in LEAD_DATA_MODELS.values():
+        for obj in instances:
+            extract_instance(obj)
+
+
+def search_q(term):
+    """
+    Filter for an admin search term using the indexed columns: prefix match on
+    email or phone, whichever the term looks like, otherwise on email, name and
+    company (on PostgreSQL name and company have UPPER() expression indexes
+    matching istartswith, see the *_name_search_indexes migrations).
+    """
+    term = term.strip()
+    if '@' in term:
+        return Q(email__startswith=term.lower())
+    if PHONE_TERM_RE.fullmatch(term) and len(normalize_phone(term)) >= PHONE_TERM_MIN_DIGITS:
+        return Q(phone__startswith=normalize_phone(term))
+    return Q(email__startswith=term.lower()) | Q(full_name__istartswith=term) | Q(company__istartswith=term)
+
+
+class LeadDataSearchMixin:
+    """ModelAdmin search over the extracted columns instead of LIKE over the whole JSON"""
+    search_fields = ('email',)  # enables the search box; matching is done by search_q()
+    search_help_text = "Email, phone, name or company (matches the beginning)"
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(search_q(search_term)), False
+
+
+class AtomicLeadSaveMixin:
+    """
+    Lead models: save() runs in one transaction, so the attribution increment
+    made in post_save (analytics.signals) commits together with the new row,
+    also for callers in autocommit such as the create views. A concurrent
+    rebuild_attribution then sees both or neither.
+    """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
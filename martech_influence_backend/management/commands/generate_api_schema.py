@@ -0,0 +1,44 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import DisallowedHost
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from martech_influence_backend.schema import get_cache_dir, get_code_version
+
+
+class Command(BaseCommand):
+    help = "Pre-generate the cached OpenAPI schema (JSON and YAML) for the current code version"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', action='append', dest='urls',
+            help="Public origin the schema is served from, e.g. https://api.example.com (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or getattr(settings, 'API_SCHEMA_URLS', [])
+        if not urls:
+            raise CommandError("Pass --url or set API_SCHEMA_URLS.")
+
+        path = reverse('schema-json', kwargs={'format': '.json'})
+        view = resolve(path).func
+        factory = RequestFactory()
+        for url in urls:
+            origin = urlsplit(url)
+            if origin.scheme not in ('http', 'https') or not origin.netloc:
+                raise CommandError(f"Invalid URL: {url}")
+            request = factory.get(path, HTTP_HOST=origin.netloc, secure=origin.scheme == 'https')
+            try:
+                response = view(request, format='.json')
+            except DisallowedHost:
+                raise CommandError(f"{origin.netloc} is not in ALLOWED_HOSTS.")
+            if response.status_code != 200:
+                raise CommandError(f"Schema generation for {url} failed with status {response.status_code}.")
+            self.stdout.write(f"{url}: {response['ETag']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Schema for code version {get_code_version()} written to {get_cache_dir()}."
+        ))
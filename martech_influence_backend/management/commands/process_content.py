@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from martech_influence_backend.content import CONTENT_MODELS, PROCESSED_FIELDS, process_instance
+
+
+class Command(BaseCommand):
+    help = "Recompute sanitized HTML, plain text, excerpt, word count, reading time and TOC from content"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', action='append', choices=sorted(CONTENT_MODELS), dest='models',
+            help="Only process this model (repeatable)",
+        )
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for name in options['models'] or CONTENT_MODELS:
+            model = apps.get_model(CONTENT_MODELS[name])
+            batch = []
+            total = 0
+            for obj in model.objects.only('id', 'content').order_by('pk').iterator(chunk_size=batch_size):
+                process_instance(obj)
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, PROCESSED_FIELDS)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, PROCESSED_FIELDS)
+                total += len(batch)
+            self.stdout.write(self.style.SUCCESS(f"Processed content of {total} {model._meta.verbose_name_plural}."))
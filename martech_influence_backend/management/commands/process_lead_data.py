@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from martech_influence_backend.lead_data import LEAD_DATA_FIELDS, LEAD_DATA_MODELS, extract_instance
+
+
+class Command(BaseCommand):
+    help = "Recompute the email, phone, name, company and UTM columns of blog and case study leads from their data"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', action='append', choices=sorted(LEAD_DATA_MODELS), dest='models',
+            help="Only process this model (repeatable)",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for name in options['models'] or LEAD_DATA_MODELS:
+            model = apps.get_model(LEAD_DATA_MODELS[name])
+            batch = []
+            total = 0
+            for obj in model.objects.only('id', 'data').order_by('pk').iterator(chunk_size=batch_size):
+                extract_instance(obj)
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    model.objects.bulk_update(batch, LEAD_DATA_FIELDS)
+                    total += len(batch)
+                    batch = []
+            if batch:
+                model.objects.bulk_update(batch, LEAD_DATA_FIELDS)
+                total += len(batch)
+            self.stdout.write(self.style.SUCCESS(f"Processed lead data of {total} {model._meta.verbose_name_plural}."))
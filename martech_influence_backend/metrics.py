@@ -0,0 +1,40 @@
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_started_at = time.time()
+
+
+def increment(name, value=1, **labels):
+    """Add to a process-local counter, e.g. increment('ratelimit.rejected', scope='contact')"""
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] += value
+
+
+def get_value(name, **labels):
+    with _lock:
+        return _counters.get((name, tuple(sorted(labels.items()))), 0)
+
+
+def snapshot():
+    """All counters of this worker process, sorted by name"""
+    with _lock:
+        items = sorted(_counters.items())
+    return {
+        'pid': os.getpid(),
+        'uptime_seconds': round(time.time() - _started_at, 1),
+        'counters': [
+            {'name': name, 'labels': dict(labels), 'value': value}
+            for (name, labels), value in items
+        ],
+    }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,183 @@
+import functools
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework import status
+
+from . import metrics
+from .utils import create_response
+
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60). Periods may be second/minute/hour/day or s/m/h/d."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period.strip().lower()[0]]
+
+
+def get_client_ip(request):
+    """
+    Client address, honouring X-Forwarded-For only for the number of proxies
+    we trust (RATE_LIMIT_TRUSTED_PROXIES), so clients can't spoof it.
+    """
+    trusted = getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if trusted and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',') if address.strip()]
+        if addresses:
+            return addresses[max(len(addresses) - trusted, 0)]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class LocalMemoryStore:
+    """
+    Exact sliding-window log kept in this process. Suitable for a single
+    node / single worker; every worker keeps its own counts.
+    """
+    SWEEP_EVERY = 1000
+
+    def __init__(self, **options):
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._calls = 0
+
+    def hit(self, key, limit, window, now=None):
+        """Record a hit; return (allowed, retry_after_seconds, hits_in_window)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._calls += 1
+            if self._calls % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+
+            hits = self._hits.setdefault(key, deque())
+            while hits and hits[0][0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                return False, max(hits[0][0] + window - now, 0), len(hits)
+            hits.append((now, window))
+            return True, 0, len(hits)
+
+    def _sweep(self, now):
+        # Drop keys whose newest hit already left its window
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1][0] <= now - hits[-1][1]]:
+            del self._hits[key]
+
+
+class CacheStore:
+    """
+    Sliding-window counter in a Django cache, shared by every worker using
+    the same backend. The count is the current fixed window plus the
+    previous window weighted by how much of it still overlaps.
+
+    A hit is counted first, with add() or incr(), and the limit is checked
+    against the count that returned, so concurrent requests can't all pass
+    on the same stale read. A rejected hit is taken back with decr(). On
+    Redis/Memcached both are atomic; Django's file and database caches
+    implement incr() as get-then-set.
+    """
+
+    def __init__(self, alias='default', **options):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _count(self, key, timeout):
+        """Add one hit to key; return the new count"""
+        if self.cache.add(key, 1, timeout=timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            if self.cache.add(key, 1, timeout=timeout):
+                return 1
+            return self.cache.incr(key)
+
+    def hit(self, key, limit, window, now=None):
+        now = time.time() if now is None else now
+        current_window = int(now // window)
+        elapsed = (now % window) / window
+        current_key = f'ratelimit:{key}:{current_window}'
+        previous_key = f'ratelimit:{key}:{current_window - 1}'
+
+        previous = self.cache.get(previous_key, 0)
+        current = self._count(current_key, timeout=window * 2)
+        # Hits before this one, as in LocalMemoryStore
+        estimated = previous * (1 - elapsed) + current - 1
+        if estimated >= limit:
+            try:
+                self.cache.decr(current_key)
+            except ValueError:
+                pass
+            retry_after = (1 - elapsed) * window if current - 1 >= limit else window * (1 - elapsed) / max(previous, 1)
+            return False, retry_after, math.ceil(estimated)
+        return True, 0, math.ceil(estimated) + 1
+
+
+class RateLimiter:
+    def __init__(self, store, rates):
+        self.store = store
+        self.rates = {scope: parse_rate(rate) for scope, rate in rates.items()}
+
+    def check(self, scope, request):
+        """Return (allowed, retry_after) for one request against the scope's limit"""
+        if scope not in self.rates:
+            return True, 0
+        limit, window = self.rates[scope]
+        key = f'{scope}:{get_client_ip(request)}'
+        allowed, retry_after, _ = self.store.hit(key, limit, window)
+        metrics.increment('ratelimit.allowed' if allowed else 'ratelimit.rejected', scope=scope)
+        return allowed, retry_after
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                store_class = import_string(getattr(settings, 'RATE_LIMIT_STORE', 'martech_influence_backend.ratelimit.CacheStore'))
+                store = store_class(**getattr(settings, 'RATE_LIMIT_STORE_OPTIONS', {}))
+                _limiter = RateLimiter(store, getattr(settings, 'RATE_LIMITS', {}))
+    return _limiter
+
+
+def reset_limiter():
+    global _limiter
+    _limiter = None
+
+
+def rate_limit(scope):
+    """
+    Limit a ViewSet action per client IP, e.g. @rate_limit('contact').
+    Runs before the request body is parsed or validated.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if getattr(settings, 'RATE_LIMIT_ENABLED', True):
+                allowed, retry_after = get_limiter().check(scope, request)
+                if not allowed:
+                    response = create_response(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        message="Too many requests, please try again later",
+                        message_code="RATE_LIMITED",
+                        status=False
+                    )
+                    response['Retry-After'] = str(max(math.ceil(retry_after), 1))
+                    return response
+            return view_method(self, request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
+# Renderer format -> stored variant. The UI page formats are not cached, the
+# page itself is cheap; only the spec it loads is expensive to generate.
+# drf_yasg's compat renderers use '.json' / '.yaml', hence the lstrip below.
+SPEC_FORMATS = {'json': 'json', 'openapi': 'json', 'yaml': 'yaml'}
+
+_code_version = None
+_memory = {}
+_lock = threading.Lock()
+
+
+def get_code_version():
+    """
+    APP_VERSION when set by the deploy, otherwise a hash of the project's
+    source files (path, size, mtime) and the drf_yasg version.
+    """
+    global _code_version
+    if _code_version is None:
+        version = getattr(settings, 'APP_VERSION', None)
+        if not version:
+            import drf_yasg
+
+            base_dir = Path(settings.BASE_DIR).resolve()
+            digest = hashlib.sha256(drf_yasg.__version__.encode())
+            roots = {Path(__file__).resolve().parent}
+            roots.update(
+                Path(config.path).resolve() for config in apps.get_app_configs()
+                if Path(config.path).resolve().is_relative_to(base_dir)
+            )
+            for root in sorted(roots):
+                for path in sorted(root.rglob('*.py')):
+                    stat = path.stat()
+                    digest.update(f'{path.relative_to(base_dir)}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+            version = digest.hexdigest()[:16]
+        _code_version = version
+    return _code_version
+
+
+def get_cache_dir():
+    return Path(getattr(settings, 'API_SCHEMA_CACHE_DIR', Path(settings.BASE_DIR) / 'cache' / 'schema'))
+
+
+def schema_key(request, version=''):
+    """The generated schema embeds the host and scheme, so they are part of the key"""
+    origin = f'{request.scheme}://{request.get_host()}/{version}'
+    return f'{get_code_version()}-{hashlib.sha256(origin.encode()).hexdigest()[:16]}'
+
+
+def _read_files(key):
+    root = get_cache_dir()
+    try:
+        entry = {variant: (root / f'{key}.{variant}').read_bytes() for variant in ('json', 'yaml')}
+        entry['etag'] = json.loads((root / f'{key}.meta').read_bytes())['etag']
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    return entry
+
+
+def _write_files(key, entry):
+    root = get_cache_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    files = {
+        'json': entry['json'],
+        'yaml': entry['yaml'],
+        'meta': json.dumps({'etag': entry['etag']}).encode(),
+    }
+    # meta last: a reader only trusts a key once its meta file exists
+    for variant, body in files.items():
+        path = root / f'{key}.{variant}'
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+
+    # Drop schemas of older code versions
+    current_version = key.split('-', 1)[0]
+    for path in root.iterdir():
+        if not path.name.startswith(current_version + '-'):
+            path.unlink(missing_ok=True)
+
+
+def build_entry(swagger):
+    from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+
+    body = OpenAPICodecJson(validators=[]).encode(swagger)
+    return {
+        'json': body,
+        'yaml': OpenAPICodecYaml(validators=[]).encode(swagger),
+        'etag': quote_etag(hashlib.sha256(body).hexdigest()[:32]),
+    }
+
+
+def get_schema_entry(key, generate):
+    """Memory, then disk, then generate() -> Swagger once per process and key"""
+    entry = _memory.get(key)
+    if entry is None:
+        with _lock:
+            entry = _memory.get(key)
+            if entry is None:
+                entry = _read_files(key)
+                if entry is None:
+                    entry = build_entry(generate())
+                    _write_files(key, entry)
+                _memory[key] = entry
+    return entry
+
+
+def clear_schema_cache():
+    _memory.clear()
+
+
+def cache_schema(schema_view):
+    """
+    Wrap a drf_yasg SchemaView class so swagger.json / swagger.yaml and the
+    spec loaded by the Swagger UI / ReDoc pages are generated once per code
+    version and served as pre-serialized bytes with an ETag.
+    """
+    class CachedSchemaView(schema_view):
+        def get(self, request, version='', format=None):
+            variant = SPEC_FORMATS.get(request.accepted_renderer.format.lstrip('.'))
+            if variant is None:
+                return super().get(request, version, format)
+
+            version = request.version or version or ''
+            key = schema_key(request, version)
+            entry = get_schema_entry(key, lambda: super(CachedSchemaView, self).get(request, version, format).data)
+
+            if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+            if {entry['etag'], 'W/' + entry['etag'], '*'} & set(if_none_match):
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(
+                    entry[variant],
+                    content_type=f'{request.accepted_renderer.media_type}; charset=utf-8',
+                )
+            response['ETag'] = entry['etag']
+            patch_cache_control(response, no_cache=True)
+            return response
+
+    CachedSchemaView.__name__ = schema_view.__name__
+    return CachedSchemaView
@@ -43,7 +43,7 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'martech_influence_backend.lazy.LazyAdminConfig',  # django.contrib.admin, autodiscovered on first use
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -60,10 +60,15 @@ INSTALLED_APPS = [
     'privacy_policy',
     'socialmedia',
     'services',
+    'analytics',
+    'catalog',
+    'martech_influence_backend',  # project-level management commands
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'martech_influence_backend.compression.CompressionMiddleware',
+    'martech_influence_backend.db_router.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',
@@ -100,6 +105,16 @@ DATABASES = {
     'default': env.db(),
 }
 
+# Read replicas for the public list/retrieve endpoints, as comma-separated database URLs
+# (DATABASE_REPLICA_URLS=psql://...@replica1/db,psql://...@replica2/db). See db_router.py.
+DATABASE_REPLICAS = []
+for _index, _url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica_{_index}'] = {**env.db_url_config(_url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica_{_index}')
+DATABASE_ROUTERS = ['martech_influence_backend.db_router.ReplicaRouter']
+# After a write, the client reads from the primary for this many seconds (replication lag)
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=10)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -190,3 +205,147 @@ SWAGGER_SETTINGS = {
 REDOC_SETTINGS = {
     'LAZY_RENDERING': False,
 }
+
+# Related content recommendations (catalog app)
+RELATED_CONTENT_TOP_N = env.int('RELATED_CONTENT_TOP_N', default=6)
+# Queue a rebuild of the kind's related content when content changes (run by `manage.py run_catalog_rebuilds --loop`)
+RELATED_CONTENT_ON_SAVE = env.bool('RELATED_CONTENT_ON_SAVE', default=True)
+
+# Prebuilt catalog snapshot for static site builds / CDN delivery
+CATALOG_SNAPSHOT_ROOT = MEDIA_ROOT / 'catalog'
+CATALOG_SNAPSHOT_URL = env('CATALOG_SNAPSHOT_URL', default=None)
+CATALOG_SNAPSHOT_WORKERS = env.int('CATALOG_SNAPSHOT_WORKERS', default=None)
+# Queue a rebuild of an existing snapshot's type when content changes (run by `manage.py run_catalog_rebuilds`)
+CATALOG_SNAPSHOT_AUTO_REBUILD = env.bool('CATALOG_SNAPSHOT_AUTO_REBUILD', default=True)
+# Delta sync (/api/catalog/sync/<type>/): changes newer than this many seconds are held back
+SYNC_SAFETY_WINDOW = env.int('SYNC_SAFETY_WINDOW', default=5)
+# Deletions are remembered this long (`manage.py prune_tombstones`); older sync tokens get 410
+SYNC_TOMBSTONE_RETENTION_DAYS = env.int('SYNC_TOMBSTONE_RETENTION_DAYS', default=365)
+
+# Caches: a per-process LRU (LOCAL_*) in front of a cache shared by every worker, CACHE_URL
+# (e.g. redis://127.0.0.1:6379/1). Without it the shared tier is a file cache under cache/django,
+# which only works for workers on one host. See martech_influence_backend/cache_backends.py.
+SHARED_CACHE = env.cache('CACHE_URL', default=f"filecache://{BASE_DIR / 'cache' / 'django'}")
+if SHARED_CACHE['BACKEND'].endswith('FileBasedCache'):
+    SHARED_CACHE.setdefault('OPTIONS', {}).setdefault('MAX_ENTRIES', 10000)
+CACHES = {
+    'default': {
+        'BACKEND': 'martech_influence_backend.cache_backends.TwoTierCache',
+        'TIMEOUT': env.int('CACHE_TIMEOUT', default=300),
+        'OPTIONS': {
+            'SHARED': SHARED_CACHE,
+            'LOCAL_MAX_ENTRIES': env.int('CACHE_LOCAL_MAX_ENTRIES', default=10000),
+            'LOCAL_MAX_BYTES': env.int('CACHE_LOCAL_MAX_BYTES', default=16 * 1024 * 1024),
+            # Seconds a worker serves its own copy; version keys are re-read more often
+            'LOCAL_TIMEOUT': env.int('CACHE_LOCAL_TIMEOUT', default=5),
+            'VERSION_LOCAL_TIMEOUT': env.float('CACHE_VERSION_LOCAL_TIMEOUT', default=1.0),
+        },
+    },
+}
+
+# Homepage aggregate sections (seconds); sections are also invalidated on save
+HOMEPAGE_CACHE_TIMEOUT = env.int('HOMEPAGE_CACHE_TIMEOUT', default=300)
+
+# @cached_action list caching (martech_influence_backend/caching.py), in seconds
+ACTION_CACHE_ENABLED = env.bool('ACTION_CACHE_ENABLED', default=True)
+ACTION_CACHE_TIMEOUT = env.int('ACTION_CACHE_TIMEOUT', default=60)
+# Expired entries are served for this much longer while one request refreshes them
+ACTION_CACHE_STALE_TTL = env.int('ACTION_CACHE_STALE_TTL', default=300)
+# How long other requests wait for the one computing a missing entry
+ACTION_CACHE_LOCK_TIMEOUT = env.int('ACTION_CACHE_LOCK_TIMEOUT', default=10)
+# Early recompute eagerness (XFetch beta); 0 disables early refreshes
+ACTION_CACHE_BETA = env.float('ACTION_CACHE_BETA', default=1.0)
+
+# Legacy ?ordering= columns (martech_influence_backend/filtering.py) sort without an index and are
+# deprecated. With a date (YYYY-MM-DD) their responses also carry a Sunset header, and from that
+# day on they return 400
+LEGACY_ORDERINGS_SUNSET = env('LEGACY_ORDERINGS_SUNSET', default=None)
+
+# Reverse proxy / CDN caching (martech_influence_backend/surrogate.py), in seconds
+CACHE_CONTROL_ENABLED = env.bool('CACHE_CONTROL_ENABLED', default=True)
+# Browsers revalidate; only the proxy (s-maxage) keeps pages, and it is purged on change
+CACHE_CONTROL_MAX_AGE = env.int('CACHE_CONTROL_MAX_AGE', default=0)
+CACHE_CONTROL_S_MAXAGE = env.int('CACHE_CONTROL_S_MAXAGE', default=300)
+# Detail actions count views, so the proxy does not keep them unless this is raised
+CACHE_CONTROL_DETAIL_S_MAXAGE = env.int('CACHE_CONTROL_DETAIL_S_MAXAGE', default=0)
+CACHE_CONTROL_STALE_WHILE_REVALIDATE = env.int('CACHE_CONTROL_STALE_WHILE_REVALIDATE', default=60)
+CACHE_CONTROL_STALE_IF_ERROR = env.int('CACHE_CONTROL_STALE_IF_ERROR', default=24 * 60 * 60)
+# Fastly reads Surrogate-Key; use e.g. Cache-Tag for Cloudflare or xkey for Varnish
+SURROGATE_KEY_HEADER = env('SURROGATE_KEY_HEADER', default='Surrogate-Key')
+# NullTransport sends nothing; HttpTransport POSTs the keys to PURGE_URL
+PURGE_TRANSPORT = env('PURGE_TRANSPORT', default='martech_influence_backend.surrogate.NullTransport')
+PURGE_TRANSPORT_OPTIONS = {}
+if env('PURGE_URL', default=''):
+    PURGE_TRANSPORT_OPTIONS = {
+        'url': env('PURGE_URL'),
+        'token': env('PURGE_TOKEN', default=None),
+        'token_header': env('PURGE_TOKEN_HEADER', default='Fastly-Key'),
+    }
+# Purges are sent by a background thread: keys queued within PURGE_DELAY seconds share a request
+PURGE_DELAY = env.float('PURGE_DELAY', default=0.5)
+PURGE_BATCH_SIZE = env.int('PURGE_BATCH_SIZE', default=256)
+
+# Trending score decay exponent (higher favours newer items), see catalog/trending.py
+TRENDING_GRAVITY = env.float('TRENDING_GRAVITY', default=1.5)
+
+# Engagement events (POST /api/analytics/events/), rolled up by `manage.py rollup_engagement`
+ENGAGEMENT_MAX_BATCH = env.int('ENGAGEMENT_MAX_BATCH', default=100)
+# Repeats of the same event from one visitor token within this many seconds count once
+ENGAGEMENT_DEDUPE_WINDOW = env.int('ENGAGEMENT_DEDUPE_WINDOW', default=24 * 60 * 60)
+ENGAGEMENT_EVENT_RETENTION_DAYS = env.int('ENGAGEMENT_EVENT_RETENTION_DAYS', default=7)
+
+# Write-behind lead intake (analytics/lead_spool.py): lead endpoints append to a local spool and
+# answer 202; `manage.py flush_lead_spool --loop` on each web host inserts them in batches
+LEAD_WRITE_BEHIND = env.bool('LEAD_WRITE_BEHIND', default=False)
+LEAD_SPOOL_DIR = env('LEAD_SPOOL_DIR', default=str(BASE_DIR / 'spool' / 'leads'))
+# fsync each append before acknowledging; turning it off trades durability on power loss for latency
+LEAD_SPOOL_FSYNC = env.bool('LEAD_SPOOL_FSYNC', default=True)
+LEAD_SPOOL_BATCH_SIZE = env.int('LEAD_SPOOL_BATCH_SIZE', default=500)
+# Failed flushes of a segment before its failing records are moved to the dead-letter directory
+LEAD_SPOOL_MAX_ATTEMPTS = env.int('LEAD_SPOOL_MAX_ATTEMPTS', default=5)
+
+# Bulk lead endpoints (<lead endpoint>/bulk/) for partner integrations; larger batches get 413
+LEAD_BULK_MAX_ITEMS = env.int('LEAD_BULK_MAX_ITEMS', default=1000)
+
+# `manage.py archive_leads` moves leads older than this into the archive table (analytics/archive.py)
+LEAD_ARCHIVE_AFTER_DAYS = env.int('LEAD_ARCHIVE_AFTER_DAYS', default=365)
+
+# Unique-visitor counts (HyperLogLog sketches); a background thread in each worker writes its buffer
+# at whichever comes first, and at exit
+UNIQUE_VIEWS_FLUSH_INTERVAL = env.int('UNIQUE_VIEWS_FLUSH_INTERVAL', default=60)
+UNIQUE_VIEWS_FLUSH_SIZE = env.int('UNIQUE_VIEWS_FLUSH_SIZE', default=1000)
+# Daily sketches older than this are deleted by `manage.py prune_view_sketches`
+UNIQUE_VIEWS_RETENTION_DAYS = env.int('UNIQUE_VIEWS_RETENTION_DAYS', default=90)
+
+# Rate limiting for public lead / application endpoints (per client IP)
+RATE_LIMIT_ENABLED = env.bool('RATE_LIMIT_ENABLED', default=True)
+# CacheStore counts in the shared cache (CACHE_URL), so every worker enforces the same limit;
+# LocalMemoryStore is exact but per process (N workers allow N times the limit)
+RATE_LIMIT_STORE = env('RATE_LIMIT_STORE', default='martech_influence_backend.ratelimit.CacheStore')
+RATE_LIMIT_STORE_OPTIONS = {}
+# Number of reverse proxies in front of the app whose X-Forwarded-For we trust
+RATE_LIMIT_TRUSTED_PROXIES = env.int('RATE_LIMIT_TRUSTED_PROXIES', default=0)
+RATE_LIMITS = {
+    'contact': env('RATE_LIMIT_CONTACT', default='5/minute'),
+    'blog_lead': env('RATE_LIMIT_BLOG_LEAD', default='10/minute'),
+    'case_study_lead': env('RATE_LIMIT_CASE_STUDY_LEAD', default='10/minute'),
+    'service_lead': env('RATE_LIMIT_SERVICE_LEAD', default='10/minute'),
+    'job_application': env('RATE_LIMIT_JOB_APPLICATION', default='5/hour'),
+    'engagement': env('RATE_LIMIT_ENGAGEMENT', default='60/minute'),
+    'lead_bulk': env('RATE_LIMIT_LEAD_BULK', default='60/hour'),
+}
+
+# Cached OpenAPI schema: regenerated when APP_VERSION (or the source files) change
+APP_VERSION = env('APP_VERSION', default=None)
+API_SCHEMA_CACHE_DIR = BASE_DIR / 'cache' / 'schema'
+# Origins to pre-generate the schema for at deploy (manage.py generate_api_schema)
+API_SCHEMA_URLS = env.list('API_SCHEMA_URLS', default=[])
+
+# Blog / case study content processing (martech_influence_backend/content.py)
+CONTENT_WORDS_PER_MINUTE = env.int('CONTENT_WORDS_PER_MINUTE', default=200)
+CONTENT_IFRAME_HOSTS = ['www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com']
+
+# Response compression (brotli when the optional `brotli` package is installed, else gzip)
+COMPRESSION_MIN_SIZE = env.int('COMPRESSION_MIN_SIZE', default=1024)
+# Memory for compressed variants of cacheable responses, per process
+COMPRESSION_CACHE_MAX_BYTES = env.int('COMPRESSION_CACHE_MAX_BYTES', default=32 * 1024 * 1024)
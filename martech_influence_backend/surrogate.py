@@ -0,0 +1,280 @@
+"""
+Reverse proxy caching: Cache-Control and surrogate-key headers on public GET
+responses, and purges of those keys when content changes.
+
+    @cache_headers('blog', related={'category': 'blog-category', 'tags': 'blog-tag'})
+    def list(self, request):
+        ...
+
+A list response is tagged `blog`, `blog:list`, `blog:<id>` for every item and
+`blog-category:<id>` / `blog-tag:<id>` for the related objects it shows; a
+detail response `blog` and `blog:<pk>` plus its related objects. Saving
+blog 42 purges `blog:42` and `blog:list`; saving a category purges
+`blog-category:<id>`, i.e. every cached page that shows it (catalog.signals
+and the admin bulk actions call schedule_purge()). Keys use ids rather than
+slugs so renaming a slug still purges the pages showing the old one.
+
+Detail actions increment view counters, so by default they are tagged but
+not cached by the proxy (CACHE_CONTROL_DETAIL_S_MAXAGE = 0).
+
+Purges are queued after the transaction commits and sent by a background
+thread per worker, so a save in the admin never waits for the purge API.
+Keys queued within PURGE_DELAY seconds of each other (an admin bulk action,
+a category and its posts) go out together, PURGE_BATCH_SIZE keys per
+request, through PURGE_TRANSPORT: NullTransport (default, nothing to purge)
+or HttpTransport, which POSTs {"surrogate_keys": [...]} to a purge API such
+as Fastly's. Keys still queued when the worker exits are sent then.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework import status
+
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_AGE = 0
+DEFAULT_S_MAXAGE = 300
+DEFAULT_DETAIL_S_MAXAGE = 0
+DEFAULT_STALE_WHILE_REVALIDATE = 60
+DEFAULT_STALE_IF_ERROR = 24 * 60 * 60
+DEFAULT_KEY_HEADER = 'Surrogate-Key'
+DEFAULT_PURGE_DELAY = 0.5
+# Fastly accepts at most 256 keys per batch purge
+DEFAULT_PURGE_BATCH_SIZE = 256
+
+# model label -> surrogate key namespace; instance keys are `<namespace>:<pk>`
+SURROGATE_NAMESPACES = {
+    'blog.Blog': 'blog',
+    'blog.Category': 'blog-category',
+    'blog.Tag': 'blog-tag',
+    'casestudy.CaseStudy': 'casestudy',
+    'casestudy.CaseStudyCategory': 'casestudy-category',
+    'casestudy.CaseStudyTag': 'casestudy-tag',
+    'services.Service': 'service',
+    'services.ServiceCategory': 'service-category',
+    'career.JobPosting': 'job',
+    'career.Department': 'job-department',
+    'career.JobCategory': 'job-category',
+    'career.JobType': 'job-type',
+    'career.JobLocation': 'job-location',
+    'socialmedia.SocialMedia': 'social-media',
+    'privacy_policy.PrivacyPolicy': 'privacy-policy',
+}
+
+
+# -- response headers ---------------------------------------------------------
+
+def cache_control_header(s_maxage):
+    return ', '.join([
+        'public',
+        f"max-age={getattr(settings, 'CACHE_CONTROL_MAX_AGE', DEFAULT_MAX_AGE)}",
+        f"s-maxage={s_maxage}",
+        f"stale-while-revalidate={getattr(settings, 'CACHE_CONTROL_STALE_WHILE_REVALIDATE', DEFAULT_STALE_WHILE_REVALIDATE)}",
+        f"stale-if-error={getattr(settings, 'CACHE_CONTROL_STALE_IF_ERROR', DEFAULT_STALE_IF_ERROR)}",
+    ])
+
+
+def _related_keys(item, related):
+    keys = set()
+    for field, namespace in related.items():
+        value = item.get(field)
+        for obj in value if isinstance(value, list) else [value]:
+            if isinstance(obj, dict) and obj.get('id') is not None:
+                keys.add(f"{namespace}:{obj['id']}")
+    return keys
+
+
+def response_keys(namespace, data, is_list=False, pk=None, related=None):
+    """Surrogate keys for a response whose create_response `data` is `data`"""
+    related = related or {}
+    keys = {namespace}
+    if is_list:
+        keys.add(f'{namespace}:list')
+    if pk is not None:
+        keys.add(f'{namespace}:{pk}')
+    if isinstance(data, list):
+        items = data
+    elif isinstance(data, dict) and 'results' in data:
+        items = data['results']
+    else:
+        items = [data]
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if pk is None and item.get('id') is not None:
+            keys.add(f"{namespace}:{item['id']}")
+        keys |= _related_keys(item, related)
+    return keys
+
+
+def cache_headers(namespace, related=None):
+    """Mark a public GET action's 200 (and 304) responses cacheable by the reverse proxy, tagged with surrogate keys"""
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            response = view_method(self, request, *args, **kwargs)
+            cacheable = (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED)
+            if response.status_code not in cacheable or not getattr(settings, 'CACHE_CONTROL_ENABLED', True):
+                return response
+            is_list = getattr(self, 'action', None) == 'list'
+            body = getattr(response, 'data', None)  # 304s (conditional_get) have none
+            data = body.get('data') if isinstance(body, dict) else None
+            keys = response_keys(namespace, data, is_list, kwargs.get('pk'), related)
+            if is_list:
+                s_maxage = getattr(settings, 'CACHE_CONTROL_S_MAXAGE', DEFAULT_S_MAXAGE)
+            else:
+                s_maxage = getattr(settings, 'CACHE_CONTROL_DETAIL_S_MAXAGE', DEFAULT_DETAIL_S_MAXAGE)
+            response['Cache-Control'] = cache_control_header(s_maxage)
+            response[getattr(settings, 'SURROGATE_KEY_HEADER', DEFAULT_KEY_HEADER)] = ' '.join(sorted(keys))
+            return response
+        return wrapper
+    return decorator
+
+
+# -- purging ------------------------------------------------------------------
+
+def instance_keys(label, pk):
+    """Keys to purge when object `pk` of model `label` changes (empty for untracked models)"""
+    namespace = SURROGATE_NAMESPACES.get(label)
+    if namespace is None:
+        return set()
+    return {f'{namespace}:{pk}', f'{namespace}:list'}
+
+
+class NullTransport:
+    """No reverse proxy: purges are only counted"""
+
+    def __init__(self, **options):
+        pass
+
+    def purge(self, keys):
+        return True
+
+
+class HttpTransport:
+    """
+    POST {"surrogate_keys": [...]} to `url` (Fastly's batch purge API, a
+    Varnish/nginx purge endpoint, or a local stand-in during tests).
+    """
+
+    def __init__(self, url, token=None, token_header='Fastly-Key', timeout=5, **options):
+        self.url = url
+        self.token = token
+        self.token_header = token_header
+        self.timeout = timeout
+
+    def purge(self, keys):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'surrogate_keys': sorted(keys)}).encode(),
+            headers={'Content-Type': 'application/json', 'Accept': 'application/json'},
+            method='POST',
+        )
+        if self.token:
+            request.add_header(self.token_header, self.token)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return 200 <= response.status < 300
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                transport_class = import_string(getattr(settings, 'PURGE_TRANSPORT', 'martech_influence_backend.surrogate.NullTransport'))
+                _transport = transport_class(**getattr(settings, 'PURGE_TRANSPORT_OPTIONS', {}))
+    return _transport
+
+
+def reset_transport():
+    global _transport
+    _transport = None
+
+
+def purge(keys):
+    """Send one purge for `keys` now; failures are logged, never raised (the TTL still expires pages)"""
+    keys = set(keys)
+    if not keys:
+        return False
+    try:
+        sent = get_transport().purge(keys)
+    except Exception:
+        logger.exception("Surrogate key purge failed for %s", ' '.join(sorted(keys)))
+        sent = False
+    metrics.increment('purge.sent' if sent else 'purge.failed')
+    metrics.increment('purge.keys', len(keys))
+    return sent
+
+
+_pending = set()
+_pending_lock = threading.Lock()
+_wake = threading.Event()
+_sender = None
+
+
+def enqueue_purge(keys):
+    """Queue `keys` for the sender thread"""
+    global _sender
+    with _pending_lock:
+        _pending.update(keys)
+        if _sender is None or not _sender.is_alive():
+            _sender = threading.Thread(target=_run_sender, name='surrogate-purge-sender', daemon=True)
+            _sender.start()
+    _wake.set()
+
+
+def _run_sender():
+    while True:
+        _wake.wait()
+        # Let the rest of a burst join the batch
+        time.sleep(getattr(settings, 'PURGE_DELAY', DEFAULT_PURGE_DELAY))
+        _wake.clear()
+        send_pending()
+
+
+def send_pending():
+    """Send every queued key now, PURGE_BATCH_SIZE per purge; returns whether all were sent"""
+    with _pending_lock:
+        keys = sorted(_pending)
+        _pending.clear()
+    size = getattr(settings, 'PURGE_BATCH_SIZE', DEFAULT_PURGE_BATCH_SIZE)
+    sent = True
+    for start in range(0, len(keys), size):
+        sent = purge(keys[start:start + size]) and sent
+    return sent
+
+
+def _reset_after_fork():
+    # The sender thread doesn't survive a fork; the child starts its own on its first purge
+    global _pending, _pending_lock, _wake, _sender
+    _pending = set()
+    _pending_lock = threading.Lock()
+    _wake = threading.Event()
+    _sender = None
+
+
+atexit.register(send_pending)
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def schedule_purge(keys):
+    """Queue a purge of `keys` once the current transaction commits (immediately outside one)"""
+    keys = set(keys)
+    if keys:
+        transaction.on_commit(lambda: enqueue_purge(keys))
@@ -0,0 +1,695 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers, status, viewsets
+from rest_framework.test import APIRequestFactory
+
+from privacy_policy.models import PrivacyPolicy
+
+from . import cache_backends
+from .cache_backends import LocalLRU, TwoTierCache
+from .caching import cached_action, get_cache, get_versions, request_key, should_refresh
+from .content import process_content
+from .db_router import ReplicaStickinessMiddleware, get_sticky_cookie, read_from_replica
+from .filtering import Filter, FilterError, FilterSet, Ordering, parse_bool
+from .fieldsets import SparseFieldsMixin, project_queryset
+from .lead_data import extract_lead_data, normalize_key, search_q
+from .ratelimit import CacheStore, LocalMemoryStore, get_limiter, rate_limit, reset_limiter
+from .surrogate import cache_headers, purge, reset_transport, schedule_purge, send_pending
+from .utils import create_response
+
+
+class SlowViewSet(viewsets.ViewSet):
+    """Counts how often the action body actually runs"""
+    calls = 0
+    lock = threading.Lock()
+    delay = 0.2
+    status_code = status.HTTP_200_OK
+
+    @cached_action(timeout=60, stale_ttl=60, lock_timeout=5)
+    def list(self, request):
+        with SlowViewSet.lock:
+            SlowViewSet.calls += 1
+            call = SlowViewSet.calls
+        time.sleep(SlowViewSet.delay)
+        return create_response(status_code=SlowViewSet.status_code, message_code="SLOW", data={'call': call})
+
+
+class AlwaysStaleViewSet(viewsets.ViewSet):
+    """Entries expire as soon as they are stored but stay available as stale copies"""
+
+    @cached_action(timeout=0, stale_ttl=60, lock_timeout=5)
+    def list(self, request):
+        return SlowViewSet.list.__wrapped__(self, request)
+
+
+class LockExpiringViewSet(viewsets.ViewSet):
+    """Runs past its lock timeout: meanwhile another request takes the expired lock"""
+
+    @cached_action(timeout=60, lock_timeout=5)
+    def list(self, request):
+        lock_key = request_key('LockExpiringViewSet.list', request, get_versions((), get_cache())) + ':lock'
+        get_cache().set(lock_key, 'other-request', 5)
+        return create_response(status_code=status.HTTP_200_OK, message_code="SLOW", data={})
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cached-action-tests'}},
+    ACTION_CACHE_ENABLED=True,
+)
+class CachedActionTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        SlowViewSet.calls = 0
+        SlowViewSet.delay = 0.2
+        SlowViewSet.status_code = status.HTTP_200_OK
+        self.view = SlowViewSet.as_view({'get': 'list'})
+        self.factory = APIRequestFactory()
+
+    def get(self, path='/slow/', view=None):
+        response = (view or self.view)(self.factory.get(path))
+        response.render()
+        return response
+
+    def get_concurrently(self, count, view=None):
+        barrier = threading.Barrier(count)
+        responses = [None] * count
+
+        def worker(index):
+            barrier.wait()
+            responses[index] = self.get(view=view)
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+    def test_concurrent_misses_compute_once(self):
+        responses = self.get_concurrently(20)
+
+        self.assertEqual(SlowViewSet.calls, 1)
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        self.assertEqual({response.data['data']['call'] for response in responses}, {1})
+        self.assertEqual([response['X-Cache'] for response in responses].count('MISS'), 1)
+
+    def test_expired_entry_is_served_stale_while_one_request_refreshes(self):
+        view = AlwaysStaleViewSet.as_view({'get': 'list'})
+        self.assertEqual(self.get(view=view)['X-Cache'], 'MISS')
+
+        responses = self.get_concurrently(10, view=view)
+
+        self.assertEqual(SlowViewSet.calls, 2)
+        outcomes = [response['X-Cache'] for response in responses]
+        self.assertEqual(outcomes.count('REFRESH'), 1)
+        self.assertEqual(outcomes.count('STALE'), 9)
+        self.assertEqual({response.data['data']['call'] for response in responses if response['X-Cache'] == 'STALE'}, {1})
+
+    def test_query_string_order_does_not_change_the_key(self):
+        SlowViewSet.delay = 0
+        self.get('/slow/?a=1&b=2')
+        self.assertEqual(self.get('/slow/?b=2&a=1')['X-Cache'], 'HIT')
+        self.assertEqual(SlowViewSet.calls, 1)
+
+    def test_errors_are_not_cached(self):
+        SlowViewSet.delay = 0
+        SlowViewSet.status_code = status.HTTP_400_BAD_REQUEST
+        self.get()
+        self.get()
+        self.assertEqual(SlowViewSet.calls, 2)
+
+    def test_only_the_lock_owner_releases_the_lock(self):
+        view = LockExpiringViewSet.as_view({'get': 'list'})
+        request = self.factory.get('/expiring/')
+        self.assertEqual(view(request).status_code, 200)
+        lock_key = request_key('LockExpiringViewSet.list', request, get_versions((), get_cache())) + ':lock'
+        self.assertEqual(get_cache().get(lock_key), 'other-request')
+
+    def test_should_refresh(self):
+        now = time.time()
+        self.assertTrue(should_refresh({'expires_at': now - 1, 'delta': 0.1}, now, 1.0))
+        self.assertFalse(should_refresh({'expires_at': now + 3600, 'delta': 0.01}, now, 1.0))
+
+
+class TaggedViewSet(viewsets.ViewSet):
+    @cache_headers('blog', related={'category': 'blog-category', 'tags': 'blog-tag'})
+    def list(self, request):
+        return create_response(status_code=status.HTTP_200_OK, message_code="TAGGED", data={'results': [
+            {'id': 1, 'category': {'id': 7}, 'tags': [{'id': 3}, {'id': 4}]},
+            {'id': 2, 'category': None, 'tags': []},
+        ]})
+
+    @cache_headers('blog', related={'category': 'blog-category'})
+    def retrieve(self, request, pk=None):
+        return create_response(status_code=status.HTTP_200_OK, message_code="TAGGED", data={'id': int(pk), 'category': {'id': 7}})
+
+
+class PurgeStandIn(BaseHTTPRequestHandler):
+    """Records purge requests like a CDN purge API would receive them"""
+    received = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        PurgeStandIn.received.append((self.headers.get('Fastly-Key'), body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowTransport:
+    """Purge transport taking `delay` seconds per purge, like a slow purge API"""
+    delay = 0.5
+    received = []
+
+    def __init__(self, **options):
+        pass
+
+    def purge(self, keys):
+        time.sleep(SlowTransport.delay)
+        SlowTransport.received.append(sorted(keys))
+        return True
+
+
+@override_settings(CACHE_CONTROL_S_MAXAGE=300, CACHE_CONTROL_DETAIL_S_MAXAGE=0, SURROGATE_KEY_HEADER='Surrogate-Key')
+class SurrogateKeyTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def test_list_is_tagged_with_items_and_related_objects(self):
+        response = TaggedViewSet.as_view({'get': 'list'})(self.factory.get('/tagged/'))
+        self.assertEqual(
+            response['Surrogate-Key'].split(),
+            ['blog', 'blog-category:7', 'blog-tag:3', 'blog-tag:4', 'blog:1', 'blog:2', 'blog:list'],
+        )
+        self.assertIn('s-maxage=300', response['Cache-Control'])
+
+    def test_detail_is_tagged_but_not_kept_by_the_proxy(self):
+        response = TaggedViewSet.as_view({'get': 'retrieve'})(self.factory.get('/tagged/5/'), pk='5')
+        self.assertEqual(response['Surrogate-Key'].split(), ['blog', 'blog-category:7', 'blog:5'])
+        self.assertIn('s-maxage=0', response['Cache-Control'])
+
+    def test_http_transport_posts_keys(self):
+        PurgeStandIn.received = []
+        server = HTTPServer(('127.0.0.1', 0), PurgeStandIn)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = f'http://127.0.0.1:{server.server_port}/purge'
+            with override_settings(PURGE_TRANSPORT='martech_influence_backend.surrogate.HttpTransport',
+                                   PURGE_TRANSPORT_OPTIONS={'url': url, 'token': 'secret'}):
+                reset_transport()
+                self.assertTrue(purge({'blog:1', 'blog:list'}))
+        finally:
+            reset_transport()
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.assertEqual(PurgeStandIn.received, [('secret', {'surrogate_keys': ['blog:1', 'blog:list']})])
+
+    @override_settings(PURGE_TRANSPORT='martech_influence_backend.tests.SlowTransport', PURGE_DELAY=0.1, PURGE_BATCH_SIZE=3)
+    def test_scheduled_purges_are_sent_in_the_background_in_batches(self):
+        reset_transport()
+        self.addCleanup(reset_transport)
+        SlowTransport.received = []
+        started = time.monotonic()
+        # Outside a transaction on_commit runs at once, as after an admin save commits
+        schedule_purge({'blog:1', 'blog:list'})
+        schedule_purge({'blog:2', 'blog:list', 'blog-category:7'})
+        self.assertLess(time.monotonic() - started, SlowTransport.delay)
+
+        deadline = time.monotonic() + 5
+        while len(SlowTransport.received) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(SlowTransport.received, [['blog-category:7', 'blog:1', 'blog:2'], ['blog:list']])
+
+    def test_send_pending_without_keys_sends_nothing(self):
+        self.assertTrue(send_pending())
+
+    def test_failed_purge_is_not_raised(self):
+        with override_settings(PURGE_TRANSPORT='martech_influence_backend.surrogate.HttpTransport',
+                               PURGE_TRANSPORT_OPTIONS={'url': 'http://127.0.0.1:9/purge', 'timeout': 1}):
+            reset_transport()
+            try:
+                with self.assertLogs('martech_influence_backend.surrogate', 'ERROR'):
+                    self.assertFalse(purge({'blog:1'}))
+            finally:
+                reset_transport()
+
+
+class LimitedViewSet(viewsets.ViewSet):
+    @rate_limit('tests')
+    def create(self, request):
+        return create_response(status_code=status.HTTP_201_CREATED, message_code="CREATED")
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ratelimit-tests'}},
+)
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(reset_limiter)
+
+    def hits(self, store, count, now, limit=3, window=60):
+        return [store.hit('client', limit, window, now=now)[0] for _ in range(count)]
+
+    def test_local_store_slides_the_window(self):
+        store = LocalMemoryStore()
+        self.assertEqual(self.hits(store, 4, now=100), [True, True, True, False])
+        self.assertEqual(self.hits(store, 1, now=159), [False])
+        self.assertEqual(self.hits(store, 1, now=160.5), [True])
+
+    def test_cache_store_weights_the_previous_window(self):
+        store = CacheStore()
+        self.assertEqual(self.hits(store, 4, now=120), [True, True, True, False])
+        # A quarter into the next window 3 * 0.75 previous hits still count: one more fits
+        self.assertEqual(self.hits(store, 2, now=195), [True, False])
+        # Three quarters in only 0.75 of them count: two more fit
+        self.assertEqual(self.hits(store, 3, now=225), [True, True, False])
+
+    def test_cache_store_does_not_count_rejected_hits(self):
+        store = CacheStore()
+        self.hits(store, 10, now=120)
+        self.assertEqual(caches['default'].get('ratelimit:client:2'), 3)
+
+    def test_cache_store_is_atomic_under_concurrency(self):
+        store = CacheStore()
+        barrier = threading.Barrier(20)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(store.hit('client', 5, 60, now=120)[0])
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+
+    @override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={'tests': '2/minute'})
+    def test_decorator_answers_429_from_the_shared_store(self):
+        reset_limiter()
+        self.assertIsInstance(get_limiter().store, CacheStore)
+        view = LimitedViewSet.as_view({'post': 'create'})
+        factory = APIRequestFactory()
+        codes = [view(factory.post('/limited/')).status_code for _ in range(3)]
+        self.assertEqual(codes, [201, 201, 429])
+        response = view(factory.post('/limited/'))
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        # Another client has its own budget
+        self.assertEqual(view(factory.post('/limited/', REMOTE_ADDR='10.0.0.2')).status_code, 201)
+
+
+class ProjectQuerysetTests(SimpleTestCase):
+    def projected(self, fields, serializer_class=None):
+        from blog.models import Blog
+        from blog.serializers import BlogListSerializer
+
+        queryset = Blog.objects.select_related('author').prefetch_related('dynamic_fields')
+        return project_queryset(queryset, serializer_class or BlogListSerializer, fields)
+
+    def loaded(self, queryset):
+        names, defer = queryset.query.deferred_loading
+        self.assertFalse(defer)
+        return set(names)
+
+    def test_no_fields_leaves_the_queryset_alone(self):
+        queryset = self.projected(None)
+        self.assertEqual(queryset.query.select_related, {'author': {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ('dynamic_fields',))
+
+    def test_plain_fields_load_only_their_columns(self):
+        queryset = self.projected(['title', 'slug'])
+        self.assertEqual(self.loaded(queryset), {'id', 'title', 'slug'})
+        self.assertFalse(queryset.query.select_related)
+        self.assertEqual(queryset._prefetch_related_lookups, ())
+
+    def test_source_through_a_relation_joins_it(self):
+        queryset = self.projected(['author_username'])
+        self.assertEqual(self.loaded(queryset), {'id', 'author', 'author__username'})
+        self.assertEqual(queryset.query.select_related, {'author': {}})
+
+    def test_field_dependencies_map_method_fields(self):
+        queryset = self.projected(['author_full_name', 'estimated_time', 'dynamic_fields'])
+        self.assertEqual(
+            self.loaded(queryset),
+            {'id', 'author', 'author__first_name', 'author__last_name', 'author__username', 'estimated_time', 'reading_time'},
+        )
+        self.assertEqual(queryset.query.select_related, {'author': {}})
+
+    def test_nested_serializers_join_or_prefetch(self):
+        queryset = self.projected(['category', 'tags'])
+        self.assertEqual(self.loaded(queryset), {'id', 'category'})
+        self.assertEqual(queryset.query.select_related, {'category': {}})
+        self.assertEqual(queryset._prefetch_related_lookups, ('tags',))
+
+    def test_method_field_without_dependencies_loads_everything(self):
+        from blog.models import Blog
+
+        class Unmapped(SparseFieldsMixin, serializers.ModelSerializer):
+            summary = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Blog
+                fields = ['id', 'title', 'summary']
+
+            def get_summary(self, obj):
+                return obj.title
+
+        queryset = self.projected(['title', 'summary'], Unmapped)
+        self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+        self.assertEqual(queryset.query.select_related, {'author': {}})
+
+
+class FilterSetTests(SimpleTestCase):
+    def filterset(self, **kwargs):
+        from blog.models import Blog
+
+        options = {
+            'filters': {
+                'category': Filter('category__slug'),
+                'is_featured': Filter('is_featured', parse_bool, index=False),
+            },
+            'orderings': {'created_at': Ordering('created_at', index=['created_at'])},
+            'default_ordering': '-created_at',
+            'legacy_orderings': ['views_count'],
+        }
+        options.update(kwargs)
+        return FilterSet(Blog, **options)
+
+    def apply(self, query, filterset=None):
+        from blog.models import Blog
+
+        return (filterset or self.filterset()).apply(Blog.objects.all(), QueryDict(query))
+
+    def test_signature_is_normalized(self):
+        _, signature = self.apply('is_featured=YES&category=seo&ordering=created_at')
+        self.assertEqual(signature, 'category=seo&is_featured=true&ordering=created_at')
+        _, signature = self.apply('category=seo')
+        self.assertEqual(signature, 'category=seo&ordering=-created_at')
+
+    def test_legacy_ordering_is_still_accepted(self):
+        queryset, signature = self.apply('ordering=-views_count')
+        self.assertEqual(signature, 'ordering=-views_count')
+        self.assertEqual(str(queryset.query.order_by[0]), str(Ordering('views_count', index=False).order_by(True)[0]))
+
+    def test_unknown_ordering_and_bad_values_are_rejected(self):
+        with self.assertRaises(FilterError) as raised:
+            self.apply('ordering=password')
+        self.assertEqual(raised.exception.message_code, 'INVALID_ORDERING')
+        self.assertIn('-views_count', raised.exception.data['allowed_orderings'])
+        with self.assertRaises(FilterError) as raised:
+            self.apply('is_featured=maybe')
+        self.assertEqual(raised.exception.message_code, 'INVALID_FILTER')
+
+    def test_declarations_are_checked_against_indexes(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.filterset(orderings={'views': Ordering('views_count', index=['views_count'])}, default_ordering=None)
+        with self.assertRaises(ImproperlyConfigured):
+            self.filterset(filters={'title': Filter('title')})
+        with self.assertRaises(ImproperlyConfigured):
+            self.filterset(legacy_orderings=['no_such_column'])
+
+
+class ContentSanitizerTests(SimpleTestCase):
+    def html(self, content):
+        return process_content(content)['content_html']
+
+    def test_scripts_and_handlers_are_removed(self):
+        html = self.html('<p onclick="steal()">Hi<script>alert(1)</script></p><style>p{}</style><svg onload=x>')
+        self.assertEqual(html, '<p>Hi</p>')
+
+    def test_javascript_urls_are_removed(self):
+        for href in ('javascript:alert(1)', ' JaVaScRiPt:alert(1)', 'jav&#x09;ascript:alert(1)', 'data:text/html,x'):
+            self.assertEqual(self.html(f'<a href="{href}">x</a>'), '<a>x</a>', href)
+        self.assertEqual(self.html('<a href="https://example.com/">x</a>'), '<a href="https://example.com/">x</a>')
+
+    @override_settings(CONTENT_IFRAME_HOSTS=['www.youtube.com'])
+    def test_iframes_only_from_allowed_hosts(self):
+        embed = '<iframe src="https://www.youtube.com/embed/abc"></iframe>'
+        self.assertEqual(self.html(embed), embed)
+        self.assertEqual(self.html('<iframe src="https://evil.example/embed"></iframe>'), '')
+        self.assertEqual(self.html('<iframe src="https://www.youtube.com.evil.example/"></iframe>'), '')
+        self.assertEqual(self.html('<iframe srcdoc="<script>x</script>"></iframe>'), '')
+
+    def test_style_keeps_only_safe_declarations(self):
+        html = self.html('<p style="color: #333; text-align:center; position:fixed; top:0; z-index:9999">x</p>')
+        self.assertEqual(html, '<p style="color: #333; text-align: center">x</p>')
+        self.assertEqual(self.html('<span style="color: rgb(1, 2, 3)">x</span>'), '<span style="color: rgb(1, 2, 3)">x</span>')
+        for payload in (
+            'background-color: url(https://evil.example/x)',
+            'width: expression(alert(1))',
+            'color: \\72 ed',
+            '\\70 osition: fixed',
+            'color: red/**/;position:absolute',
+            'font-size: 12px;behavior: url(x.htc)',
+        ):
+            html = self.html(f'<p style="{payload}">x</p>')
+            self.assertNotIn('url', html, payload)
+            self.assertNotIn('expression', html, payload)
+            self.assertNotIn('\\', html, payload)
+            self.assertNotIn('position', html, payload)
+        self.assertEqual(self.html('<p style="position:fixed">x</p>'), '<p>x</p>')
+
+    def test_ids_and_fragment_links_are_prefixed(self):
+        html = self.html('<div id="config">x</div><a name="top"></a><a href="#config">go</a><img id="content-logo">')
+        self.assertEqual(
+            html,
+            '<div id="content-config">x</div><a name="content-top"></a>'
+            '<a href="#content-config">go</a><img id="content-logo">',
+        )
+
+    def test_heading_anchors_are_prefixed_and_unique(self):
+        processed = process_content('<h2>Intro</h2><p>Text</p><h3>Intro</h3><h2 id="own">Own</h2>')
+        self.assertEqual(
+            processed['content_html'],
+            '<h2 id="content-intro">Intro</h2><p>Text</p><h3 id="content-intro-2">Intro</h3><h2 id="content-own">Own</h2>',
+        )
+        self.assertEqual([entry['id'] for entry in processed['toc']], ['content-intro', 'content-intro-2', 'content-own'])
+        # Generated ids also avoid author ids that come later in the content
+        processed = process_content('<h2>A</h2><h2>A</h2><h2 id="content-a">B</h2>')
+        self.assertEqual(
+            processed['content_html'],
+            '<h2 id="content-a-2">A</h2><h2 id="content-a-3">A</h2><h2 id="content-a">B</h2>',
+        )
+        self.assertEqual([entry['id'] for entry in processed['toc']], ['content-a-2', 'content-a-3', 'content-a'])
+
+
+class LeadDataTests(SimpleTestCase):
+    def test_keys_are_matched_by_letters_and_digits(self):
+        self.assertEqual(normalize_key("Email Address"), 'emailaddress')
+        self.assertEqual(normalize_key("Mobile_No."), 'mobileno')
+        extracted = extract_lead_data({
+            "Email Address": " Ada@Example.COM ", "Mobile No": "+1 (234) 567-890",
+            "Company Name": "Analytical Engines", "UTM Source": "newsletter", "notes": "hello",
+        })
+        self.assertEqual(extracted, {
+            'email': 'ada@example.com', 'phone': '1234567890', 'full_name': None,
+            'company': 'Analytical Engines', 'utm_source': 'newsletter', 'utm_medium': None,
+            'utm_campaign': None, 'utm_term': None, 'utm_content': None,
+        })
+
+    def test_first_alias_wins_and_name_falls_back_to_parts(self):
+        extracted = extract_lead_data({"mail": "second@example.com", "email": "first@example.com"})
+        self.assertEqual(extracted['email'], 'first@example.com')
+        self.assertEqual(extract_lead_data({"First Name": "Ada", "Last Name": "Lovelace"})['full_name'], "Ada Lovelace")
+        self.assertEqual(extract_lead_data({"Full Name": "Ada", "First Name": "Grace"})['full_name'], "Ada")
+
+    def test_blank_nested_and_long_values(self):
+        extracted = extract_lead_data({"email": "  ", "name": {"first": "Ada"}, "company": "x" * 300})
+        self.assertIsNone(extracted['email'])
+        self.assertIsNone(extracted['full_name'])
+        self.assertEqual(len(extracted['company']), 200)
+        self.assertEqual(extract_lead_data(None)['email'], None)
+
+    def test_search_q_picks_the_column_from_the_term(self):
+        self.assertEqual(search_q(" Ada@Example.com "), Q(email__startswith='ada@example.com'))
+        self.assertEqual(search_q("+1 (234) 56"), Q(phone__startswith='123456'))
+        # Too few digits to be a phone number
+        self.assertEqual(
+            search_q("123"),
+            Q(email__startswith='123') | Q(full_name__istartswith='123') | Q(company__istartswith='123'),
+        )
+        self.assertEqual(
+            search_q("Ada"),
+            Q(email__startswith='ada') | Q(full_name__istartswith='Ada') | Q(company__istartswith='Ada'),
+        )
+
+
+# A second in-memory SQLite database, migrated by the test runner, stands in for a replica
+REPLICA = 'replica_test'
+connections.settings[REPLICA] = connections.configure_settings({
+    DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+    REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+})[REPLICA]
+
+
+class ReplicaWritingViewSet(viewsets.ViewSet):
+    """Reads, writes, then reads again within one replica-routed request"""
+
+    @read_from_replica
+    def list(self, request):
+        before = PrivacyPolicy.objects.all().db
+        PrivacyPolicy.objects.create(content="New", version="new")
+        return create_response(status_code=status.HTTP_200_OK, message_code="OK", data={
+            'before': before, 'after': PrivacyPolicy.objects.all().db,
+        })
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], ACTION_CACHE_ENABLED=False, RATE_LIMIT_ENABLED=False)
+class ReplicaRoutingTests(TestCase):
+    """The replica lags behind: it only has the old policy"""
+    databases = {'default', REPLICA}
+    url = '/api/privacy-policy/list/'
+
+    def setUp(self):
+        PrivacyPolicy.objects.using(REPLICA).create(content="Old", version="stale")
+        PrivacyPolicy.objects.create(content="Current", version="current")
+
+    def version(self, **extra):
+        response = self.client.get(self.url, HTTP_HOST='localhost', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']['version']
+
+    def test_decorated_reads_use_the_replica(self):
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            self.assertEqual(self.version(), 'stale')
+        self.assertTrue(replica_queries)
+        # Outside the decorated action everything reads the primary
+        self.assertEqual(PrivacyPolicy.objects.get().version, 'current')
+
+    def test_sticky_cookie_reads_the_primary(self):
+        self.client.cookies[get_sticky_cookie()] = str(time.time() + 60)
+        self.assertEqual(self.version(), 'current')
+        self.client.cookies[get_sticky_cookie()] = str(time.time() - 1)
+        self.assertEqual(self.version(), 'stale')
+        self.client.cookies[get_sticky_cookie()] = 'garbage'
+        self.assertEqual(self.version(), 'stale')
+
+    def test_reads_after_a_write_use_the_primary(self):
+        view = ReplicaWritingViewSet.as_view({'get': 'list'})
+        response = view(APIRequestFactory().get('/'))
+        self.assertEqual(response.data['data'], {'before': REPLICA, 'after': 'default'})
+        self.assertEqual(PrivacyPolicy.objects.filter(version='new').count(), 1)
+        self.assertFalse(PrivacyPolicy.objects.using(REPLICA).filter(version='new').exists())
+
+    def test_middleware_sets_cookie_after_successful_writes_only(self):
+        factory = RequestFactory()
+        middleware = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=201))
+        response = middleware(factory.post('/'))
+        self.assertGreater(float(response.cookies[get_sticky_cookie()].value), time.time())
+        self.assertNotIn(get_sticky_cookie(), middleware(factory.get('/')).cookies)
+        failing = ReplicaStickinessMiddleware(lambda request: HttpResponse(status=400))
+        self.assertNotIn(get_sticky_cookie(), failing(factory.post('/')).cookies)
+        with override_settings(DATABASE_REPLICAS=[]):
+            self.assertNotIn(get_sticky_cookie(), middleware(factory.post('/')).cookies)
+
+    def test_admin_and_other_endpoints_stay_on_the_primary(self):
+        user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(user)
+        with CaptureQueriesContext(connections[REPLICA]) as replica_queries:
+            response = self.client.get('/admin/privacy_policy/privacypolicy/', HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, 'current')
+            self.assertNotContains(response, 'stale')
+            self.assertEqual(self.client.get('/api/catalog/sync/blogs/', HTTP_HOST='localhost').status_code, 200)
+        self.assertEqual(len(replica_queries), 0)
+
+
+class LocalLRUTests(SimpleTestCase):
+    def test_evicts_least_recently_used_by_bytes(self):
+        lru = LocalLRU(max_entries=100, max_bytes=10)
+        lru.set('a', b'aaaa', 100)
+        lru.set('b', b'bbbb', 100)
+        self.assertEqual(lru.get('a', 0), (True, b'aaaa'))
+        lru.set('c', b'cccc', 100)
+        self.assertEqual(lru.get('b', 0), (False, None))
+        self.assertEqual(lru.get('a', 0), (True, b'aaaa'))
+        self.assertEqual(lru.size, 8)
+        # Too big to keep at all, and replacing a key releases its old bytes
+        lru.set('a', b'x' * 11, 100)
+        self.assertEqual((lru.get('a', 0), lru.size), ((False, None), 4))
+
+    def test_evicts_by_entry_count(self):
+        lru = LocalLRU(max_entries=2, max_bytes=1000)
+        for key in 'abc':
+            lru.set(key, key.encode(), 100)
+        self.assertEqual([lru.get(key, 0)[0] for key in 'abc'], [False, True, True])
+
+    def test_expired_entries_are_dropped(self):
+        lru = LocalLRU(max_entries=10, max_bytes=100)
+        lru.set('a', b'aaaa', 50)
+        self.assertEqual(lru.get('a', 49), (True, b'aaaa'))
+        self.assertEqual(lru.get('a', 50), (False, None))
+        self.assertEqual(lru.size, 0)
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        # time.time itself, so the shared LocMemCache runs on the same clock
+        patcher = mock.patch.object(cache_backends.time, 'time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TwoTierCache('', {'OPTIONS': {
+            'SHARED': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'two-tier-tests'},
+            'LOCAL_TIMEOUT': 5,
+            'VERSION_LOCAL_TIMEOUT': 1,
+        }})
+        self.addCleanup(self.cache.clear)
+
+    def local_expiry(self, key):
+        item = self.cache.local._items.get(self.cache.make_key(key))
+        return item and item[0]
+
+    def test_local_copy_is_served_until_it_expires(self):
+        self.cache.set('page', 'old', 60)
+        self.cache.shared.set('page', 'new', 60)  # written by another worker
+        self.assertEqual(self.cache.get('page'), 'old')
+        self.now += 5
+        self.assertEqual(self.cache.get('page'), 'new')
+
+    def test_local_ttl_is_capped(self):
+        self.cache.set('page', 'value', 60)
+        self.assertEqual(self.local_expiry('page'), self.now + 5)
+        self.cache.set('short', 'value', 2)
+        self.assertEqual(self.local_expiry('short'), self.now + 2)
+        self.cache.set('sections:version', 3)
+        self.assertEqual(self.local_expiry('sections:version'), self.now + 1)
+        self.cache.set('gone', 'value', 0)
+        self.assertIsNone(self.local_expiry('gone'))
+
+    def test_locks_and_counters_are_never_kept_locally(self):
+        self.assertTrue(self.cache.add('action:abc:lock', 'token', 30))
+        self.cache.set('ratelimit:ip:1.2.3.4', 1, 60)
+        self.assertEqual(self.cache.get('ratelimit:ip:1.2.3.4'), 1)
+        self.assertEqual(self.cache.get_many(['action:abc:lock']), {'action:abc:lock': 'token'})
+        self.assertEqual(self.cache.local._items, {})
+        # Another worker releases the lock: seen at once
+        self.cache.shared.delete('action:abc:lock')
+        self.assertTrue(self.cache.add('action:abc:lock', 'mine', 30))
+
+    def test_writes_through_the_shared_cache_drop_the_local_copy(self):
+        self.cache.set('count', 1, 60)
+        self.assertEqual(self.cache.incr('count'), 2)
+        self.assertEqual(self.cache.get('count'), 2)
+        self.assertFalse(self.cache.add('count', 5))
+        self.assertEqual(self.cache.get('count'), 2)
+        self.cache.delete('count')
+        self.assertIsNone(self.cache.get('count'))
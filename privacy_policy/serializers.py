@@ -2,8 +2,9 @@
 
 from rest_framework import serializers
 from privacy_policy.models import PrivacyPolicy
+from martech_influence_backend.fieldsets import SparseFieldsMixin
 
-class PrivacyPolicySerializer(serializers.ModelSerializer):
+class PrivacyPolicySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = PrivacyPolicy
         fields = [
@@ -1,3 +1,37 @@
+from django.core.cache import caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from .models import PrivacyPolicy
+
+
+class PrivacyPolicyFieldsTests(TestCase):
+    url = '/api/privacy-policy/list/'
+
+    def setUp(self):
+        caches['default'].clear()
+        PrivacyPolicy.objects.create(title="Privacy Policy", content="<p>Long text</p>", version="v2.0")
+
+    def get(self, query=''):
+        return self.client.get(self.url + query, HTTP_HOST='localhost')
+
+    def test_all_fields_by_default(self):
+        data = self.get().json()['data']
+        self.assertEqual(set(data), {'id', 'title', 'content', 'version', 'published_at', 'updated_at'})
+
+    def test_sparse_fields_skip_the_content_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('?fields=version,updated_at')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['data']), {'version', 'updated_at'})
+        policy_queries = [query['sql'] for query in queries if 'privacy_policy' in query['sql']]
+        self.assertEqual(len(policy_queries), 1)
+        self.assertNotIn('"content"', policy_queries[0])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.get('?fields=version,secret')
+        self.assertEqual(response.status_code, 400)
+        body = response.json()
+        self.assertEqual(body['message_code'], 'INVALID_FIELDS')
+        self.assertIn('content', body['data']['available_fields'])
@@ -2,6 +2,10 @@ from django.shortcuts import render
 from privacy_policy.models import PrivacyPolicy
 from privacy_policy.serializers import PrivacyPolicySerializer
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset
 from rest_framework import viewsets, status
 
 
@@ -10,23 +14,32 @@ class PrivacyPolicyViewSet(viewsets.ViewSet):
     API to fetch active Privacy Policy
     """
 
+    @cache_headers('privacy-policy')
+    @cached_action(depends_on=['privacy_policy.PrivacyPolicy'])
+    @read_from_replica
     def list(self, request):
         """
         GET /api/privacy-policy/
         Returns latest active privacy policy
         """
-        policy = PrivacyPolicy.objects.filter(
-            is_active=True
+        fields, error_response = get_sparse_fields(request, PrivacyPolicySerializer)
+        if error_response:
+            return error_response
+
+        # e.g. ?fields=version,updated_at checks for a new version without loading the content
+        policy = project_queryset(
+            PrivacyPolicy.objects.filter(is_active=True), PrivacyPolicySerializer, fields
         ).order_by("-published_at").first()
 
         if not policy:
             return create_response(
-                success=False,
+                status=False,
                 message="No active privacy policy found.",
+                message_code="PRIVACY_POLICY_NOT_FOUND",
                 status_code=status.HTTP_404_NOT_FOUND
             )
             
-        serializer = PrivacyPolicySerializer(policy)
+        serializer = PrivacyPolicySerializer(policy, fields=fields)
         return create_response(
             message_code="PRIVACY_POLICY_FETCHED",
             message="Privacy policy fetched successfully.",
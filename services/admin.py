@@ -5,6 +5,7 @@ from django.urls import reverse
 from django import forms
 from tinymce.widgets import TinyMCE
 from .models import ServiceCategory, Service, ServiceLead
+from catalog.signals import content_bulk_changed
 
 
 class ServiceAdminForm(forms.ModelForm):
@@ -88,9 +89,9 @@ class ServiceAdmin(admin.ModelAdmin):
     ]
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = [
-        'created_at', 'updated_at', 'views_count', 'inquiries_count',
+        'created_at', 'updated_at', 'views_count', 'unique_views', 'inquiries_count',
         'likes_count', 'banner_image_preview', 'mobile_image_preview',
-        'icon_preview', 'published_at'
+        'icon_preview', 'published_at', 'normalized_price'
     ]
     date_hierarchy = 'created_at'
     list_per_page = 25
@@ -110,7 +111,7 @@ class ServiceAdmin(admin.ModelAdmin):
             'classes': ('wide',),
         }),
         ('💰 Pricing Information', {
-            'fields': ('price_starting_from', 'price_currency', 'price_period', 'is_free', 'has_custom_pricing'),
+            'fields': ('price_starting_from', 'price_currency', 'price_period', 'is_free', 'has_custom_pricing', 'normalized_price'),
         }),
         ('⏱️ Service Details', {
             'fields': ('duration', 'delivery_time', 'service_type'),
@@ -123,7 +124,7 @@ class ServiceAdmin(admin.ModelAdmin):
             'fields': ('is_featured', 'is_pinned', 'is_popular', 'published_at')
         }),
         ('📊 Engagement Metrics', {
-            'fields': ('views_count', 'inquiries_count', 'likes_count'),
+            'fields': ('views_count', 'unique_views', 'inquiries_count', 'likes_count'),
             'classes': ('collapse',)
         }),
         ('🕐 Timestamps', {
@@ -221,17 +222,26 @@ class ServiceAdmin(admin.ModelAdmin):
 
     def make_published(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.update(status='published', published_at=timezone.now())
+        now = timezone.now()
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='published', published_at=now, updated_at=now)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} service(s) marked as published.')
     make_published.short_description = "Mark selected services as published"
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(status='draft')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='draft', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} service(s) marked as draft.')
     make_draft.short_description = "Mark selected services as draft"
 
     def make_archived(self, request, queryset):
-        updated = queryset.update(status='archived')
+        from django.utils import timezone
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(status='archived', updated_at=timezone.now())
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} service(s) marked as archived.')
     make_archived.short_description = "Mark selected services as archived"
 
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from services.models import Service
+from services.pricing import get_currency_rates, get_period_factors, normalize_price
+
+
+class Command(BaseCommand):
+    help = "Recompute Service.normalized_price after the currency/period conversion table changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows written per bulk update")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rates = get_currency_rates()
+        factors = get_period_factors()
+
+        queryset = Service.objects.only(
+            'id', 'price_starting_from', 'price_currency', 'price_period', 'is_free', 'has_custom_pricing',
+            'normalized_price',
+        ).order_by('pk')
+
+        changed = []
+        total = 0
+        for service in queryset.iterator(chunk_size=batch_size):
+            price = normalize_price(
+                service.price_starting_from, service.price_currency, service.price_period,
+                service.is_free, service.has_custom_pricing, rates=rates, factors=factors
+            )
+            if price != service.normalized_price:
+                service.normalized_price = price
+                changed.append(service)
+            if len(changed) >= batch_size:
+                Service.objects.bulk_update(changed, ['normalized_price'])
+                total += len(changed)
+                changed = []
+
+        if changed:
+            Service.objects.bulk_update(changed, ['normalized_price'])
+            total += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated normalized price for {total} service(s)."))
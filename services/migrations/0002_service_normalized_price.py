@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:35
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Frozen copy of services/pricing.py as it was when this migration was written;
+# the live module may change, this migration must not
+CURRENCY_RATES = {
+    'USD': '1', 'EUR': '1.08', 'GBP': '1.27', 'INR': '0.012',
+    'AUD': '0.66', 'CAD': '0.73', 'SGD': '0.74', 'AED': '0.27',
+}
+PERIOD_FACTORS = {
+    'one_time': '1', 'hourly': '1', 'weekly': '52', 'monthly': '12', 'quarterly': '4', 'yearly': '1',
+}
+
+
+def normalize_price(price, currency, period, is_free, rates, factors):
+    if is_free:
+        return Decimal('0.00')
+    if price is None:
+        return None
+    rate = rates.get((currency or 'USD').upper())
+    factor = factors.get((period or 'one_time').lower())
+    if rate is None or factor is None:
+        return None
+    try:
+        amount = Decimal(str(price)) * rate * factor
+    except InvalidOperation:
+        return None
+    return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def populate_normalized_price(apps, schema_editor):
+    rates = getattr(settings, 'SERVICE_CURRENCY_RATES', CURRENCY_RATES)
+    rates = {code.upper(): Decimal(str(rate)) for code, rate in rates.items()}
+    factors = getattr(settings, 'SERVICE_PRICE_PERIOD_FACTORS', PERIOD_FACTORS)
+    factors = {period.lower(): Decimal(str(factor)) for period, factor in factors.items()}
+
+    Service = apps.get_model('services', 'Service')
+    services = list(Service.objects.all())
+    for service in services:
+        service.normalized_price = normalize_price(
+            service.price_starting_from, service.price_currency, service.price_period, service.is_free,
+            rates, factors,
+        )
+    Service.objects.bulk_update(services, ['normalized_price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='normalized_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, help_text='First-year cost in USD, computed on save for filtering and ordering', max_digits=14, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'normalized_price'], name='services_se_status_440778_idx'),
+        ),
+        migrations.RunPython(populate_normalized_price, migrations.RunPython.noop),
+    ]
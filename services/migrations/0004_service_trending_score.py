@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_published_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, help_text='Time-decayed engagement, see catalog/trending.py'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', '-trending_score'], name='services_se_status_f17456_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0004_service_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='service',
+            name='unique_views',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Estimated unique visitors (HyperLogLog), bots excluded'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Frozen copy of services/pricing.py as it was when this migration was written:
+# hourly prices count a full-time year and custom pricing is not comparable
+CURRENCY_RATES = {
+    'USD': '1', 'EUR': '1.08', 'GBP': '1.27', 'INR': '0.012',
+    'AUD': '0.66', 'CAD': '0.73', 'SGD': '0.74', 'AED': '0.27',
+}
+PERIOD_FACTORS = {
+    'one_time': '1', 'hourly': '2080', 'weekly': '52', 'monthly': '12', 'quarterly': '4', 'yearly': '1',
+}
+
+
+def normalize_price(price, currency, period, is_free, has_custom_pricing, rates, factors):
+    if is_free:
+        return Decimal('0.00')
+    if has_custom_pricing or price is None:
+        return None
+    rate = rates.get((currency or 'USD').upper())
+    factor = factors.get((period or 'one_time').lower())
+    if rate is None or factor is None:
+        return None
+    try:
+        amount = Decimal(str(price)) * rate * factor
+    except InvalidOperation:
+        return None
+    return amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def recompute_normalized_price(apps, schema_editor):
+    rates = getattr(settings, 'SERVICE_CURRENCY_RATES', CURRENCY_RATES)
+    rates = {code.upper(): Decimal(str(rate)) for code, rate in rates.items()}
+    factors = getattr(settings, 'SERVICE_PRICE_PERIOD_FACTORS', PERIOD_FACTORS)
+    factors = {period.lower(): Decimal(str(factor)) for period, factor in factors.items()}
+
+    Service = apps.get_model('services', 'Service')
+    changed = []
+    for service in Service.objects.order_by('pk').iterator(chunk_size=500):
+        price = normalize_price(
+            service.price_starting_from, service.price_currency, service.price_period, service.is_free,
+            service.has_custom_pricing, rates, factors,
+        )
+        if price != service.normalized_price:
+            service.normalized_price = price
+            changed.append(service)
+    Service.objects.bulk_update(changed, ['normalized_price'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0007_servicelead_submission_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_normalized_price, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,9 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
 from django.utils.text import slugify
+from martech_influence_backend.lead_data import AtomicLeadSaveMixin
+
+from .pricing import PRICE_FIELDS, normalize_price
 
 
 class TimeStampedModel(models.Model):
@@ -66,6 +69,7 @@ class Service(TimeStampedModel):
     price_period = models.CharField(max_length=20, default='one_time', null=True, blank=True, help_text="one_time, monthly, yearly, hourly")
     is_free = models.BooleanField(default=False, null=True, blank=True, help_text="Is this a free service?")
     has_custom_pricing = models.BooleanField(default=False, null=True, blank=True, help_text="Custom pricing available")
+    normalized_price = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, editable=False, help_text="First-year cost in USD, computed on save for filtering and ordering")
     
     # Service Details
     duration = models.CharField(max_length=100, null=True, blank=True, help_text="Service duration (e.g., '2 weeks', '1 month')")
@@ -85,8 +89,10 @@ class Service(TimeStampedModel):
     
     # Engagement metrics
     views_count = models.PositiveIntegerField(default=0, null=True, blank=True)
+    unique_views = models.PositiveIntegerField(default=0, editable=False, help_text="Estimated unique visitors (HyperLogLog), bots excluded")
     inquiries_count = models.PositiveIntegerField(default=0, null=True, blank=True, help_text="Number of service inquiries")
     likes_count = models.PositiveIntegerField(default=0, null=True, blank=True)
+    trending_score = models.FloatField(default=0, editable=False, help_text="Time-decayed engagement, see catalog/trending.py")
     
     # Timestamps
     published_at = models.DateTimeField(null=True, blank=True)
@@ -98,7 +104,12 @@ class Service(TimeStampedModel):
             models.Index(fields=['-created_at']),
             models.Index(fields=['status']),
             models.Index(fields=['slug']),
+            models.Index(fields=['status', '-published_at']),
+            models.Index(fields=['status', '-trending_score']),
             models.Index(fields=['category']),
+            models.Index(fields=['status', 'normalized_price']),
+            # Delta sync (catalog/sync.py) pages by (updated_at, id)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -111,13 +122,22 @@ class Service(TimeStampedModel):
         if self.status == 'published' and not self.published_at:
             from django.utils import timezone
             self.published_at = timezone.now()
+        # Keep the comparable price in sync unless only unrelated fields are saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(PRICE_FIELDS):
+            self.normalized_price = normalize_price(
+                self.price_starting_from, self.price_currency, self.price_period, self.is_free,
+                self.has_custom_pricing,
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'normalized_price'}
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse('services:detail', kwargs={'slug': self.slug})
 
 
-class ServiceLead(TimeStampedModel):
+class ServiceLead(AtomicLeadSaveMixin, TimeStampedModel):
     """Model for tracking leads generated from services"""
     LEAD_SOURCE_CHOICES = [
         ('website', 'Website Contact Form'),
@@ -166,6 +186,9 @@ class ServiceLead(TimeStampedModel):
     utm_term = models.CharField(max_length=100, blank=True, null=True)
     utm_content = models.CharField(max_length=100, blank=True, null=True)
 
+    # Set when accepted through the write-behind spool (analytics/lead_spool.py)
+    submission_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+
     class Meta:
         verbose_name_plural = "Service Leads"
         ordering = ['-created_at']
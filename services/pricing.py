@@ -0,0 +1,74 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+
+
+# Conversion rates into the base currency (USD). Override with
+# SERVICE_CURRENCY_RATES in settings when the rates need refreshing, then run
+# `python manage.py recompute_service_prices`.
+DEFAULT_CURRENCY_RATES = {
+    'USD': '1',
+    'EUR': '1.08',
+    'GBP': '1.27',
+    'INR': '0.012',
+    'AUD': '0.66',
+    'CAD': '0.73',
+    'SGD': '0.74',
+    'AED': '0.27',
+}
+
+# Multipliers that turn a price per period into a first-year cost: a year of
+# the recurring periods, and for hourly prices a full-time year (40 h x 52 weeks)
+DEFAULT_PERIOD_FACTORS = {
+    'one_time': '1',
+    'hourly': '2080',
+    'weekly': '52',
+    'monthly': '12',
+    'quarterly': '4',
+    'yearly': '1',
+}
+
+PRICE_FIELDS = ['price_starting_from', 'price_currency', 'price_period', 'is_free', 'has_custom_pricing']
+
+TWO_PLACES = Decimal('0.01')
+
+
+def get_currency_rates():
+    rates = getattr(settings, 'SERVICE_CURRENCY_RATES', DEFAULT_CURRENCY_RATES)
+    return {code.upper(): Decimal(str(rate)) for code, rate in rates.items()}
+
+
+def get_period_factors():
+    factors = getattr(settings, 'SERVICE_PRICE_PERIOD_FACTORS', DEFAULT_PERIOD_FACTORS)
+    return {period.lower(): Decimal(str(factor)) for period, factor in factors.items()}
+
+
+def normalize_price(price, currency=None, period=None, is_free=False, has_custom_pricing=False,
+                    rates=None, factors=None):
+    """
+    Convert a service price into a comparable first-year cost in USD.
+
+    Free services normalize to 0. Returns None when the price can't be
+    compared (custom pricing, whose "starting from" is only a floor, no price,
+    or an unknown currency/period), so those services sort after every priced
+    one.
+    """
+    if is_free:
+        return Decimal('0.00')
+    if has_custom_pricing or price is None:
+        return None
+
+    rates = get_currency_rates() if rates is None else rates
+    factors = get_period_factors() if factors is None else factors
+
+    rate = rates.get((currency or 'USD').upper())
+    factor = factors.get((period or 'one_time').lower())
+    if rate is None or factor is None:
+        return None
+
+    try:
+        amount = Decimal(str(price)) * rate * factor
+    except InvalidOperation:
+        return None
+    return amount.quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+from martech_influence_backend.bulk import PrefetchedPrimaryKeyRelatedField
+from martech_influence_backend.fieldsets import SparseFieldsMixin
 from .models import ServiceCategory, Service, ServiceLead
 
 
@@ -18,7 +20,7 @@ class ServiceCategorySerializer(serializers.ModelSerializer):
         return None
 
 
-class ServiceListSerializer(serializers.ModelSerializer):
+class ServiceListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for service list view"""
     category = ServiceCategorySerializer(read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
@@ -33,10 +35,16 @@ class ServiceListSerializer(serializers.ModelSerializer):
             'id', 'title', 'short_title', 'slug', 'category', 'author_username', 'author_full_name',
             'short_description', 'banner_image', 'banner_image_url', 'mobile_image', 'mobile_image_url',
             'icon', 'icon_url', 'price_starting_from', 'price_currency', 'price_period',
-            'is_free', 'has_custom_pricing', 'duration', 'delivery_time', 'service_type',
+            'normalized_price', 'is_free', 'has_custom_pricing', 'duration', 'delivery_time', 'service_type',
             'status', 'is_featured', 'is_pinned', 'is_popular', 'views_count',
-            'inquiries_count', 'likes_count', 'published_at', 'created_at', 'updated_at'
+            'inquiries_count', 'likes_count', 'trending_score', 'published_at', 'created_at', 'updated_at'
         ]
+        field_dependencies = {
+            'author_full_name': ['author__first_name', 'author__last_name', 'author__username'],
+            'banner_image_url': ['banner_image'],
+            'mobile_image_url': ['mobile_image'],
+            'icon_url': ['icon'],
+        }
     
     def get_author_full_name(self, obj):
         if obj.author:
@@ -68,7 +76,7 @@ class ServiceListSerializer(serializers.ModelSerializer):
         return None
 
 
-class ServiceDetailSerializer(serializers.ModelSerializer):
+class ServiceDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for service detail view"""
     category = ServiceCategorySerializer(read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
@@ -76,6 +84,7 @@ class ServiceDetailSerializer(serializers.ModelSerializer):
     banner_image_url = serializers.SerializerMethodField()
     mobile_image_url = serializers.SerializerMethodField()
     icon_url = serializers.SerializerMethodField()
+    related_items = serializers.SerializerMethodField()
     
     class Meta:
         model = Service
@@ -83,12 +92,19 @@ class ServiceDetailSerializer(serializers.ModelSerializer):
             'id', 'title', 'short_title', 'slug', 'category', 'author', 'author_username', 'author_full_name',
             'short_description', 'description', 'features', 'benefits', 'banner_image', 'banner_image_url',
             'mobile_image', 'mobile_image_url', 'icon', 'icon_url', 'price_starting_from', 'price_currency',
-            'price_period', 'is_free', 'has_custom_pricing', 'duration', 'delivery_time', 'service_type',
+            'price_period', 'normalized_price', 'is_free', 'has_custom_pricing', 'duration', 'delivery_time', 'service_type',
             'meta_title', 'meta_description', 'meta_keywords', 'status', 'is_featured', 'is_pinned',
-            'is_popular', 'views_count', 'inquiries_count', 'likes_count', 'published_at',
+            'is_popular', 'views_count', 'unique_views', 'inquiries_count', 'likes_count', 'related_items', 'published_at',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['slug', 'views_count', 'inquiries_count', 'likes_count', 'published_at']
+        field_dependencies = {
+            'author_full_name': ['author__first_name', 'author__last_name', 'author__username'],
+            'banner_image_url': ['banner_image'],
+            'mobile_image_url': ['mobile_image'],
+            'icon_url': ['icon'],
+            'related_items': ['related_payload'],
+        }
+        read_only_fields = ['slug', 'normalized_price', 'views_count', 'unique_views', 'inquiries_count', 'likes_count', 'published_at']
     
     def get_author_full_name(self, obj):
         if obj.author:
@@ -119,9 +135,16 @@ class ServiceDetailSerializer(serializers.ModelSerializer):
             return obj.icon.url
         return None
 
+    def get_related_items(self, obj):
+        # Annotated by catalog.related.with_related in the detail view
+        return getattr(obj, 'related_payload', None) or []
+
 
 class ServiceLeadCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating service leads"""
+    # Bulk submissions resolve ids from one prefetch per batch
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     class Meta:
         model = ServiceLead
         fields = [
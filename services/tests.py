@@ -1,3 +1,57 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .models import Service
+from .pricing import normalize_price
+
+
+class NormalizePriceTests(SimpleTestCase):
+    def test_periods_become_a_first_year_cost(self):
+        self.assertEqual(normalize_price(Decimal('500'), 'USD', 'one_time'), Decimal('500.00'))
+        self.assertEqual(normalize_price(Decimal('100'), 'EUR', 'monthly'), Decimal('1296.00'))
+        self.assertEqual(normalize_price(Decimal('10'), 'usd', 'Weekly'), Decimal('520.00'))
+        # A full-time year of an hourly price, not a single hour
+        self.assertEqual(normalize_price(Decimal('50'), 'USD', 'hourly'), Decimal('104000.00'))
+        self.assertEqual(normalize_price(Decimal('99.99'), None, None), Decimal('99.99'))
+
+    def test_free_custom_and_unknown_prices(self):
+        self.assertEqual(normalize_price(Decimal('100'), 'USD', 'monthly', is_free=True), Decimal('0.00'))
+        self.assertEqual(normalize_price(None, is_free=True, has_custom_pricing=True), Decimal('0.00'))
+        self.assertIsNone(normalize_price(Decimal('1000'), 'USD', 'one_time', has_custom_pricing=True))
+        self.assertIsNone(normalize_price(None, 'USD', 'one_time'))
+        self.assertIsNone(normalize_price(Decimal('100'), 'XYZ', 'one_time'))
+        self.assertIsNone(normalize_price(Decimal('100'), 'USD', 'fortnightly'))
+
+    @override_settings(SERVICE_PRICE_PERIOD_FACTORS={'hourly': '160'})
+    def test_factors_can_be_overridden(self):
+        self.assertEqual(normalize_price(Decimal('50'), 'USD', 'hourly'), Decimal('8000.00'))
+        self.assertIsNone(normalize_price(Decimal('50'), 'USD', 'monthly'))
+
+
+@override_settings(RATE_LIMIT_ENABLED=False, ACTION_CACHE_ENABLED=False)
+class ServicePriceTests(TestCase):
+    def service(self, title, **pricing):
+        return Service.objects.create(title=title, status='published', **pricing)
+
+    def test_save_keeps_the_normalized_price_in_sync(self):
+        service = self.service("Audit", price_starting_from=Decimal('200'), price_period='monthly')
+        self.assertEqual(service.normalized_price, Decimal('2400.00'))
+        service.has_custom_pricing = True
+        service.save(update_fields=['has_custom_pricing'])
+        service.refresh_from_db()
+        self.assertIsNone(service.normalized_price)
+
+    def test_price_ordering_and_filters(self):
+        self.service("Free", is_free=True)
+        self.service("Hourly", price_starting_from=Decimal('50'), price_period='hourly')
+        self.service("Project", price_starting_from=Decimal('5000'), price_period='one_time')
+        self.service("Custom", price_starting_from=Decimal('100'), has_custom_pricing=True)
+
+        def titles(query):
+            response = self.client.get(f'/api/services/services/?{query}', HTTP_HOST='localhost')
+            self.assertEqual(response.status_code, 200, response.content)
+            return [item['title'] for item in response.json()['data']]
+
+        self.assertEqual(titles('ordering=price'), ["Free", "Project", "Hourly", "Custom"])
+        self.assertEqual(titles('price_lte=10000&ordering=price'), ["Free", "Project"])
@@ -4,10 +4,12 @@ from .views import ServiceViewSet, ServiceLeadViewSet
 service_list = ServiceViewSet.as_view({'get': 'list'})
 service_detail = ServiceViewSet.as_view({'get': 'retrieve'})
 service_lead_create = ServiceLeadViewSet.as_view({'post': 'create'})
+service_lead_bulk_create = ServiceLeadViewSet.as_view({'post': 'bulk_create'})
 
 urlpatterns = [
     path('services/', service_list, name='service-list'),
     path('services/<int:pk>/', service_detail, name='service-detail'),
     path('service-leads/', service_lead_create, name='service-lead-create'),
+    path('service-leads/bulk/', service_lead_bulk_create, name='service-lead-bulk-create'),
 ]
 
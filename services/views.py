@@ -1,74 +1,77 @@
 from rest_framework import viewsets, status
-from django.db.models import Q
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.conditional import conditional_get
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.filtering import FilterSet, FilterSetMixin, Filter, Ordering, parse_bool, parse_decimal
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset, wants_field
+from martech_influence_backend.ratelimit import rate_limit
+from analytics.bulk_leads import bulk_create_leads
+from analytics.lead_spool import enqueue_lead, write_behind_enabled
+from analytics.unique_views import record_view
+from catalog.related import with_related
 from .models import Service
 from .serializers import (
     ServiceListSerializer, ServiceDetailSerializer, ServiceLeadCreateSerializer
 )
 
 
-class ServiceViewSet(viewsets.ViewSet):
+class ServiceViewSet(FilterSetMixin, viewsets.ViewSet):
     """
     ViewSet for Service - GET operations only
     """
     
+    filterset = FilterSet(
+        Service,
+        filters={
+            'category': Filter('category__slug'),
+            'is_featured': Filter('is_featured', parse_bool, index=False),
+            'is_popular': Filter('is_popular', parse_bool, index=False),
+            'is_free': Filter('is_free', parse_bool, index=False),
+            'service_type': Filter('service_type__icontains', index=False),
+            # Normalized price (USD, first-year cost)
+            'price_lte': Filter('normalized_price__lte', parse_decimal, index=['status', 'normalized_price']),
+            'price_gte': Filter('normalized_price__gte', parse_decimal, index=['status', 'normalized_price']),
+        },
+        search=['title', 'short_title', 'short_description', 'description', 'features', 'benefits'],
+        orderings={
+            'created_at': Ordering('created_at', index=['created_at']),
+            'published_at': Ordering('published_at', index=['status', 'published_at'], nulls_last=True),
+            # Stored by `manage.py compute_trending_scores`
+            'trending': Ordering('trending_score', index=['status', 'trending_score'], then=['-created_at']),
+            # Free services (normalized to 0) come first, custom/unpriced last
+            'price': Ordering(
+                'normalized_price', index=['status', 'normalized_price'], nulls_last=True, then=['-created_at']
+            ),
+        },
+        default_ordering='-created_at',
+        # Accepted before orderings were declared; deprecated and sorted without an index
+        legacy_orderings=['id', 'title', 'updated_at', 'views_count', 'likes_count', 'inquiries_count', 'trending_score'],
+    )
+
     def get_queryset(self):
-        queryset = Service.objects.select_related('category', 'author').filter(status='published')
-        
-        # Skip filtering during schema generation
-        if getattr(self, 'swagger_fake_view', False) or not hasattr(self, 'request') or self.request is None:
-            return queryset
-        
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category__slug=category)
-        
-        # Filter by featured
-        is_featured = self.request.query_params.get('is_featured', None)
-        if is_featured is not None:
-            queryset = queryset.filter(is_featured=is_featured.lower() == 'true')
-        
-        # Filter by popular
-        is_popular = self.request.query_params.get('is_popular', None)
-        if is_popular is not None:
-            queryset = queryset.filter(is_popular=is_popular.lower() == 'true')
-        
-        # Filter by free
-        is_free = self.request.query_params.get('is_free', None)
-        if is_free is not None:
-            queryset = queryset.filter(is_free=is_free.lower() == 'true')
-        
-        # Filter by service type
-        service_type = self.request.query_params.get('service_type', None)
-        if service_type:
-            queryset = queryset.filter(service_type__icontains=service_type)
-        
-        # Search
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(short_title__icontains=search) |
-                Q(short_description__icontains=search) |
-                Q(description__icontains=search) |
-                Q(features__icontains=search) |
-                Q(benefits__icontains=search)
-            )
-        
-        # Order by
-        ordering = self.request.query_params.get('ordering', '-created_at')
-        queryset = queryset.order_by(ordering)
-        
-        return queryset
+        return Service.objects.select_related('category', 'author').filter(status='published')
     
+    @cache_headers('service', related={'category': 'service-category'})
+    @cached_action(depends_on=['services.Service', 'services.ServiceCategory', 'auth.User'])
+    @read_from_replica
     def list(self, request):
         """List all published services with pagination"""
         from rest_framework.pagination import PageNumberPagination
         
-        queryset = self.get_queryset()
+        fields, error_response = get_sparse_fields(request, ServiceListSerializer)
+        if error_response:
+            return error_response
+
+        queryset, error_response = self.apply_filterset(self.get_queryset())
+        if error_response:
+            return error_response
+        queryset = project_queryset(queryset, ServiceListSerializer, fields)
         
         # Pagination
         paginator = PageNumberPagination()
@@ -76,7 +79,7 @@ class ServiceViewSet(viewsets.ViewSet):
         page = paginator.paginate_queryset(queryset, request)
         
         if page is not None:
-            serializer = ServiceListSerializer(page, many=True, context={'request': request})
+            serializer = ServiceListSerializer(page, many=True, context={'request': request}, fields=fields)
             paginated_response = paginator.get_paginated_response(serializer.data)
             
             return create_response(
@@ -89,7 +92,7 @@ class ServiceViewSet(viewsets.ViewSet):
                 previous_link=paginated_response.data.get('previous')
             )
         
-        serializer = ServiceListSerializer(queryset, many=True, context={'request': request})
+        serializer = ServiceListSerializer(queryset, many=True, context={'request': request}, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Services retrieved successfully",
@@ -97,10 +100,21 @@ class ServiceViewSet(viewsets.ViewSet):
             data=serializer.data
         )
     
+    @cache_headers('service', related={'category': 'service-category'})
+    @read_from_replica
+    @conditional_get(Service, ServiceDetailSerializer, depends_on=['services.Service', 'services.ServiceCategory', 'auth.User'],
+                     filters={'status': 'published'}, view_type='service')
     def retrieve(self, request, pk=None):
         """Retrieve a single service"""
+        fields, error_response = get_sparse_fields(request, ServiceDetailSerializer)
+        if error_response:
+            return error_response
+
+        queryset = Service.objects.select_related('category', 'author')
+        if wants_field(fields, 'related_items'):
+            queryset = with_related(queryset, 'service')
         try:
-            service = Service.objects.select_related('category', 'author').get(pk=pk, status='published')
+            service = project_queryset(queryset, ServiceDetailSerializer, fields).get(pk=pk, status='published')
         except Service.DoesNotExist:
             return create_response(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -109,11 +123,13 @@ class ServiceViewSet(viewsets.ViewSet):
                 status=False
             )
         
-        # Increment views count
-        service.views_count += 1
-        service.save(update_fields=['views_count'])
+        # Increment views count; the row may have been loaded without the column
+        Service.objects.filter(pk=service.pk).update(views_count=Coalesce(F('views_count'), 0) + 1)
+        if 'views_count' not in service.get_deferred_fields():
+            service.views_count = (service.views_count or 0) + 1
+        record_view('service', service.pk, request)
         
-        serializer = ServiceDetailSerializer(service, context={'request': request})
+        serializer = ServiceDetailSerializer(service, context={'request': request}, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Service retrieved successfully",
@@ -212,14 +228,24 @@ class ServiceLeadViewSet(viewsets.ViewSet):
         ),
         responses={
             201: openapi.Response(description='Service inquiry submitted successfully'),
+            202: openapi.Response(description='Accepted into the write-behind queue (LEAD_WRITE_BEHIND); returns submission_id'),
             400: openapi.Response(description='Bad request - validation errors')
         },
         tags=['Service Leads']
     )
+    @rate_limit('service_lead')
     def create(self, request):
         """Create a new service lead"""
         serializer = ServiceLeadCreateSerializer(data=request.data)
         if serializer.is_valid():
+            if write_behind_enabled():
+                # Written by `manage.py flush_lead_spool`
+                return create_response(
+                    status_code=status.HTTP_202_ACCEPTED,
+                    message="Service inquiry received",
+                    message_code="SERVICE_LEAD_QUEUED",
+                    data={"submission_id": enqueue_lead('service_lead', serializer.validated_data)}
+                )
             lead = serializer.save()
             # Increment inquiries count for the service
             if lead.service:
@@ -239,3 +265,25 @@ class ServiceLeadViewSet(viewsets.ViewSet):
             status=False,
             data=serializer.errors
         )
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Submit up to LEAD_BULK_MAX_ITEMS service leads at once (partner integrations). "
+            "Body: a JSON array, or NDJSON with Content-Type application/x-ndjson, of items shaped like "
+            "the single create endpoint, each with an optional submission_id (UUID) for safe retries. "
+            "Requires the services.add_servicelead permission (HTTP Basic auth)."
+        ),
+        request_body=openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+        responses={
+            200: openapi.Response(description='Per-item results: created (with id), duplicate or invalid (with errors)'),
+            400: openapi.Response(description='Body is not a JSON array or NDJSON'),
+            401: openapi.Response(description='Authentication required'),
+            403: openapi.Response(description='Missing services.add_servicelead permission'),
+            413: openapi.Response(description='More than LEAD_BULK_MAX_ITEMS items'),
+        },
+        tags=['Service Leads']
+    )
+    @rate_limit('lead_bulk')
+    def bulk_create(self, request):
+        """Create many service leads in one request"""
+        return bulk_create_leads(request, 'service_lead', ServiceLeadCreateSerializer, "SERVICE_LEADS_BULK_PROCESSED")
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import SocialMedia
+from catalog.signals import content_bulk_changed
 
 
 @admin.register(SocialMedia)
@@ -102,11 +103,15 @@ class SocialMediaAdmin(admin.ModelAdmin):
     actions = ['activate', 'deactivate']
 
     def activate(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=True)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} social media link(s) activated.')
     activate.short_description = "Activate selected links"
 
     def deactivate(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=False)
+        content_bulk_changed(self.model, pks)
         self.message_user(request, f'{updated} social media link(s) deactivated.')
     deactivate.short_description = "Deactivate selected links"
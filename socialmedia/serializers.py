@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from martech_influence_backend.fieldsets import SparseFieldsMixin
 from .models import SocialMedia
 
 
-class SocialMediaSerializer(serializers.ModelSerializer):
+class SocialMediaSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for social media links"""
-    display_name = serializers.CharField(source='display_name', read_only=True)
+    display_name = serializers.CharField(read_only=True)
     icon_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -13,6 +14,10 @@ class SocialMediaSerializer(serializers.ModelSerializer):
             'id', 'platform', 'display_name', 'url', 'icon', 'icon_url',
             'is_active', 'description', 'created_at', 'updated_at'
         ]
+        field_dependencies = {
+            'display_name': ['platform'],
+            'icon_url': ['icon'],
+        }
     
     def get_icon_url(self, obj):
         if obj.icon:
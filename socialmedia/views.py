@@ -1,5 +1,9 @@
 from rest_framework import viewsets, status
 from martech_influence_backend.utils import create_response
+from martech_influence_backend.caching import cached_action
+from martech_influence_backend.db_router import read_from_replica
+from martech_influence_backend.surrogate import cache_headers
+from martech_influence_backend.fieldsets import get_sparse_fields, project_queryset
 from .models import SocialMedia
 from .serializers import SocialMediaSerializer
 
@@ -26,10 +30,17 @@ class SocialMediaViewSet(viewsets.ViewSet):
         
         return queryset
     
+    @cache_headers('social-media')
+    @cached_action(depends_on=['socialmedia.SocialMedia'])
+    @read_from_replica
     def list(self, request):
         """List all active social media links"""
-        queryset = self.get_queryset()
-        serializer = SocialMediaSerializer(queryset, many=True, context={'request': request})
+        fields, error_response = get_sparse_fields(request, SocialMediaSerializer)
+        if error_response:
+            return error_response
+
+        queryset = project_queryset(self.get_queryset(), SocialMediaSerializer, fields)
+        serializer = SocialMediaSerializer(queryset, many=True, context={'request': request}, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Social media links retrieved successfully",
@@ -37,10 +48,16 @@ class SocialMediaViewSet(viewsets.ViewSet):
             data=serializer.data
         )
     
+    @cache_headers('social-media')
+    @read_from_replica
     def retrieve(self, request, pk=None):
         """Retrieve a single social media link"""
+        fields, error_response = get_sparse_fields(request, SocialMediaSerializer)
+        if error_response:
+            return error_response
+
         try:
-            social_media = SocialMedia.objects.get(pk=pk, is_active=True)
+            social_media = project_queryset(SocialMedia.objects.all(), SocialMediaSerializer, fields).get(pk=pk, is_active=True)
         except SocialMedia.DoesNotExist:
             return create_response(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -49,7 +66,7 @@ class SocialMediaViewSet(viewsets.ViewSet):
                 status=False
             )
         
-        serializer = SocialMediaSerializer(social_media, context={'request': request})
+        serializer = SocialMediaSerializer(social_media, context={'request': request}, fields=fields)
         return create_response(
             status_code=status.HTTP_200_OK,
             message="Social media link retrieved successfully",